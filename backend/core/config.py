@@ -2,7 +2,7 @@
 import tempfile
 from typing import Optional
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -17,6 +17,41 @@ class Settings(BaseSettings):
 
     # VectorDB settings
     vector_db: str = "None"
+    vector_store_async_workers: int = 16
+
+    # Retrieval settings
+    retrieval_mode: str = "default"
+    hybrid_fusion: str = "rrf"
+    hybrid_rrf_k: int = 60
+    hybrid_dense_weight: float = 0.5
+    hybrid_candidates: int = 20
+    sparse_index_dir: Optional[str] = None
+
+    # RAG pipeline settings, timeouts in seconds
+    pipeline_query_rewriting: bool = False
+    pipeline_timeout: Optional[float] = 30.0
+    pipeline_rewrite_timeout: Optional[float] = 2.0
+    pipeline_embedding_timeout: Optional[float] = 5.0
+    pipeline_retrieval_timeout: Optional[float] = 5.0
+    pipeline_generation_timeout: Optional[float] = 25.0
+    # The response cache is per process; invalidation does not reach other workers
+    response_cache_enabled: bool = False
+    response_cache_threshold: float = 0.95
+    response_cache_ttl: Optional[float] = 3600.0
+    response_cache_max_entries: int = 1000
+    context_token_budget: int = 3000
+    context_tokenizer_backend: Optional[str] = None
+    context_min_overlap: int = 20
+
+    # Re-ranking settings
+    reranker_model: Optional[str] = None
+    reranker_candidates: int = 100
+    reranker_candidate_threshold: float = 0.0
+    reranker_top_k: int = 5
+    reranker_batch_size: int = 32
+    reranker_max_length: int = 512
+    reranker_workers: Optional[int] = None
+    reranker_timeout: Optional[float] = 0.5
 
     # Default collection name
     collection_name: Optional[str] = None
@@ -33,6 +68,23 @@ class Settings(BaseSettings):
     embedding_dim: Optional[int] = None
     embedding_field: Optional[str] = None
     upsert_batch_size: Optional[int] = None
+    upsert_flush_interval: float = 5.0
+    embedding_batch_size: int = 100
+    embedding_max_batch_tokens: int = 8000
+    embedding_cache_dir: Optional[str] = None
+    embedding_cache_max_entries: int = 100000
+
+    # Ingestion pipeline settings
+    ingestion_parse_workers: Optional[int] = None
+    ingestion_embedding_workers: int = 4
+    ingestion_queue_size: int = 256
+    pdf_page_workers: Optional[int] = None
+    pdf_pages_per_task: int = 16
+    pdf_parallel_min_pages: int = 16
+    image_store_dir: Optional[str] = None
+    excel_rows_per_chunk: int = 50
+    excel_chunk_max_chars: int = 4000
+    excel_sheet_workers: Optional[int] = None
 
     # Frontend settings
     react_app_api_url: str
@@ -54,6 +106,7 @@ class Settings(BaseSettings):
     milvus_password: Optional[str] = None
     milvus_index_params: Optional[str] = None
     milvus_search_params: Optional[str] = None
+    milvus_index_profile: Optional[str] = None
 
     # Elasticsearch credentials
     elastic_host: Optional[str] = None
@@ -62,6 +115,19 @@ class Settings(BaseSettings):
     elastic_cacert_path: Optional[str] = None
     elastic_cloud_id: Optional[str] = None
     elastic_api_key: Optional[str] = None
+    elastic_bulk_chunk_size: int = 500
+    elastic_bulk_max_retries: int = 3
+    elastic_bulk_refresh_interval: Optional[str] = "-1"
+
+    # Local vector store settings
+    local_store_dir: Optional[str] = None
+    local_store_index: str = "hnsw"
+    local_store_hnsw_m: int = 16
+    local_store_hnsw_ef_construction: int = 200
+    local_store_hnsw_ef_search: int = 64
+    local_store_ivf_nlist: Optional[int] = None
+    local_store_ivf_nprobe: int = 8
+    local_store_ivf_train_size: int = 10000
 
     # Pinecone credentials
     pinecone_api_key: Optional[str] = None
@@ -80,6 +146,7 @@ class Settings(BaseSettings):
     # Tokenization settings
     tokenizer: Optional[str] = None
     tokenizer_model: Optional[str] = None
+    tokenizer_backend: str = "watsonx"
 
     # Project settings
     project_name: Optional[str] = None
@@ -101,6 +168,16 @@ class Settings(BaseSettings):
     frontend_url: Optional[str] = None
     oidc_userinfo_endpoint: Optional[str] = None
     
+    @field_validator("pipeline_timeout", "pipeline_rewrite_timeout", "pipeline_embedding_timeout",
+                     "pipeline_retrieval_timeout", "pipeline_generation_timeout", "response_cache_ttl",
+                     "reranker_timeout", mode="before")
+    @classmethod
+    def empty_as_none(cls, value):
+        """Read an empty value, e.g. RESPONSE_CACHE_TTL=, as no limit."""
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -13,3 +13,9 @@ class DocumentStorageError(Exception):
 class DocumentIngestionError(Exception):
     """Exception raised for errors during document ingestion."""
     pass
+
+class PipelineStageError(Exception):
+    """Exception raised when a pipeline stage fails or runs out of time."""
+    def __init__(self, stage: str, message: str):
+        self.stage = stage
+        super().__init__(f"Stage {stage}: {message}")
@@ -19,6 +19,8 @@ class BaseProcessor(ABC):
         max_chunk_size (int): Maximum chunk size for chunking documents.
         semantic_threshold (float): Semantic threshold for chunking documents.
         chunking_method: Method used for chunking documents.
+        embed_chunks (bool): Whether to compute chunk embeddings while processing. When False,
+            chunks are yielded without vectors so a later stage can embed them in batches.
     """
 
     def __init__(self) -> None:
@@ -26,6 +28,7 @@ class BaseProcessor(ABC):
         self.max_chunk_size: int = settings.max_chunk_size
         self.semantic_threshold: float = settings.semantic_threshold
         self.chunking_method = get_chunking_method()
+        self.embed_chunks: bool = True
     
     def extract_metadata(self, file_path: str) -> Dict[str, Any]:
         """
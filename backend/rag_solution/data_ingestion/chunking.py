@@ -1,11 +1,10 @@
 import re
 import logging
-from typing import List, Callable
+from typing import List, Callable, Optional
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from backend.core.config import settings
+from backend.rag_solution.data_ingestion.tokenization import Tokenizer, get_tokenizer
 from backend.vectordbs.utils.watsonx import get_embeddings
-from backend.vectordbs.utils.watsonx import get_tokenization
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -52,16 +51,22 @@ def simple_chunking(text: str, min_chunk_size: int, max_chunk_size: int, overlap
 
 def semantic_chunking(text: str, min_chunk_size: int = 1, max_chunk_size: int = 100) -> List[str]:
     sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return [text] if min_chunk_size <= len(text) <= max_chunk_size else []
     combined_sentences = combine_sentences(sentences)
     
     embeddings = get_embeddings(combined_sentences)
-    embeddings_array = np.array(embeddings)
-    
-    distances = calculate_cosine_distances(embeddings_array)
+    if embeddings.shape[0] != len(sentences):
+        # get_embeddings returns an empty matrix on failure; keep the text rather than dropping it
+        logger.warning(f"Got {embeddings.shape[0]} embeddings for {len(sentences)} sentences, "
+                       f"falling back to simple chunking")
+        return simple_chunking(text, min_chunk_size, max_chunk_size, 0)
+
+    distances = calculate_cosine_distances(embeddings)
     breakpoint_percentile_threshold = 80
     breakpoint_distance_threshold = np.percentile(distances, breakpoint_percentile_threshold)
     
-    indices_above_thresh = [i for i, distance in enumerate(distances) if distance > breakpoint_distance_threshold]
+    indices_above_thresh = np.flatnonzero(distances > breakpoint_distance_threshold)
     
     chunks = []
     start_index = 0
@@ -79,37 +84,80 @@ def semantic_chunking(text: str, min_chunk_size: int = 1, max_chunk_size: int =
     
     return chunks
 
-def token_based_chunking(text: str, max_tokens: int = 100, overlap: int = 20) -> List[str]:
-    sentences = split_sentences(text)
-    tokenized_sentences = get_tokenization(sentences)
-    
+def token_based_chunking(text: str, max_tokens: int = 100, overlap: int = 20,
+                         tokenizer: Optional[Tokenizer] = None) -> List[str]:
+    """
+    Split text into chunks of whole sentences of at most max_tokens tokens.
+
+    All sentences are tokenized in one call and chunk boundaries are found with
+    prefix sums of the token counts. Both the chunk end and the overlap start
+    only ever move forward, so the pass is linear in the number of sentences.
+    Each chunk after the first repeats the trailing sentences of the previous
+    chunk that fit within overlap tokens. A single sentence longer than
+    max_tokens becomes its own chunk.
+
+    Args:
+        text (str): The text to chunk.
+        max_tokens (int): The maximum number of tokens per chunk.
+        overlap (int): The maximum number of tokens repeated from the previous chunk.
+        tokenizer (Optional[Tokenizer]): The tokenizer to count with. Defaults to the configured backend.
+
+    Returns:
+        List[str]: The chunks, in document order.
+    """
+    sentences = [sentence for sentence in split_sentences(text) if sentence]
+    if not sentences:
+        return []
+    token_counts = (tokenizer or get_tokenizer()).count_tokens(sentences)
+
+    # prefix[i] is the number of tokens in sentences[:i]
+    prefix = [0]
+    for count in token_counts:
+        prefix.append(prefix[-1] + count)
+
     chunks = []
-    current_chunk = []
-    current_token_count = 0
-    
-    for sentence, tokens in zip(sentences, tokenized_sentences):
-        if current_token_count + len(tokens) > max_tokens and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            # Keep the last 'overlap' tokens for the next chunk
-            overlap_tokens = sum([get_tokenization([sent])[0] for sent in current_chunk[-2:]], [])[-overlap:]
-            current_chunk = [sentences[sentences.index(current_chunk[-1])]]
-            current_token_count = len(overlap_tokens)
-        
-        current_chunk.append(sentence)
-        current_token_count += len(tokens)
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
+    n_sentences = len(sentences)
+    start = 0
+    end = 0
+    while start < n_sentences:
+        end = max(end, start + 1)
+        while end < n_sentences and prefix[end + 1] - prefix[start] <= max_tokens:
+            end += 1
+        chunks.append(' '.join(sentences[start:end]))
+        if end == n_sentences:
+            break
+
+        # The overlap must also leave room for at least one new sentence
+        next_start = start + 1
+        while next_start < end and (prefix[end] - prefix[next_start] > overlap
+                                    or prefix[end + 1] - prefix[next_start] > max_tokens):
+            next_start += 1
+        start = next_start
+
     return chunks
 
-def calculate_cosine_distances(embeddings: np.ndarray) -> List[float]:
-    distances = []
-    for i in range(len(embeddings) - 1):
-        similarity = cosine_similarity([embeddings[i]], [embeddings[i + 1]])[0][0]
-        distance = 1 - similarity
-        distances.append(distance)
-    return distances
+def calculate_cosine_distances(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Compute the cosine distance between each pair of adjacent embeddings.
+
+    The matrix is normalized once and all adjacent dot products are taken in a
+    single pass, so the cost is one O(n * dim) NumPy operation rather than a
+    Python loop over sentence pairs. Zero vectors are treated as having
+    similarity 0, matching sklearn's cosine_similarity.
+
+    Args:
+        embeddings (np.ndarray): Array of shape (n, dim), one row per sentence.
+
+    Returns:
+        np.ndarray: Array of shape (n - 1,) where element i is the distance between rows i and i + 1.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or embeddings.shape[0] < 2:
+        return np.empty(0, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.where(norms == 0, 1, norms)
+    similarities = np.einsum("ij,ij->i", normalized[:-1], normalized[1:])
+    return 1 - similarities
 
 def simple_chunker(text: str) -> List[str]:
     return simple_chunking(
@@ -126,8 +174,39 @@ def semantic_chunker(text: str) -> List[str]:
         settings.max_chunk_size,
     )
 
+def token_chunker(text: str) -> List[str]:
+    return token_based_chunking(
+        text,
+        settings.max_chunk_size,
+        settings.chunk_overlap,
+    )
+
 def get_chunking_method() -> Callable[[str], List[str]]:
     if settings.chunking_strategy.lower() == "semantic":
         return semantic_chunker
+    elif settings.chunking_strategy.lower() == "token":
+        return token_chunker
     else:
-        return simple_chunker
\ No newline at end of file
+        return simple_chunker
+
+
+# Micro-benchmark: vectorized calculate_cosine_distances vs. the previous per-pair loop
+if __name__ == "__main__":
+    import timeit
+
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    def calculate_cosine_distances_loop(embeddings: np.ndarray) -> List[float]:
+        distances = []
+        for i in range(len(embeddings) - 1):
+            similarity = cosine_similarity([embeddings[i]], [embeddings[i + 1]])[0][0]
+            distances.append(1 - similarity)
+        return distances
+
+    rng = np.random.default_rng(0)
+    for n_sentences in (10_000, 100_000):
+        embeddings = rng.standard_normal((n_sentences, 384), dtype=np.float32)
+        vectorized = min(timeit.repeat(lambda: calculate_cosine_distances(embeddings), number=1, repeat=5))
+        loop = timeit.timeit(lambda: calculate_cosine_distances_loop(embeddings), number=1)
+        assert np.allclose(calculate_cosine_distances(embeddings), calculate_cosine_distances_loop(embeddings), atol=1e-5)
+        print(f"{n_sentences:>7} sentences: loop {loop:.3f}s, vectorized {vectorized:.4f}s ({loop / vectorized:.0f}x)")
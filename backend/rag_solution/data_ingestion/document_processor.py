@@ -1,7 +1,6 @@
 import logging
 import os
 from typing import Dict, Iterable, Optional, Any
-import multiprocessing
 from multiprocessing.managers import SyncManager
 from backend.core.custom_exceptions import DocumentProcessingError
 from backend.rag_solution.data_ingestion.base_processor import BaseProcessor
@@ -21,18 +20,32 @@ class DocumentProcessor:
 
     Attributes:
         processors (Dict[str, BaseProcessor]): A dictionary mapping file extensions to their respective processors.
+
+    Args:
+        manager (Optional[SyncManager]): Multiprocessing manager passed to processors that share state.
+        embed (bool): Whether processors embed chunks themselves. Set to False when a separate
+            embedding stage embeds the chunks in batches.
+        max_workers (Optional[int]): Cap on the processes a processor starts for a single file (PDF pages,
+            workbook sheets). Set it when files are already parsed in a process pool, so the pools do not
+            multiply. None keeps the processors' own settings.
     """
 
-    def __init__(self, manager: Optional[SyncManager] = None):
-        if manager is None:
-            manager = multiprocessing.Manager()
+    def __init__(self, manager: Optional[SyncManager] = None, embed: bool = True,
+                 max_workers: Optional[int] = None):
         self.manager = manager
+        pdf_processor = PdfProcessor(self.manager)
+        excel_processor = ExcelProcessor()
+        if max_workers is not None:
+            pdf_processor.page_workers = min(pdf_processor.page_workers, max_workers)
+            excel_processor.sheet_workers = min(excel_processor.sheet_workers, max_workers)
         self.processors: Dict[str, BaseProcessor] = {
             ".txt": TxtProcessor(),
-            ".pdf": PdfProcessor(self.manager),
+            ".pdf": pdf_processor,
             ".docx": WordProcessor(),
-            ".xlsx": ExcelProcessor(),
+            ".xlsx": excel_processor,
         }
+        for processor in self.processors.values():
+            processor.embed_chunks = embed
 
     def process_document(self, file_path: str) -> Iterable[Document]:
         """
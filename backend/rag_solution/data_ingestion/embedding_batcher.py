@@ -0,0 +1,80 @@
+import logging
+from typing import Iterator, List, Optional
+
+from backend.core.config import settings
+from backend.core.custom_exceptions import DocumentProcessingError
+from backend.vectordbs.data_types import DocumentChunk
+from backend.vectordbs.utils.watsonx import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with sub-word tokenizers
+
+
+class EmbeddingBatcher:
+    """
+    Embeds document chunks in size- and token-bounded batches.
+
+    Attributes:
+        batch_size (int): Maximum number of texts sent in a single embedding request.
+        max_batch_tokens (int): Approximate maximum number of tokens sent in a single embedding request.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_batch_tokens: Optional[int] = None) -> None:
+        self.batch_size: int = batch_size or settings.embedding_batch_size
+        self.max_batch_tokens: int = max_batch_tokens or settings.embedding_max_batch_tokens
+
+    def embed_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
+        """
+        Compute embeddings for the given chunks and store them on each chunk.
+
+        Args:
+            chunks (List[DocumentChunk]): The chunks to embed, in the order their vectors should be assigned.
+
+        Returns:
+            List[DocumentChunk]: The same chunks, with vectors populated.
+
+        Raises:
+            DocumentProcessingError: If the embedding service does not return one vector per chunk.
+        """
+        for batch in self._batches(chunks):
+            vectors = get_embeddings([chunk.text for chunk in batch])
+            if vectors.shape[0] != len(batch):
+                raise DocumentProcessingError(
+                    f"Expected {len(batch)} embeddings but received {vectors.shape[0]}"
+                )
+            for chunk, vector in zip(batch, vectors):
+                chunk.vectors = vector
+            logger.debug(f"Embedded batch of {len(batch)} chunks")
+        return chunks
+
+    def _batches(self, chunks: List[DocumentChunk]) -> Iterator[List[DocumentChunk]]:
+        """
+        Split chunks into consecutive batches that respect the size and token limits.
+
+        A single chunk larger than the token limit is sent on its own.
+        """
+        batch: List[DocumentChunk] = []
+        batch_tokens = 0
+        for chunk in chunks:
+            chunk_tokens = self.estimate_tokens(chunk.text)
+            if batch and (len(batch) >= self.batch_size or batch_tokens + chunk_tokens > self.max_batch_tokens):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(chunk)
+            batch_tokens += chunk_tokens
+        if batch:
+            yield batch
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Estimate the number of tokens in a text without calling a tokenizer.
+
+        Args:
+            text (str): The text to measure.
+
+        Returns:
+            int: The estimated token count.
+        """
+        return len(text) // CHARS_PER_TOKEN + 1
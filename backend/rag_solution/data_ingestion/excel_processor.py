@@ -1,31 +1,136 @@
 import logging
+import multiprocessing
 import os
+import queue
 import uuid
-from typing import Iterable
+from datetime import date, datetime, time
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
-import pandas as pd
+from openpyxl import load_workbook
 
+from backend.core.config import settings
 from backend.core.custom_exceptions import DocumentProcessingError
 from backend.rag_solution.data_ingestion.base_processor import BaseProcessor
-from backend.rag_solution.doc_utils import get_document
-from backend.vectordbs.data_types import Document
+from backend.rag_solution.data_ingestion.embedding_batcher import EmbeddingBatcher
+from backend.vectordbs.data_types import Document, DocumentChunk, DocumentChunkMetadata, Source
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Seconds between checks that the sheet workers are still alive
+SHEET_POLL_INTERVAL = 1.0
+
+
+def _format_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return " ".join(str(value).split())
+
+
+def iter_sheet_windows(file_path: str, sheet_name: str, rows_per_chunk: int, max_chars: int) -> Iterator[str]:
+    """
+    Stream a sheet as chunk texts of consecutive rows, each repeating the sheet name and header row.
+
+    The sheet is read with openpyxl in read-only mode, so only the current
+    window of rows is held in memory. The first non-empty row is the header.
+
+    Args:
+        file_path (str): The path to the workbook.
+        sheet_name (str): The sheet to read.
+        rows_per_chunk (int): Maximum number of data rows per chunk.
+        max_chars (int): Approximate maximum number of characters of data rows per chunk.
+
+    Yields:
+        str: The text of each row window.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        header: Optional[str] = None
+        window: List[str] = []
+        window_chars = 0
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            cells = [_format_cell(value) for value in row]
+            while cells and not cells[-1]:
+                cells.pop()
+            if not cells:
+                continue
+            line = " | ".join(cells)
+            if header is None:
+                header = line
+                continue
+            if window and (len(window) >= rows_per_chunk or window_chars + len(line) > max_chars):
+                yield f"Sheet: {sheet_name}\n{header}\n" + "\n".join(window)
+                window, window_chars = [], 0
+            window.append(line)
+            window_chars += len(line) + 1
+        if window:
+            yield f"Sheet: {sheet_name}\n{header}\n" + "\n".join(window)
+        elif header is not None:
+            yield f"Sheet: {sheet_name}\n{header}"
+    finally:
+        workbook.close()
+
+
+def _iter_sheet_batches(file_path: str, sheet_name: str, rows_per_chunk: int, max_chars: int,
+                        batch_size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for text in iter_sheet_windows(file_path, sheet_name, rows_per_chunk, max_chars):
+        batch.append(text)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _sheet_worker(file_path: str, sheet_names: List[str], rows_per_chunk: int, max_chars: int,
+                  batch_size: int, results: "multiprocessing.Queue") -> None:
+    """Stream batches of chunk texts of the given sheets to the parent process."""
+    for sheet_name in sheet_names:
+        try:
+            for batch in _iter_sheet_batches(file_path, sheet_name, rows_per_chunk, max_chars, batch_size):
+                # Blocks while the parent is behind, which bounds the memory of every worker
+                results.put(("batch", sheet_name, batch))
+        except Exception as e:
+            results.put(("error", sheet_name, f"{type(e).__name__}: {e}"))
+    results.put(("done", None, None))
+
 
 class ExcelProcessor(BaseProcessor):
     """
     Processor for reading and chunking Excel files.
 
+    Sheets are streamed in windows of rows, and every chunk repeats the sheet
+    name and header row so it can be understood on its own. Workbooks with
+    several sheets are read by up to EXCEL_SHEET_WORKERS processes, one sheet
+    per process at a time. Chunks are embedded in batches of one sheet.
+
+    Attributes:
+        rows_per_chunk (int): Maximum number of data rows per chunk.
+        max_chunk_chars (int): Approximate maximum number of characters of data rows per chunk.
+        sheet_workers (int): Maximum number of sheet reading processes.
+
     Methods:
         process(file_path: str) -> Iterable[Document]: Process the Excel file and yield Document instances.
     """
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.embedding_batcher = EmbeddingBatcher()
+        self.rows_per_chunk: int = settings.excel_rows_per_chunk
+        self.max_chunk_chars: int = settings.excel_chunk_max_chars
+        self.sheet_workers: int = settings.excel_sheet_workers or os.cpu_count() or 1
+
     def process(self, file_path: str) -> Iterable[Document]:
         """
         Process the Excel file and yield Document instances.
 
+        Each document holds one batch of chunks of a single sheet.
+
         Args:
             file_path (str): The path to the Excel file to be processed.
 
@@ -36,25 +141,83 @@ class ExcelProcessor(BaseProcessor):
             DocumentProcessingError: If there is an error processing the Excel file.
         """
         try:
-            sheets_data = pd.read_excel(file_path, sheet_name=None)
-            full_text = []
+            workbook = load_workbook(file_path, read_only=True)
+            sheet_names: List[str] = workbook.sheetnames
+            workbook.close()
 
-            for sheet_name, df in sheets_data.items():
-                full_text.append(f"Sheet: {sheet_name}")
-                full_text.append(df.to_string(index=False))
-                full_text.append("\n")
-
-            text = "\n".join(full_text)
-            chunks = self.chunking_method(text)
-
-            for chunk in chunks:
-                yield get_document(
+            document_id = str(uuid.uuid4())
+            for sheet_name, texts in self._iter_batches(file_path, sheet_names):
+                chunk_metadata = DocumentChunkMetadata(source=Source.OTHER, title=sheet_name, content_type="table",
+                                                       table_index=sheet_names.index(sheet_name))
+                chunks = [DocumentChunk(chunk_id=str(uuid.uuid4()), text=text, metadata=chunk_metadata,
+                                        document_id=document_id)
+                          for text in texts]
+                if self.embed_chunks:
+                    self.embedding_batcher.embed_chunks(chunks)
+                yield Document(
                     name=os.path.basename(file_path),
-                    document_id=str(uuid.uuid4()),
-                    text=chunk,
+                    document_id=document_id,
+                    chunks=chunks,
+                    path=file_path,
+                    metadata=chunk_metadata,
                 )
         except Exception as e:
             logger.error(f"Error reading Excel file {file_path}: {e}", exc_info=True)
             raise DocumentProcessingError(
                 f"Error processing Excel file {file_path}"
             ) from e
+
+    def _iter_batches(self, file_path: str, sheet_names: List[str]) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (sheet name, chunk texts) batches, reading sheets in parallel when there are several."""
+        batch_size = self.embedding_batcher.batch_size
+        workers = min(self.sheet_workers, len(sheet_names))
+        if workers <= 1:
+            for sheet_name in sheet_names:
+                for batch in _iter_sheet_batches(file_path, sheet_name, self.rows_per_chunk,
+                                                 self.max_chunk_chars, batch_size):
+                    yield sheet_name, batch
+            return
+
+        results: "multiprocessing.Queue" = multiprocessing.Queue(maxsize=workers * 2)
+        processes = [
+            multiprocessing.Process(
+                target=_sheet_worker,
+                args=(file_path, sheet_names[i::workers], self.rows_per_chunk, self.max_chunk_chars,
+                      batch_size, results),
+                name=f"excel-sheet-{i}",
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            running = workers
+            while running:
+                try:
+                    kind, sheet_name, payload = results.get(timeout=SHEET_POLL_INTERVAL)
+                except queue.Empty:
+                    self._check_workers(file_path, processes, results)
+                    continue
+                if kind == "done":
+                    running -= 1
+                elif kind == "error":
+                    raise DocumentProcessingError(f"Error reading sheet {sheet_name} of {file_path}: {payload}")
+                else:
+                    yield sheet_name, payload
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    @staticmethod
+    def _check_workers(file_path: str, processes: List[multiprocessing.Process],
+                       results: "multiprocessing.Queue") -> None:
+        """Raise if a sheet worker died, or all exited without reporting back, instead of waiting forever."""
+        for process in processes:
+            if process.exitcode not in (None, 0):
+                raise DocumentProcessingError(
+                    f"Sheet worker {process.name} for {file_path} exited with code {process.exitcode}")
+        # An exited worker has flushed everything it put, so an empty queue now means nothing more will come
+        if not any(process.is_alive() for process in processes) and results.empty():
+            raise DocumentProcessingError(f"Sheet workers for {file_path} exited before reading every sheet")
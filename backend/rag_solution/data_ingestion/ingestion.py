@@ -1,16 +1,23 @@
 import logging
-import os
 import multiprocessing
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from backend.core.config import settings
 from backend.core.custom_exceptions import DocumentStorageError
 from backend.rag_solution.data_ingestion.document_processor import DocumentProcessor
+from backend.rag_solution.data_ingestion.embedding_batcher import EmbeddingBatcher
+from backend.rag_solution.pipeline.response_cache import invalidate_response_cache
 from backend.vectordbs.data_types import Document, DocumentChunk, DocumentChunkMetadata, Source
 from backend.vectordbs.factory import get_datastore
+from backend.vectordbs.utils.watsonx import get_embedding_cache_stats
 from backend.vectordbs.vector_store import VectorStore
-from typing import List
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,48 +27,320 @@ DATA_DIR = settings.data_dir
 VECTOR_DB = settings.vector_db
 COLLECTION_NAME = settings.collection_name
 MAX_RETRIES = 3  # Maximum number of retries for storing a document
+DEFAULT_UPSERT_BATCH_SIZE = 100
+
+# Number of documents a parsing worker sends back at once
+PARSE_RESULT_BATCH_SIZE = 8
+# Seconds between checks for parsing workers that died without reporting back
+PARSE_POLL_INTERVAL = 1.0
+
+# Marks the end of the stream on the queues between pipeline stages
+_END_OF_STREAM = None
+
+# Messages sent by parsing workers: (kind, task ID, payload)
+_PARSED = "parsed"  # payload: a batch of documents
+_PARSE_FAILED = "failed"  # payload: the error message
+_PARSE_DONE = "done"  # payload: None, always the last message of a file
+
+# Document processor and result queue of the current parsing worker process, set by _init_parser_worker
+_worker_processor: Optional[DocumentProcessor] = None
+_worker_results: Optional["queue.Queue[Tuple[str, int, Any]]"] = None
+
+
+def _init_parser_worker(results: "queue.Queue[Tuple[str, int, Any]]", max_workers: int) -> None:
+    """
+    Create the document processor once per parsing worker process.
+
+    max_workers caps the page or sheet processes the worker may start for one file, its share of the CPUs.
+    """
+    global _worker_processor, _worker_results
+    _worker_processor = DocumentProcessor(embed=False, max_workers=max_workers)
+    _worker_results = results
+
+
+def _parse_file(task_id: int, file_path: str) -> None:
+    """
+    Parse and chunk a single file in a worker process, without computing embeddings.
 
+    Documents are sent back in batches of PARSE_RESULT_BATCH_SIZE as they are produced, so a large
+    file is never held or pickled as a whole. The bounded result queue blocks the worker while the
+    embedding stage is behind.
+    """
+    try:
+        batch: List[Document] = []
+        for document in _worker_processor.process_document(file_path) or []:
+            batch.append(document)
+            if len(batch) >= PARSE_RESULT_BATCH_SIZE:
+                _worker_results.put((_PARSED, task_id, batch))
+                batch = []
+        if batch:
+            _worker_results.put((_PARSED, task_id, batch))
+    except Exception as e:
+        _worker_results.put((_PARSE_FAILED, task_id, str(e)))
+    finally:
+        _worker_results.put((_PARSE_DONE, task_id, None))
+
+
+@dataclass
+class IngestionResult:
+    """
+    Outcome of an ingestion run.
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
-def process_and_store_document(document: Document, vector_store: VectorStore, collection_name: str) -> None:
+    Attributes:
+        documents_stored (int): Number of documents written to the vector store.
+        failed_files (Dict[str, str]): Files that could not be parsed, with the error.
+        failed_documents (Dict[str, str]): Documents that could not be embedded or stored, with the first
+            error, by source file path (or document ID for documents without a path).
+        flush_error (Optional[str]): The error of the final flush of the vector store, if it failed.
     """
-    Process and store a document in the vector store.
+    documents_stored: int = 0
+    failed_files: Dict[str, str] = field(default_factory=dict)
+    failed_documents: Dict[str, str] = field(default_factory=dict)
+    flush_error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failed_files and not self.failed_documents and self.flush_error is None
+
+
+@retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_exponential(multiplier=1, min=1, max=10))
+def process_and_store_documents(documents: List[Document], vector_store: VectorStore, collection_name: str) -> None:
+    """
+    Store a batch of documents in the vector store with a single add_documents call.
 
     Args:
-        document (Document): The document to process and store.
+        documents (List[Document]): The documents to store.
         vector_store (VectorStore): The vector store to use for storage.
-        collection_name (str): The name of the collection to store the document in.
+        collection_name (str): The name of the collection to store the documents in.
 
     Raises:
-        DocumentStorageError: If there is an error processing or storing the document.
+        DocumentStorageError: If there is an error storing the documents.
     """
     try:
-        logger.info(f"Attempting to store documents in collection {collection_name}")
-        vector_store.add_documents(collection_name, [document])
+        logger.info(f"Attempting to store {len(documents)} documents in collection {collection_name}")
+        vector_store.add_documents(collection_name, documents)
     except Exception as e:
-        logger.error(f"Error processing document {e}", exc_info=True)
+        logger.error(f"Error storing documents {e}", exc_info=True)
         raise DocumentStorageError(f"error: {e}")
 
-def ingest_documents(data_dir: List[str], vector_store: VectorStore, collection_name: str) -> None:
-    with multiprocessing.Manager() as manager:
-        processor = DocumentProcessor(manager)
-        
-        for file_path in data_dir:
-            logger.info(f"Trying to process {file_path}")
-            try:
-                # Process the document
-                documents_iterator = processor.process_document(file_path)
-                logger.info("*** Finished processing and chunking. Now store in VectorDB")
-
-                for document in documents_iterator:
-                    process_and_store_document(document, vector_store, collection_name)
-
-                logger.info(f"Successfully processed {file_path}")
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {str(e)}")
-    
-    logger.info(f"Completed ingestion for collection: {collection_name}")
-    # TO-DO: Add multithreading
+
+class IngestionPipeline:
+    """
+    Streaming ingestion pipeline with bounded queues between its stages.
+
+    Stages:
+        1. Parsing and chunking: files are processed in a process pool. At most
+           twice the number of workers files are in flight at once.
+        2. Embedding: worker threads collect chunks into batches and embed them
+           with an EmbeddingBatcher.
+        3. Storage: a single thread groups embedded documents and upserts them
+           with one add_documents call per upsert batch.
+
+    Every queue is bounded, so a slow stage blocks the stages feeding it and
+    memory stays flat regardless of corpus size.
+
+    Attributes:
+        vector_store (VectorStore): The vector store to write to.
+        collection_name (str): The collection to write to.
+        parse_workers (int): Number of parsing processes.
+        embedding_workers (int): Number of embedding threads.
+        queue_size (int): Maximum number of documents buffered between two stages.
+        upsert_batch_size (int): Number of chunks sent per add_documents call.
+    """
+
+    def __init__(self, vector_store: VectorStore, collection_name: str,
+                 parse_workers: Optional[int] = None,
+                 embedding_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None,
+                 upsert_batch_size: Optional[int] = None) -> None:
+        self.vector_store = vector_store
+        self.collection_name = collection_name
+        self.parse_workers: int = parse_workers or settings.ingestion_parse_workers or os.cpu_count() or 1
+        self.embedding_workers: int = embedding_workers or settings.ingestion_embedding_workers
+        self.queue_size: int = queue_size or settings.ingestion_queue_size
+        self.upsert_batch_size: int = upsert_batch_size or settings.upsert_batch_size or DEFAULT_UPSERT_BATCH_SIZE
+        self.embedding_batcher = EmbeddingBatcher()
+        self._embed_queue: "queue.Queue[Optional[Document]]" = queue.Queue(maxsize=self.queue_size)
+        self._store_queue: "queue.Queue[Optional[Document]]" = queue.Queue(maxsize=self.queue_size)
+        self._result = IngestionResult()
+        self._result_lock = threading.Lock()
+
+    def run(self, file_paths: List[str]) -> IngestionResult:
+        """
+        Ingest the given files and block until every stage has drained.
+
+        Args:
+            file_paths (List[str]): The files to ingest.
+
+        Returns:
+            IngestionResult: The number of stored documents and every file or document that failed.
+        """
+        self._result = IngestionResult()
+        parser = threading.Thread(target=self._parse_stage, args=(file_paths,), name="ingest-parse")
+        embedders = [threading.Thread(target=self._embed_stage, name=f"ingest-embed-{i}")
+                     for i in range(self.embedding_workers)]
+        store = threading.Thread(target=self._store_stage, name="ingest-store")
+
+        # Stores may tune the collection for bulk writes until every stage has drained
+        with self.vector_store.bulk_load(self.collection_name):
+            for thread in [parser, *embedders, store]:
+                thread.start()
+
+            parser.join()
+            for embedder in embedders:
+                embedder.join()
+            self._store_queue.put(_END_OF_STREAM)
+            store.join()
+
+        try:
+            self.vector_store.flush(self.collection_name)
+        except Exception as e:
+            logger.error(f"Error flushing collection {self.collection_name}: {e}")
+            self._result.flush_error = str(e)
+        # Answers cached before these documents were added may be incomplete now
+        invalidate_response_cache(self.collection_name)
+        return self._result
+
+    def _parse_stage(self, file_paths: List[str]) -> None:
+        """Parse files in a process pool and feed the resulting documents to the embedding stage."""
+        try:
+            # A manager queue, unlike multiprocessing.Queue, has delivered a message once put() returns,
+            # so a worker that is terminated never loses the results it already sent
+            with multiprocessing.Manager() as manager:
+                self._parse_files(file_paths, manager.Queue(maxsize=self.parse_workers * 2))
+        finally:
+            # Always release the embedding threads, even if the pool fails
+            for _ in range(self.embedding_workers):
+                self._embed_queue.put(_END_OF_STREAM)
+
+    def _parse_files(self, file_paths: List[str], results: "queue.Queue[Tuple[str, int, Any]]") -> None:
+        paths = enumerate(file_paths)
+        # Files being parsed, by task ID
+        in_flight: Dict[int, Tuple[str, Future]] = {}
+
+        # The CPUs are split between the parsing workers; with the default of one worker per CPU,
+        # PDF pages and workbook sheets are parsed inside the worker
+        file_workers = max(1, (os.cpu_count() or 1) // self.parse_workers)
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parser_worker,
+                                 initargs=(results, file_workers)) as executor:
+            def submit_next() -> None:
+                for task_id, file_path in paths:
+                    logger.info(f"Trying to process {file_path}")
+                    try:
+                        in_flight[task_id] = (file_path, executor.submit(_parse_file, task_id, file_path))
+                        return
+                    except BrokenProcessPool as e:
+                        self._parse_failed(file_path, str(e))
+
+            for _ in range(self.parse_workers * 2):
+                submit_next()
+
+            while in_flight:
+                try:
+                    kind, task_id, payload = results.get(timeout=PARSE_POLL_INTERVAL)
+                except queue.Empty:
+                    # A worker that died (e.g. killed for running out of memory) never reports back
+                    for task_id, (file_path, future) in list(in_flight.items()):
+                        if future.done() and future.exception() is not None:
+                            del in_flight[task_id]
+                            self._parse_failed(file_path, str(future.exception()))
+                            submit_next()
+                    continue
+                if task_id not in in_flight:
+                    continue
+                file_path = in_flight[task_id][0]
+                if kind == _PARSED:
+                    for document in payload:
+                        # Blocks while the embedding stage is behind
+                        self._embed_queue.put(document)
+                elif kind == _PARSE_FAILED:
+                    self._parse_failed(file_path, payload)
+                else:
+                    del in_flight[task_id]
+                    logger.info(f"Finished processing {file_path}")
+                    submit_next()
+
+    def _parse_failed(self, file_path: str, error: str) -> None:
+        logger.error(f"Error processing {file_path}: {error}")
+        with self._result_lock:
+            self._result.failed_files[file_path] = error
+
+    def _documents_failed(self, documents: List[Document], error: Exception) -> None:
+        with self._result_lock:
+            for document in documents:
+                # All documents of a file (e.g. the pages of a PDF) share its path and document ID
+                self._result.failed_documents.setdefault(document.path or document.document_id, str(error))
+
+    def _embed_stage(self) -> None:
+        """Collect documents into embedding batches and forward embedded documents to the storage stage."""
+        batch: List[Document] = []
+        batch_chunks = 0
+        while True:
+            document = self._embed_queue.get()
+            if document is _END_OF_STREAM:
+                break
+            batch.append(document)
+            batch_chunks += len(document.chunks)
+            if batch_chunks >= self.embedding_batcher.batch_size:
+                self._embed_and_forward(batch)
+                batch, batch_chunks = [], 0
+        self._embed_and_forward(batch)
+
+    def _embed_and_forward(self, documents: List[Document]) -> None:
+        if not documents:
+            return
+        chunks: List[DocumentChunk] = [chunk for document in documents for chunk in document.chunks
+                                       if chunk.vectors is None]
+        try:
+            self.embedding_batcher.embed_chunks(chunks)
+        except Exception as e:
+            names = sorted({document.name for document in documents})
+            logger.error(f"Error embedding {len(chunks)} chunks from {names}: {e}", exc_info=True)
+            self._documents_failed(documents, e)
+            return
+        for document in documents:
+            self._store_queue.put(document)
+
+    def _store_stage(self) -> None:
+        """Group embedded documents into upsert batches and write them to the vector store."""
+        batch: List[Document] = []
+        batch_chunks = 0
+        while True:
+            document = self._store_queue.get()
+            if document is _END_OF_STREAM:
+                break
+            batch.append(document)
+            batch_chunks += len(document.chunks)
+            if batch_chunks >= self.upsert_batch_size:
+                self._store(batch)
+                batch, batch_chunks = [], 0
+        self._store(batch)
+
+    def _store(self, documents: List[Document]) -> None:
+        if not documents:
+            return
+        try:
+            process_and_store_documents(documents, self.vector_store, self.collection_name)
+        except Exception as e:
+            logger.error(f"Error storing {len(documents)} documents in {self.collection_name}: {e}")
+            self._documents_failed(documents, e)
+            return
+        with self._result_lock:
+            self._result.documents_stored += len(documents)
+
+
+def ingest_documents(data_dir: List[str], vector_store: VectorStore, collection_name: str) -> IngestionResult:
+    result = IngestionPipeline(vector_store, collection_name).run(data_dir)
+
+    logger.info(f"Completed ingestion for collection: {collection_name}, "
+                f"stored {result.documents_stored} documents")
+    if not result.succeeded:
+        logger.error(f"Ingestion into {collection_name} failed for {len(result.failed_files)} files "
+                     f"and {len(result.failed_documents)} documents")
+    cache_stats = get_embedding_cache_stats()
+    if cache_stats:
+        logger.info(f"Embedding cache stats: {cache_stats}")
+    return result
 
 
 def main() -> None:
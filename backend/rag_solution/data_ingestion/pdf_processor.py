@@ -1,8 +1,8 @@
-import hashlib
 import logging
 import os
 import uuid
-from typing import List, Dict, Any, Optional, Iterable
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple
 import re
 import multiprocessing
 import concurrent.futures
@@ -10,27 +10,75 @@ from multiprocessing.managers import SyncManager
 
 import pymupdf
 
+from backend.core.config import settings
 from backend.core.custom_exceptions import DocumentProcessingError
 from backend.rag_solution.data_ingestion.base_processor import BaseProcessor
 from backend.rag_solution.data_ingestion.chunking import get_chunking_method
+from backend.rag_solution.data_ingestion.embedding_batcher import EmbeddingBatcher
+from backend.rag_solution.data_ingestion.image_store import ImageStore, image_hash
 from backend.rag_solution.doc_utils import clean_text
 from backend.vectordbs.data_types import Document, DocumentChunk, DocumentChunkMetadata, Source
-from backend.vectordbs.utils.watsonx import get_embeddings
 
 logger = logging.getLogger(__name__)
 
+# Text extraction without decoding the image blocks; images are extracted separately by xref
+TEXT_FLAGS = pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES
+# Drawn segments thinner than this (in points) count as ruling lines
+RULING_LINE_TOLERANCE = 1.5
+# Ruling lines shorter than this (in points) are ignored
+RULING_LINE_MIN_LENGTH = 10.0
+
+# Open document and processor of the current page worker process, set by _init_page_worker
+_worker_doc: Optional[pymupdf.Document] = None
+_worker_processor: Optional["PdfProcessor"] = None
+
+
+def _init_page_worker(file_path: str) -> None:
+    """Open the PDF once per page worker process."""
+    global _worker_doc, _worker_processor
+    _worker_doc = pymupdf.open(file_path)
+    _worker_processor = PdfProcessor()
+
+
+def _process_page_range(start: int, stop: int, document_id: str) -> List[Tuple[int, List[DocumentChunk]]]:
+    """Process pages [start, stop) of the worker's open PDF."""
+    return [(page_num, _worker_processor.process_page(_worker_doc, page_num, document_id))
+            for page_num in range(start, stop)]
+
+
 class PdfProcessor(BaseProcessor):
+    """
+    Processor for PDF files.
+
+    Large PDFs are parsed in a process pool: each worker opens the file once and
+    processes contiguous page ranges, and results are yielded in page order.
+
+    Images are stored once in the shared ImageStore under IMAGE_STORE_DIR, and
+    each document gets one chunk per distinct image however often it repeats.
+
+    Args:
+        manager (Optional[SyncManager]): Unused. Image deduplication goes through the
+            image store, which is shared by all processes without a manager.
+
+    Attributes:
+        image_store (ImageStore): The content-addressed image store.
+        page_workers (int): Number of page parsing processes.
+        pages_per_task (int): Maximum number of pages a worker processes per task.
+        parallel_min_pages (int): PDFs with fewer pages are parsed in the calling process.
+    """
+
     def __init__(self, manager: Optional[SyncManager] = None) -> None:
         super().__init__()
-        if manager is None:
-            manager = multiprocessing.Manager()
-        self.saved_image_hashes = set(manager.list())
+        self.image_store = ImageStore(settings.image_store_dir
+                                      or os.path.join(settings.file_storage_path, "extracted_images"))
+        # Stored image path of each image xref of the open document
+        self._xref_images: Dict[int, str] = {}
+        self.embedding_batcher = EmbeddingBatcher()
+        self.page_workers: int = settings.pdf_page_workers or os.cpu_count() or 1
+        self.pages_per_task: int = settings.pdf_pages_per_task
+        self.parallel_min_pages: int = settings.pdf_parallel_min_pages
 
     def process(self, file_path: str) -> Iterable[Document]:
-        output_folder: str = os.path.join(os.path.dirname(file_path), "extracted_images")
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
-
         try:
             with pymupdf.open(file_path) as doc:
                 metadata: Dict[str, Any] = self.extract_metadata(doc)
@@ -38,84 +86,163 @@ class PdfProcessor(BaseProcessor):
 
                 document_id = str(uuid.uuid4())
 
-                with concurrent.futures.ThreadPoolExecutor(max_workers=multiprocessing.cpu_count()) as executor:
-                    future_to_page = {executor.submit(self.process_page, page_num, file_path, output_folder, document_id): page_num 
-                                      for page_num in range(len(doc))}
-                    
-                    for future in concurrent.futures.as_completed(future_to_page):
-                        page_num = future_to_page[future]
-                        try:
-                            chunks = future.result()
-                            if chunks:
-                                yield Document(
-                                    name=os.path.basename(file_path),
-                                    document_id=document_id,
-                                    chunks=chunks,
-                                    path=file_path,
-                                    metadata=DocumentChunkMetadata(**metadata, page_number=page_num+1)
-                                )
-                        except Exception as e:
-                            logger.error(f"Error processing page {page_num} of {file_path}: {e}", exc_info=True)
+                # Pages are buffered until enough chunks are pending to fill an
+                # embedding batch, so vectors are requested per batch rather than per chunk.
+                pending_documents: List[Document] = []
+                pending_chunks = 0
+                seen_images: Set[str] = set()
+
+                for page_num, chunks in self.iter_pages(doc, file_path, document_id):
+                    chunks = self._drop_repeated_images(chunks, seen_images)
+                    if chunks:
+                        pending_documents.append(Document(
+                            name=os.path.basename(file_path),
+                            document_id=document_id,
+                            chunks=chunks,
+                            path=file_path,
+                            metadata=DocumentChunkMetadata(**metadata, page_number=page_num+1)
+                        ))
+                        pending_chunks += len(chunks)
+
+                    if pending_chunks >= self.embedding_batcher.batch_size:
+                        yield from self.embed_documents(pending_documents)
+                        pending_documents, pending_chunks = [], 0
+
+                yield from self.embed_documents(pending_documents)
         except Exception as e:
             logger.error(f"Error reading PDF file {file_path}: {e}", exc_info=True)
             raise DocumentProcessingError(f"Error processing PDF file {file_path}") from e
 
-    def process_page(self, page_number: int, file_path: str, output_folder: str, document_id: str) -> List[DocumentChunk]:
+    def iter_pages(self, doc: pymupdf.Document, file_path: str,
+                   document_id: str) -> Iterator[Tuple[int, List[DocumentChunk]]]:
+        """
+        Process every page of an open PDF and yield its chunks in page order.
+
+        Pages that fail to process are logged and yield no chunks.
+
+        Args:
+            doc (pymupdf.Document): The open PDF.
+            file_path (str): The path of the PDF, opened once by each worker process.
+            document_id (str): The ID of the document the chunks belong to.
+
+        Yields:
+            Tuple[int, List[DocumentChunk]]: The zero-based page number and the chunks of the page.
+        """
+        self._xref_images = {}
+        page_count = len(doc)
+        workers = min(self.page_workers, page_count)
+        if workers <= 1 or page_count < self.parallel_min_pages:
+            for page_num in range(page_count):
+                try:
+                    yield page_num, self.process_page(doc, page_num, document_id)
+                except Exception as e:
+                    logger.error(f"Error processing page {page_num} of {file_path}: {e}", exc_info=True)
+                    yield page_num, []
+            return
+
+        # Small enough tasks to balance the load, large enough to amortize the round trips
+        pages_per_task = max(1, min(self.pages_per_task, -(-page_count // workers)))
+        ranges = iter([(start, min(start + pages_per_task, page_count))
+                       for start in range(0, page_count, pages_per_task)])
+        in_flight: Deque[Tuple[int, int, concurrent.futures.Future]] = deque()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                                                    initargs=(file_path,)) as executor:
+            def submit_next() -> None:
+                page_range = next(ranges, None)
+                if page_range is not None:
+                    start, stop = page_range
+                    in_flight.append((start, stop, executor.submit(_process_page_range, start, stop,
+                                                                   document_id)))
+
+            # At most two tasks per worker are in flight, so results waiting on an earlier range stay bounded
+            for _ in range(workers * 2):
+                submit_next()
+
+            while in_flight:
+                start, stop, future = in_flight.popleft()
+                try:
+                    page_results = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing pages {start}-{stop - 1} of {file_path}: {e}", exc_info=True)
+                    page_results = [(page_num, []) for page_num in range(start, stop)]
+                submit_next()
+                yield from page_results
+
+    def embed_documents(self, documents: List[Document]) -> Iterable[Document]:
+        """
+        Embed all chunks of the given page documents in batches and yield the documents.
+
+        Args:
+            documents (List[Document]): Page documents whose chunks have no vectors yet.
+
+        Yields:
+            Document: Each input document, with vectors populated on its chunks unless embed_chunks is False.
+        """
+        if not documents:
+            return
+        if self.embed_chunks:
+            self.embedding_batcher.embed_chunks([chunk for document in documents for chunk in document.chunks])
+        yield from documents
+
+    def process_page(self, doc: pymupdf.Document, page_number: int, document_id: str) -> List[DocumentChunk]:
+        """
+        Extract and chunk the text, tables and images of a single page of an open PDF.
+
+        The page text is extracted once and shared by the text and table extraction.
+        The returned chunks have no vectors; they are embedded in batches by embed_documents.
+        """
         chunks: List[DocumentChunk] = []
         chunking_method = get_chunking_method()
 
-        with pymupdf.open(file_path) as doc:
-            page: pymupdf.Page = doc.load_page(page_number)
-            page_content: List[Dict[str, Any]] = self.extract_text_from_page(page)
-            tables: List[List[List[str]]] = self.extract_tables_from_page(page)
+        page: pymupdf.Page = doc.load_page(page_number)
+        page_content: List[Dict[str, Any]] = self.extract_text_from_page(page)
+        tables: List[List[List[str]]] = self.extract_tables_from_page(page, page_content)
 
-            text_blocks: List[str] = [block["content"] for block in page_content if block["type"] == "text"]
-            full_text: str = "\n".join(text_blocks)
+        text_blocks: List[str] = [block["content"] for block in page_content if block["type"] == "text"]
+        full_text: str = "\n".join(text_blocks)
 
-            page_metadata = {
-                'page_number': page_number + 1,
-                'source': Source.PDF
-            }
+        page_metadata = {
+            'page_number': page_number + 1,
+            'source': Source.PDF
+        }
 
-            # Process main text
-            text_chunks = chunking_method(full_text)
-            for chunk_text in text_chunks:
-                chunk_embedding = get_embeddings(chunk_text)
-                chunk_metadata = {
-                    **page_metadata,
-                    'content_type': 'text',
-                }
-                chunks.append(self.create_document_chunk(chunk_text, chunk_embedding, chunk_metadata, document_id))
-
-            # Process tables
-            if tables:
-                for table_index, table in enumerate(tables):
-                    table_text = "\n".join([" | ".join(row) for row in table])
-                    table_chunks = chunking_method(table_text)
-                    for table_chunk in table_chunks:
-                        table_embedding = get_embeddings(table_chunk)
-                        chunk_metadata = {
-                            **page_metadata,
-                            'content_type': 'table',
-                            'table_index': table_index
-                        }
-                        chunks.append(self.create_document_chunk(table_chunk, table_embedding, chunk_metadata, document_id))
-
-            # Process images
-            images: List[str] = self.extract_images_from_page(page, output_folder)
-            for img_index, img in enumerate(images):
-                chunk_metadata = {
-                    **page_metadata,
-                    'content_type': 'image',
-                    'image_index': img_index
-                }
-                image_text = f"Image: {img}"
-                image_embedding = get_embeddings(image_text)
-                chunks.append(self.create_document_chunk(image_text, image_embedding, chunk_metadata, document_id))
+        # Process main text
+        text_chunks = chunking_method(full_text)
+        for chunk_text in text_chunks:
+            chunk_metadata = {
+                **page_metadata,
+                'content_type': 'text',
+            }
+            chunks.append(self.create_document_chunk(chunk_text, None, chunk_metadata, document_id))
+
+        # Process tables
+        if tables:
+            for table_index, table in enumerate(tables):
+                table_text = "\n".join([" | ".join(row) for row in table])
+                table_chunks = chunking_method(table_text)
+                for table_chunk in table_chunks:
+                    chunk_metadata = {
+                        **page_metadata,
+                        'content_type': 'table',
+                        'table_index': table_index
+                    }
+                    chunks.append(self.create_document_chunk(table_chunk, None, chunk_metadata, document_id))
+
+        # Process images
+        images: List[str] = self.extract_images_from_page(page)
+        for img_index, img in enumerate(images):
+            chunk_metadata = {
+                **page_metadata,
+                'content_type': 'image',
+                'image_index': img_index
+            }
+            image_text = f"Image: {img}"
+            chunks.append(self.create_document_chunk(image_text, None, chunk_metadata, document_id))
 
         return chunks
 
-    def create_document_chunk(self, chunk_text: str, chunk_embedding: List[float], metadata: Dict[str, Any], document_id: str) -> DocumentChunk:
+    def create_document_chunk(self, chunk_text: str, chunk_embedding: Optional[List[float]], metadata: Dict[str, Any], document_id: str) -> DocumentChunk:
         chunk_id = str(uuid.uuid4())
         return DocumentChunk(
             chunk_id=chunk_id,
@@ -126,7 +253,7 @@ class PdfProcessor(BaseProcessor):
         )
 
     def extract_text_from_page(self, page: pymupdf.Page) -> List[Dict[str, Any]]:
-        blocks: List[Dict[str, Any]] = page.get_text("dict")["blocks"]
+        blocks: List[Dict[str, Any]] = page.get_text("dict", flags=TEXT_FLAGS)["blocks"]
         page_text: List[Dict[str, Any]] = []
 
         for block in blocks:
@@ -142,7 +269,9 @@ class PdfProcessor(BaseProcessor):
                             "color": span["color"],
                             "bbox": span["bbox"]
                         })
-                
+                if not block_text:
+                    continue
+
                 full_text: str = " ".join([span["text"] for span in block_text])
                 block_bbox: List[float] = block["bbox"]
                 
@@ -163,11 +292,83 @@ class PdfProcessor(BaseProcessor):
 
         return page_text
 
-    def extract_tables_from_page(self, page: pymupdf.Page) -> List[List[List[str]]]:
+    @staticmethod
+    def has_ruling_lines(page: pymupdf.Page) -> bool:
+        """
+        Check whether the page draws a grid of horizontal and vertical lines.
+
+        find_tables() builds tables from ruling lines, so it can only find a
+        table on pages where this holds. Rules are counted by distinct position,
+        and rectangles contribute their four edges, since boxed cells and cell
+        backgrounds are often drawn as rectangles. A grid needs at least two
+        horizontal and two vertical rules plus one inner rule, so a single box,
+        e.g. a frame around a paragraph, is not taken for a table.
+        """
+        rows: Set[int] = set()
+        columns: Set[int] = set()
+
+        def add_segment(x0: float, y0: float, x1: float, y1: float) -> None:
+            width, height = abs(x1 - x0), abs(y1 - y0)
+            if height <= RULING_LINE_TOLERANCE and width >= RULING_LINE_MIN_LENGTH:
+                rows.add(round((y0 + y1) / 2))
+            elif width <= RULING_LINE_TOLERANCE and height >= RULING_LINE_MIN_LENGTH:
+                columns.add(round((x0 + x1) / 2))
+
+        for path in page.get_cdrawings():
+            for item in path["items"]:
+                if item[0] == "l":
+                    (x0, y0), (x1, y1) = item[1], item[2]
+                    add_segment(x0, y0, x1, y1)
+                elif item[0] == "re":
+                    x0, y0, x1, y1 = item[1]
+                    if abs(y1 - y0) <= RULING_LINE_TOLERANCE or abs(x1 - x0) <= RULING_LINE_TOLERANCE:
+                        add_segment(x0, y0, x1, y1)  # A thin rectangle is drawn as a line
+                    else:
+                        for edge in ((x0, y0, x1, y0), (x0, y1, x1, y1), (x0, y0, x0, y1), (x1, y0, x1, y1)):
+                            add_segment(*edge)
+                else:
+                    continue
+                if len(rows) >= 2 and len(columns) >= 2 and (len(rows) >= 3 or len(columns) >= 3):
+                    return True
+        return False
+
+    @staticmethod
+    def _words_from_spans(page_content: List[Dict[str, Any]]) -> List[Tuple[float, float, str]]:
+        """
+        Split the text spans of extract_text_from_page into (x, y, word) tuples.
+
+        The x position of a word is interpolated within its span, which is close
+        enough for grid detection and saves a second text extraction of the page.
+        """
+        words: List[Tuple[float, float, str]] = []
+        for block in page_content:
+            if block["type"] != "text":
+                continue
+            for span in block["spans"]:
+                text = span["text"]
+                x0, y0, x1, _ = span["bbox"]
+                char_width = (x1 - x0) / len(text) if text else 0.0
+                for match in re.finditer(r"\S+", text):
+                    words.append((x0 + match.start() * char_width, y0, match.group()))
+        return words
+
+    def extract_tables_from_page(self, page: pymupdf.Page,
+                                 page_content: Optional[List[Dict[str, Any]]] = None) -> List[List[List[str]]]:
+        """
+        Extract tables from a page.
+
+        Args:
+            page (pymupdf.Page): The page.
+            page_content (Optional[List[Dict[str, Any]]]): The result of extract_text_from_page for the
+                page, if the caller already has it.
+
+        Returns:
+            List[List[List[str]]]: The tables as rows of cells.
+        """
         tables: List[List[List[str]]] = []
 
-        # Method 1: Use PyMuPDF's built-in table extraction
-        built_in_tables = page.find_tables()
+        # Method 1: Use PyMuPDF's built-in table extraction, on pages with ruling lines only
+        built_in_tables = page.find_tables() if self.has_ruling_lines(page) else []
         for table in built_in_tables:
             extracted_table = table.extract()
             cleaned_table: List[List[str]] = [
@@ -179,7 +380,9 @@ class PdfProcessor(BaseProcessor):
 
         # Method 2: Use text blocks to identify potential tables
         if not tables:
-            text_blocks: List[Dict[str, Any]] = self.extract_text_from_page(page)
+            if page_content is None:
+                page_content = self.extract_text_from_page(page)
+            text_blocks: List[Dict[str, Any]] = page_content
             potential_table: List[List[str]] = []
             for block in text_blocks:
                 if block["type"] == "text":
@@ -197,15 +400,16 @@ class PdfProcessor(BaseProcessor):
 
         # Method 3: Look for grid-like structures
         if not tables:
-            words: List[tuple] = page.get_text("words")
+            if page_content is None:
+                page_content = self.extract_text_from_page(page)
             grid: Dict[int, Dict[int, str]] = {}
-            for word in words:
-                x, y = int(word[0]), int(word[1])
+            for word_x, word_y, word in self._words_from_spans(page_content):
+                x, y = int(word_x), int(word_y)
                 if y not in grid:
                     grid[y] = {}
                 if x not in grid[y]:
                     grid[y][x] = ""
-                grid[y][x] += word[4] + " "
+                grid[y][x] += word + " "
 
             if len(grid) > 1:
                 table: List[List[str]] = []
@@ -223,35 +427,61 @@ class PdfProcessor(BaseProcessor):
 
         return tables
 
-    def extract_images_from_page(self, page: pymupdf.Page, output_folder: str) -> List[str]:
+    def extract_images_from_page(self, page: pymupdf.Page) -> List[str]:
+        """
+        Store the images of a page in the image store.
+
+        Images are identified by a hash of their raw PDF stream, so an image that
+        is already stored is neither decoded nor written again, and an xref seen
+        on an earlier page of the document is not even re-read.
+
+        Returns:
+            List[str]: The stored path of each distinct image on the page.
+        """
         image_list: List[tuple] = page.get_images(full=True)
         images: List[str] = []
 
         for img_index, img in enumerate(image_list, start=1):
             xref: int = img[0]
             try:
-                base_image: Optional[Dict[str, Any]] = page.parent.extract_image(xref)
-                if base_image:
-                    image_bytes: bytes = base_image["image"]
-                    image_hash: str = hashlib.md5(image_bytes).hexdigest()
-
-                    if image_hash not in self.saved_image_hashes:
-                        image_extension: str = base_image["ext"]
-                        image_filename: str = f"{output_folder}/image_{page.number + 1}_{img_index}.{image_extension}"
-                        with open(image_filename, "wb") as img_file:
-                            img_file.write(image_bytes)
-                        images.append(image_filename)
-                        self.saved_image_hashes.add(image_hash)
-                        logger.info(f"Saved new image: {image_filename}")
-                    else:
-                        logger.info(f"Skipped duplicate image on page {page.number + 1}, image index {img_index}")
-                else:
-                    logger.warning(f"Failed to extract image {xref} from page {page.number + 1}")
+                path = self._xref_images.get(xref)
+                if path is None:
+                    raw: Optional[bytes] = page.parent.xref_stream_raw(xref)
+                    base_image: Optional[Dict[str, Any]] = None
+                    if not raw:
+                        base_image = page.parent.extract_image(xref)
+                        raw = base_image["image"] if base_image else None
+                    if not raw:
+                        logger.warning(f"Failed to extract image {xref} from page {page.number + 1}")
+                        continue
+                    key = image_hash(raw)
+                    path = self.image_store.get(key)
+                    if path is None:
+                        base_image = base_image or page.parent.extract_image(xref)
+                        if not base_image:
+                            logger.warning(f"Failed to extract image {xref} from page {page.number + 1}")
+                            continue
+                        path = self.image_store.put(key, base_image["image"], base_image["ext"])
+                    self._xref_images[xref] = path
+                if path not in images:
+                    images.append(path)
             except Exception as e:
                 logger.error(f"Error extracting image {xref} from page {page.number + 1}: {e}")
 
         return images
 
+    @staticmethod
+    def _drop_repeated_images(chunks: List[DocumentChunk], seen_images: Set[str]) -> List[DocumentChunk]:
+        """Drop image chunks of images that an earlier page of the document already produced."""
+        kept = []
+        for chunk in chunks:
+            if chunk.metadata and chunk.metadata.content_type == "image":
+                if chunk.text in seen_images:
+                    continue
+                seen_images.add(chunk.text)
+            kept.append(chunk)
+        return kept
+
     def extract_metadata(self, doc: pymupdf.Document) -> Dict[str, Any]:
         metadata: Dict[str, Optional[str]] = doc.metadata
         return {
@@ -0,0 +1,119 @@
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional
+
+from backend.core.config import settings
+from backend.vectordbs.utils.watsonx import get_tokenization
+
+logger = logging.getLogger(__name__)
+
+
+class Tokenizer(ABC):
+    """Abstract base class for tokenizer backends used by chunking and context assembly."""
+
+    @abstractmethod
+    def tokenize(self, texts: List[str]) -> List[List[str]]:
+        """
+        Tokenize a list of texts.
+
+        Args:
+            texts (List[str]): The texts to tokenize.
+
+        Returns:
+            List[List[str]]: The tokens of each text, in input order.
+        """
+        pass
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count the tokens of each text.
+
+        Args:
+            texts (List[str]): The texts to measure.
+
+        Returns:
+            List[int]: The token count of each text, in input order.
+        """
+        return [len(tokens) for tokens in self.tokenize(texts)]
+
+
+class WatsonXTokenizer(Tokenizer):
+    """Remote tokenizer that calls the WatsonX tokenization endpoint in one batched request."""
+
+    def tokenize(self, texts: List[str]) -> List[List[str]]:
+        if not texts:
+            return []
+        tokens = get_tokenization(texts)
+        if len(tokens) != len(texts):
+            raise ValueError(f"Expected tokens for {len(texts)} texts but received {len(tokens)}")
+        return tokens
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """
+    Local tokenizer backed by the HuggingFace `tokenizers` library.
+
+    Args:
+        model (str): Path to a tokenizer.json file, a directory containing one,
+            or a model name on the HuggingFace Hub.
+    """
+
+    def __init__(self, model: str) -> None:
+        try:
+            from tokenizers import Tokenizer as HFTokenizer
+        except ImportError as e:
+            raise ImportError("The 'tokenizers' package is required for TOKENIZER_BACKEND=huggingface") from e
+
+        if os.path.isdir(model):
+            model = os.path.join(model, "tokenizer.json")
+        if os.path.isfile(model):
+            self._tokenizer = HFTokenizer.from_file(model)
+        else:
+            self._tokenizer = HFTokenizer.from_pretrained(model)
+        logger.info(f"Loaded HuggingFace tokenizer from {model}")
+
+    def tokenize(self, texts: List[str]) -> List[List[str]]:
+        if not texts:
+            return []
+        return [encoding.tokens for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+class RegexTokenizer(Tokenizer):
+    """Dependency-free approximate tokenizer splitting on words and punctuation."""
+
+    _pattern = re.compile(r"\w+|[^\w\s]")
+
+    def tokenize(self, texts: List[str]) -> List[List[str]]:
+        return [self._pattern.findall(text) for text in texts]
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(backend: Optional[str] = None) -> Tokenizer:
+    """
+    Get the tokenizer for the configured backend.
+
+    Args:
+        backend (Optional[str]): One of "watsonx", "huggingface" or "regex". Defaults to settings.tokenizer_backend.
+
+    Returns:
+        Tokenizer: The tokenizer instance, shared per backend.
+    """
+    backend = (backend or settings.tokenizer_backend).lower()
+    if backend == "watsonx":
+        return WatsonXTokenizer()
+    elif backend == "huggingface":
+        if not settings.tokenizer_model:
+            raise ValueError("TOKENIZER_MODEL must be set for TOKENIZER_BACKEND=huggingface")
+        return HuggingFaceTokenizer(settings.tokenizer_model)
+    elif backend == "regex":
+        return RegexTokenizer()
+    else:
+        raise ValueError(f"Unsupported tokenizer backend: {backend}")
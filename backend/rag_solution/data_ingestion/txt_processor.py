@@ -38,8 +38,11 @@ class TxtProcessor(BaseProcessor):
                 text = f.read()
                 chunks = self.chunking_method(text)
 
+                # All chunks of the file share its document ID, so consecutive chunks can be merged at query time
+                document_id = str(uuid.uuid4())
                 for chunk in chunks:
-                    yield get_document(name=os.path.basename(file_path), document_id=str(uuid.uuid4()), text=chunk)
+                    yield get_document(name=os.path.basename(file_path), document_id=document_id, text=chunk,
+                                       embed=self.embed_chunks)
         except Exception as e:
             logger.error(f"Error processing TXT file {file_path}: {e}", exc_info=True)
             raise DocumentProcessingError(f"Error processing TXT file {file_path}") from e
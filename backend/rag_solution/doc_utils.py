@@ -5,7 +5,8 @@ from backend.vectordbs.data_types import Document, DocumentChunk, DocumentChunkM
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 
-def get_document(name: str, document_id: str, text: str, metadata: Optional[dict] = None) -> Document:
+def get_document(name: str, document_id: str, text: str, metadata: Optional[dict] = None,
+                 embed: bool = True) -> Document:
     """
     Create a Document object with embedded vectors.
 
@@ -14,6 +15,7 @@ def get_document(name: str, document_id: str, text: str, metadata: Optional[dict
         document_id (str): The unique identifier for the document.
         text (str): The text content of the document.
         metadata (Optional[dict]): Additional metadata for the document.
+        embed (bool): Whether to compute the chunk embedding. If False, the chunk has no vectors.
 
     Returns:
         Document: A Document object with embedded vectors.
@@ -22,6 +24,7 @@ def get_document(name: str, document_id: str, text: str, metadata: Optional[dict
         source=Source.PDF if name.lower().endswith('.pdf') else Source.OTHER,
         **metadata
     ) if metadata else None
+    embeddings = get_embeddings(text) if embed else []
 
     return Document(
         name=name,
@@ -30,7 +33,7 @@ def get_document(name: str, document_id: str, text: str, metadata: Optional[dict
             DocumentChunk(
                 chunk_id=str(uuid.uuid4()),
                 text=text,
-                vectors=get_embeddings(text),
+                vectors=embeddings[0] if len(embeddings) else None,
                 document_id=document_id,
             )
         ],
@@ -0,0 +1,237 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from backend.core.config import settings
+from backend.rag_solution.data_ingestion.tokenization import Tokenizer, get_tokenizer
+from backend.vectordbs.data_types import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_TEMPLATE = (
+    "Answer the question using only the context below.\n\n"
+    "Context:\n{context}\n\n"
+    "Question: {question}\n\n"
+    "Answer:"
+)
+PASSAGE_SEPARATOR = "\n\n"
+
+
+@dataclass
+class Passage:
+    """
+    Contiguous text of one document, made of one or more retrieved chunks.
+
+    Attributes:
+        text (str): The passage text.
+        document_id (Optional[str]): The document the chunks belong to.
+        chunks (List[DocumentChunk]): The chunks, in document order.
+        overlaps (List[int]): Characters each chunk repeats from the previous one, 0 for the first.
+        score (float): The best score of the chunks.
+        tokens (int): The number of tokens of the text.
+    """
+    text: str
+    document_id: Optional[str]
+    chunks: List[DocumentChunk] = field(default_factory=list)
+    overlaps: List[int] = field(default_factory=list)
+    score: float = 0.0
+    tokens: int = 0
+
+    @classmethod
+    def from_chunks(cls, chunks: List[DocumentChunk], overlaps: List[int]) -> "Passage":
+        text = chunks[0].text + "".join(chunk.text[overlap:] for chunk, overlap in zip(chunks[1:], overlaps[1:]))
+        return cls(text, chunks[0].document_id, chunks, overlaps, max(_score(chunk) for chunk in chunks))
+
+
+@dataclass
+class Context:
+    """
+    A prompt and the passages packed into it.
+
+    Attributes:
+        prompt (str): The prompt to send to the generator.
+        passages (List[Passage]): The passages in the prompt, best first.
+        tokens (int): The number of tokens of the prompt.
+    """
+    prompt: str
+    passages: List[Passage]
+    tokens: int
+
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        return [chunk for passage in self.passages for chunk in passage.chunks]
+
+
+def _score(chunk: DocumentChunk) -> float:
+    score = getattr(chunk, "score", None)
+    return score if score is not None else 0.0
+
+
+def suffix_prefix_overlap(a: str, b: str, min_overlap: int) -> int:
+    """
+    Length of the longest suffix of `a` that is also a prefix of `b`.
+
+    Args:
+        a (str): The text that comes first.
+        b (str): The text that may continue it.
+        min_overlap (int): Shorter overlaps are ignored as coincidental.
+
+    Returns:
+        int: The overlap length in characters, or 0 if it is shorter than min_overlap.
+    """
+    if min(len(a), len(b)) < min_overlap:
+        return 0
+    probe = b[:min_overlap]
+    # Scanning from the left finds the longest overlap first
+    index = a.find(probe, max(0, len(a) - len(b)))
+    while index != -1:
+        if b.startswith(a[index:]):
+            return len(a) - index
+        index = a.find(probe, index + 1)
+    return 0
+
+
+class ContextBuilder:
+    """
+    Packs retrieved chunks into a prompt under a token budget.
+
+    Chunks with the same text or contained in another chunk are dropped, and
+    chunks of the same document that continue each other (consecutive chunks
+    overlap by CHUNK_OVERLAP) are merged into one passage without repeating the
+    overlap. Passages are then added best score first while the whole prompt
+    fits the budget. A merged passage that does not fit loses its lower scored
+    end chunks until it does, and if nothing fits the best passage is truncated.
+    Tokens are counted locally, so building a context makes no remote calls.
+
+    Attributes:
+        token_budget (int): Maximum number of tokens of the prompt, template and question included.
+        tokenizer (Tokenizer): The tokenizer to count with.
+        template (str): The prompt template, with {context} and {question} fields.
+        min_overlap (int): Minimum overlap in characters for two chunks to be merged.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, tokenizer: Optional[Tokenizer] = None,
+                 template: Optional[str] = None, min_overlap: Optional[int] = None) -> None:
+        self.token_budget: int = token_budget or settings.context_token_budget
+        self.tokenizer = tokenizer or get_tokenizer(
+            settings.context_tokenizer_backend or ("huggingface" if settings.tokenizer_model else "regex"))
+        self.template: str = template or DEFAULT_PROMPT_TEMPLATE
+        self.min_overlap: int = min_overlap or settings.context_min_overlap
+
+    def build(self, question: str, chunks: Sequence[DocumentChunk]) -> Context:
+        """
+        Build the prompt for a question from retrieved chunks.
+
+        Args:
+            question (str): The user question.
+            chunks (Sequence[DocumentChunk]): The retrieved chunks, in any order.
+
+        Returns:
+            Context: The prompt and the passages it contains.
+        """
+        passages = self.merge(self.deduplicate(chunks))
+        for passage, count in zip(passages, self.tokenizer.count_tokens([passage.text for passage in passages])):
+            passage.tokens = count
+        passages.sort(key=lambda passage: passage.score, reverse=True)
+
+        (overhead,) = self.tokenizer.count_tokens([self.template.format(context="", question=question)])
+        (separator_tokens,) = self.tokenizer.count_tokens([PASSAGE_SEPARATOR])
+        available = self.token_budget - overhead
+        selected: List[Passage] = []
+        used = 0
+        for passage in passages:
+            separator = separator_tokens if selected else 0
+            while used + separator + passage.tokens > available and len(passage.chunks) > 1:
+                passage = self._shrink(passage)
+            if used + separator + passage.tokens <= available:
+                selected.append(passage)
+                used += separator + passage.tokens
+        if not selected and passages and available > 0:
+            selected.append(self._truncate(passages[0], available))
+            used = selected[0].tokens
+
+        context = PASSAGE_SEPARATOR.join(passage.text for passage in selected)
+        prompt = self.template.format(context=context, question=question)
+        logger.debug(f"Packed {len(selected)} of {len(passages)} passages into {overhead + used} "
+                     f"of {self.token_budget} tokens")
+        return Context(prompt=prompt, passages=selected, tokens=overhead + used)
+
+    @staticmethod
+    def deduplicate(chunks: Sequence[DocumentChunk]) -> List[DocumentChunk]:
+        """Drop repeated chunks and chunks whose text is contained in a better scored chunk."""
+        kept: List[DocumentChunk] = []
+        seen_ids = set()
+        for chunk in sorted(chunks, key=_score, reverse=True):
+            text = chunk.text.strip()
+            if not text or chunk.chunk_id in seen_ids:
+                continue
+            if any(text in other.text for other in kept):
+                continue
+            seen_ids.add(chunk.chunk_id)
+            kept.append(chunk)
+        return kept
+
+    def merge(self, chunks: Sequence[DocumentChunk]) -> List[Passage]:
+        """Merge chunks of the same document that continue each other into passages."""
+        by_document: Dict[Optional[str], List[DocumentChunk]] = {}
+        for chunk in chunks:
+            by_document.setdefault(chunk.document_id, []).append(chunk)
+
+        passages: List[Passage] = []
+        for document_id, document_chunks in by_document.items():
+            if document_id is None or len(document_chunks) == 1:
+                passages.extend(Passage.from_chunks([chunk], [0]) for chunk in document_chunks)
+                continue
+
+            # Link each chunk to the chunk continuing it, then follow the chains from their heads
+            following: Dict[int, tuple] = {}
+            has_previous = set()
+            for i, a in enumerate(document_chunks):
+                for j, b in enumerate(document_chunks):
+                    if i == j or j in has_previous or i in following:
+                        continue
+                    overlap = suffix_prefix_overlap(a.text, b.text, self.min_overlap)
+                    if overlap:
+                        following[i] = (j, overlap)
+                        has_previous.add(j)
+                        break
+            visited = set()
+            for head in range(len(document_chunks)):
+                if head in has_previous:
+                    continue
+                passages.append(self._chain(document_chunks, head, following, visited))
+            # Any chunk left over is part of a cycle, which only identical texts could form
+            for i, chunk in enumerate(document_chunks):
+                if i not in visited:
+                    passages.append(Passage.from_chunks([chunk], [0]))
+        return passages
+
+    @staticmethod
+    def _chain(chunks: List[DocumentChunk], head: int, following: Dict[int, tuple], visited: set) -> Passage:
+        chain, overlaps = [chunks[head]], [0]
+        visited.add(head)
+        current = head
+        while current in following and following[current][0] not in visited:
+            current, overlap = following[current]
+            chain.append(chunks[current])
+            overlaps.append(overlap)
+            visited.add(current)
+        return Passage.from_chunks(chain, overlaps)
+
+    def _shrink(self, passage: Passage) -> Passage:
+        """Drop the lower scored of the first and last chunk of a merged passage."""
+        if _score(passage.chunks[0]) < _score(passage.chunks[-1]):
+            shrunk = Passage.from_chunks(passage.chunks[1:], [0] + passage.overlaps[2:])
+        else:
+            shrunk = Passage.from_chunks(passage.chunks[:-1], passage.overlaps[:-1])
+        (shrunk.tokens,) = self.tokenizer.count_tokens([shrunk.text])
+        return shrunk
+
+    def _truncate(self, passage: Passage, max_tokens: int) -> Passage:
+        """Cut a passage to at most max_tokens tokens, keeping its beginning."""
+        text = passage.text
+        tokens = passage.tokens
+        while tokens > max_tokens and text:
+            text = text[:max(0, int(len(text) * max_tokens / tokens) - 1)]
+            (tokens,) = self.tokenizer.count_tokens([text])
+        return Passage(text, passage.document_id, passage.chunks, passage.overlaps, passage.score, tokens)
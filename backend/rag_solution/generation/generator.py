@@ -1,16 +1,21 @@
+import asyncio
 import os
 import sys
+import threading
+from typing import AsyncIterator
 
 from dotenv import load_dotenv
 
 # Ensure the base directory is in the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from backend.vectordbs.utils.watsonx import \
-    generate_text  # Import the function from watsonx
+from backend.vectordbs.utils.watsonx import (  # Import the functions from watsonx
+    generate_text, generate_text_stream)
 
 load_dotenv()
 
+_END_OF_STREAM = object()
+
 
 class Generator:
     def __init__(self, api_key: str = "None", model_name: str = "meta/llama3-8b-v1"):
@@ -24,6 +29,61 @@ class Generator:
     ) -> str:
         return generate_text(prompt, max_tokens, temperature)
 
+    async def generate_stream(
+        self, prompt: str, max_tokens: int = 150, temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response, yielding text fragments as the model produces them.
+
+        The SDK stream is blocking, so it is consumed on a background thread that
+        hands each fragment to the event loop. Closing the generator early (for
+        example when the client disconnects) stops the thread after its current
+        fragment and closes the underlying HTTP stream.
+
+        Args:
+            prompt (str): The prompt.
+            max_tokens (int): The maximum number of new tokens.
+            temperature (float): The sampling temperature.
+
+        Yields:
+            str: The generated text fragments, in order.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(item) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:  # The event loop is closed, nobody is listening anymore
+                stopped.set()
+
+        def produce() -> None:
+            stream = generate_text_stream(prompt, max_tokens, temperature, model_id=self.model_name)
+            try:
+                for fragment in stream:
+                    if stopped.is_set():
+                        break
+                    put(fragment)
+                put(_END_OF_STREAM)
+            except Exception as e:
+                put(e)
+            finally:
+                stream.close()
+
+        producer = threading.Thread(target=produce, name="generate-stream", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence
+
+from backend.core.custom_exceptions import PipelineStageError
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """
+    A point in time by which a request must finish.
+
+    Each stage runs under the earlier of its own timeout and the request
+    deadline, and receives that bound as a Deadline so the calls it makes can
+    give up in time as well.
+
+    Attributes:
+        expires_at (Optional[float]): time.monotonic() value of the deadline, or None for no deadline.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        if expires_at is None and timeout is not None:
+            expires_at = time.monotonic() + timeout
+        self.expires_at = expires_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, never negative, or None if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def child(self, timeout: Optional[float]) -> "Deadline":
+        """The earlier of this deadline and `timeout` seconds from now."""
+        if timeout is None:
+            return Deadline(expires_at=self.expires_at)
+        expires_at = time.monotonic() + timeout
+        if self.expires_at is not None:
+            expires_at = min(expires_at, self.expires_at)
+        return Deadline(expires_at=expires_at)
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+
+    Attributes:
+        name (str): Unique name of the stage. Its result is available to other stages under this name.
+        run (Callable[[Dict[str, Any], Deadline], Awaitable[Any]]): Coroutine function called with the
+            results of the dependencies, by name, and the stage deadline.
+        depends_on (Sequence[str]): Names of the stages or pipeline inputs this stage needs.
+        timeout (Optional[float]): Maximum run time in seconds, on top of the request deadline.
+        fallback (Optional[Callable[[Dict[str, Any]], Any]]): Computes the result from the dependency
+            results when the stage fails or times out. Without one the whole run fails.
+    """
+    name: str
+    run: Callable[[Dict[str, Any], Deadline], Awaitable[Any]]
+    depends_on: Sequence[str] = ()
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+class PipelineExecutor:
+    """
+    Runs stages forming a directed acyclic graph, each as soon as its dependencies are done.
+
+    Independent stages run concurrently on the event loop, so blocking work
+    inside a stage belongs on a thread (asyncio.to_thread). A timed out stage
+    is cancelled, but a blocking call on a thread finishes in the background.
+
+    Attributes:
+        stages (List[Stage]): The stages, in a valid execution order.
+    """
+
+    def __init__(self, stages: Sequence[Stage]) -> None:
+        self.stages = self._sort(stages)
+
+    @staticmethod
+    def _sort(stages: Sequence[Stage]) -> List[Stage]:
+        by_name = {stage.name: stage for stage in stages}
+        if len(by_name) != len(stages):
+            raise ValueError("Stage names must be unique")
+        ordered: List[Stage] = []
+        state: Dict[str, str] = {}
+
+        def visit(stage: Stage) -> None:
+            if state.get(stage.name) == "done":
+                return
+            if state.get(stage.name) == "visiting":
+                raise ValueError(f"Pipeline has a cycle through stage {stage.name}")
+            state[stage.name] = "visiting"
+            for dependency in stage.depends_on:
+                if dependency in by_name:
+                    visit(by_name[dependency])
+            state[stage.name] = "done"
+            ordered.append(stage)
+
+        for stage in stages:
+            visit(stage)
+        return ordered
+
+    async def run(self, inputs: Mapping[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Run the pipeline.
+
+        Args:
+            inputs (Mapping[str, Any]): Pipeline inputs, which stages may depend on like on stages.
+                An input named like a stage replaces that stage.
+            deadline (Optional[Deadline]): Deadline of the whole run. Defaults to none.
+
+        Returns:
+            Dict[str, Any]: The inputs and the result of every stage, by name.
+
+        Raises:
+            PipelineStageError: If a stage without a fallback fails or times out.
+        """
+        deadline = deadline or Deadline()
+        results: Dict[str, Any] = dict(inputs)
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, float] = {}
+        for stage in self.stages:
+            if stage.name in results:
+                continue  # Computed by the caller
+            missing = [name for name in stage.depends_on if name not in results and name not in tasks]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages or inputs: {missing}")
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, results, tasks, deadline, timings),
+                                                    name=f"stage-{stage.name}")
+        try:
+            # Stop at the first failure instead of waiting for unrelated stages
+            done, _ = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            logger.debug("Pipeline stage timings: " + ", ".join(f"{name}={seconds * 1000:.1f}ms"
+                                                                for name, seconds in timings.items()))
+        results.update((name, task.result()) for name, task in tasks.items())
+        return results
+
+    @staticmethod
+    async def _run_stage(stage: Stage, results: Dict[str, Any], tasks: Dict[str, asyncio.Task],
+                         deadline: Deadline, timings: Dict[str, float]) -> Any:
+        inputs = {}
+        for name in stage.depends_on:
+            inputs[name] = await tasks[name] if name in tasks else results[name]
+
+        stage_deadline = deadline.child(stage.timeout)
+        start = time.perf_counter()
+        try:
+            if stage_deadline.expired():
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(stage.run(inputs, stage_deadline), stage_deadline.remaining())
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else f"failed: {e}"
+            if stage.fallback is None:
+                logger.error(f"Pipeline stage {stage.name} {reason}")
+                raise PipelineStageError(stage.name, reason) from e
+            logger.warning(f"Pipeline stage {stage.name} {reason}, using its fallback")
+            return stage.fallback(inputs)
+        finally:
+            timings[stage.name] = time.perf_counter() - start
@@ -1,21 +1,280 @@
 # rag_pipeline.py
+import asyncio
+import logging
 import os
 import sys
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
 # Ensure the base directory is in the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from backend.core.config import settings
+from backend.rag_solution.generation.context_builder import Context, ContextBuilder
 from backend.rag_solution.generation.generator import Generator
+from backend.rag_solution.pipeline.executor import Deadline, PipelineExecutor, Stage
+from backend.rag_solution.pipeline.response_cache import ResponseCache, get_response_cache
+from backend.rag_solution.query_rewriting.query_rewriter import QueryRewriter, get_query_rewriter
+from backend.rag_solution.retrieval.reranker import CrossEncoderReranker, get_reranker
 from backend.rag_solution.retrieval.retriever import Retriever
+from backend.vectordbs.data_types import (DocumentChunkWithScore, QueryResult, QueryWithEmbedding,
+                                          VectorStoreQueryMode)
+from backend.vectordbs.utils.fusion import reciprocal_rank_fusion
+from backend.vectordbs.utils.watsonx import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineResponse:
+    """
+    The answer to a query.
+
+    Attributes:
+        answer (str): The generated answer.
+        sources (List[DocumentChunkWithScore]): The chunks the answer was generated from.
+        cached (bool): Whether the answer came from the response cache.
+    """
+    answer: str
+    sources: List[DocumentChunkWithScore] = field(default_factory=list)
+    cached: bool = False
 
 
 class RAGPipeline:
-    def __init__(self, retriever: Retriever, generator: Generator):
-        self.retriever = retriever
+    """
+    Retrieval augmented generation over one or more retrievers.
+
+    A request runs as a graph of stages: the query is embedded and searched
+    while it is rewritten, the rewritten query is embedded and searched as soon
+    as it is ready, and the results of every search are fused, re-ranked by
+    the cross-encoder if one is configured, cut to the final k and packed
+    into a prompt under the token budget before generation. Each stage has a
+    timeout within the request deadline; a failed or late rewrite, embedding
+    or search falls back (to the original query, text search or no results)
+    instead of failing the request.
+
+    When the response cache is enabled, the query embedding is computed first
+    and an answer to a near-identical query of the same collections is
+    returned without searching or generating.
+
+    Attributes:
+        retrievers (List[Retriever]): The retrievers to search, e.g. one per vector store.
+        generator (Generator): The answer generator.
+        query_rewriter (Optional[QueryRewriter]): The query rewriter, None to search the query as given.
+        context_builder (ContextBuilder): Builds the prompt from the retrieved chunks.
+        reranker (Optional[CrossEncoderReranker]): The cross-encoder, None to keep the fused retrieval order.
+        response_cache (Optional[ResponseCache]): The response cache, None to always generate.
+    """
+
+    def __init__(self, retriever: Union[Retriever, Sequence[Retriever]], generator: Generator,
+                 query_rewriter: Optional[QueryRewriter] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 context_builder: Optional[ContextBuilder] = None,
+                 reranker: Optional[CrossEncoderReranker] = None):
+        self.retrievers: List[Retriever] = [retriever] if isinstance(retriever, Retriever) else list(retriever)
+        self.retriever = self.retrievers[0]
         self.generator = generator
+        self.query_rewriter = query_rewriter or get_query_rewriter()
+        self.response_cache = response_cache or get_response_cache()
+        self.context_builder = context_builder or ContextBuilder()
+        self.reranker = reranker or get_reranker()
+        self.collections = [retriever.collection_name for retriever in self.retrievers]
+        self.top_k = max(retriever.top_k for retriever in self.retrievers)
+        if self.reranker is not None:
+            self.top_k = min(self.top_k, settings.reranker_top_k)
+
+        retrieval_stages = self._retrieval_stages()
+        self._retrieval = PipelineExecutor(retrieval_stages)
+        self._answer = PipelineExecutor(retrieval_stages + [
+            Stage("context", self._build_context, depends_on=("rerank", "query")),
+            Stage("generate", self._generate, depends_on=("context",), timeout=settings.pipeline_generation_timeout),
+        ])
+
+    def _retrieval_stages(self) -> List[Stage]:
+        """Stages from the query to the re-ranked chunks, under the name "rerank"."""
+        embed = any(retriever.mode is VectorStoreQueryMode.DEFAULT for retriever in self.retrievers)
+        variants = {"query": "query"}
+        stages: List[Stage] = []
+        if self.query_rewriter is not None:
+            variants["rewritten"] = "rewrite"
+            stages.append(Stage("rewrite", self._rewrite, depends_on=("query",),
+                                timeout=settings.pipeline_rewrite_timeout,
+                                fallback=lambda inputs: inputs["query"]))
+        if embed:
+            for variant, source in list(variants.items()):
+                stages.append(Stage(f"embed_{variant}", self._embed_from(source), depends_on=(source, "query"),
+                                    timeout=settings.pipeline_embedding_timeout,
+                                    fallback=lambda inputs, source=source: inputs[source]))
+                variants[variant] = f"embed_{variant}"
+
+        searches = []
+        for index, retriever in enumerate(self.retrievers):
+            for variant, source in variants.items():
+                name = f"retrieve_{index}_{variant}"
+                stages.append(Stage(name, self._retrieve_with(retriever, source, variant == "query"),
+                                    depends_on=(source, "query"), timeout=settings.pipeline_retrieval_timeout,
+                                    fallback=lambda inputs: []))
+                searches.append(name)
+        stages.append(Stage("rerank", self._rerank, depends_on=(*searches, "query"),
+                            fallback=lambda inputs: QueryResult(data=self._fuse(inputs)[:self.top_k])))
+        return stages
+
+    async def _rewrite(self, inputs: Dict[str, Any], deadline: Deadline) -> str:
+        return await asyncio.to_thread(self.query_rewriter.rewrite_query, inputs["query"])
+
+    @staticmethod
+    def _embed_from(source: str):
+        async def embed(inputs: Dict[str, Any], deadline: Deadline) -> Union[str, QueryWithEmbedding]:
+            text = inputs[source]
+            if source != "query" and text == inputs["query"]:
+                return text  # The rewrite changed nothing and will not be searched
+            embeddings = await asyncio.to_thread(get_embeddings, text)
+            if len(embeddings) == 0:
+                raise ValueError("No embedding returned for the query")
+            return QueryWithEmbedding(text=text, vectors=embeddings[0])
+        return embed
+
+    @staticmethod
+    def _retrieve_with(retriever: Retriever, source: str, original: bool):
+        async def retrieve(inputs: Dict[str, Any], deadline: Deadline) -> list:
+            query = inputs[source]
+            text = query.text if isinstance(query, QueryWithEmbedding) else query
+            if not original and text == inputs["query"]:
+                return []  # The rewrite changed nothing, so the original query search covers it
+            return (await retriever.retrieve(query)).data or []
+        return retrieve
+
+    @staticmethod
+    def _fuse(inputs: Dict[str, Any]) -> list:
+        """Fuse the results of every search into one ranked list."""
+        ranked_lists = [chunks for name, chunks in inputs.items() if name != "query" and chunks]
+        if len(ranked_lists) == 1:
+            return ranked_lists[0]
+        return reciprocal_rank_fusion(ranked_lists, k=settings.hybrid_rrf_k)
+
+    async def _rerank(self, inputs: Dict[str, Any], deadline: Deadline) -> QueryResult:
+        candidates = self._fuse(inputs)
+        if self.reranker is None:
+            return QueryResult(data=candidates[:self.top_k])
+        budget = deadline.child(settings.reranker_timeout).remaining()
+        return QueryResult(data=await self.reranker.rerank(inputs["query"], candidates, self.top_k, timeout=budget))
+
+    async def _build_context(self, inputs: Dict[str, Any], deadline: Deadline) -> Context:
+        return self.context_builder.build(inputs["query"], inputs["rerank"].data or [])
+
+    async def _generate(self, inputs: Dict[str, Any], deadline: Deadline) -> str:
+        return await asyncio.to_thread(self.generator.generate, inputs["context"].prompt)
 
-    async def generate_response(self, query: str) -> str:
-        retrieved_docs = await self.retriever.retrieve(query)
-        combined_text = " ".join([doc.text for doc in retrieved_docs.data])
-        response = self.generator.generate(combined_text)
+    async def _lookup(self, query: str, deadline: Deadline) -> Tuple[Optional[QueryWithEmbedding],
+                                                                      Optional[PipelineResponse]]:
+        """Embed the query and look it up in the response cache. Returns the embedding and the cached response."""
+        if self.response_cache is None:
+            return None, None
+        try:
+            embedding = await asyncio.wait_for(self._embed_from("query")({"query": query}, deadline),
+                                               deadline.child(settings.pipeline_embedding_timeout).remaining())
+        except Exception as e:
+            logger.warning(f"Could not embed the query for the response cache: {e}")
+            return None, None
+        hit = self.response_cache.lookup(self.collections, embedding.vectors)
+        if hit is None:
+            return embedding, None
+        logger.info(f"Response cache hit with similarity {hit.similarity:.3f} for query: {query}")
+        return embedding, PipelineResponse(hit.answer, hit.sources, cached=True)
+
+    def _generation(self) -> Optional[Tuple[int, ...]]:
+        """Capture the cache generation of the collections before retrieving from them."""
+        return self.response_cache.generation(self.collections) if self.response_cache is not None else None
+
+    def _store(self, embedding: Optional[QueryWithEmbedding], answer: str,
+               sources: List[DocumentChunkWithScore], generation: Optional[Tuple[int, ...]]) -> None:
+        # Answers generated without any context are not worth serving again
+        if self.response_cache is not None and embedding is not None and sources:
+            self.response_cache.store(self.collections, embedding.text, embedding.vectors, answer, sources,
+                                      generation)
+
+    async def retrieve(self, query: str, deadline: Optional[Deadline] = None,
+                       embedding: Optional[QueryWithEmbedding] = None) -> QueryResult:
+        """
+        Rewrite, search and re-rank without generating.
+
+        Args:
+            query (str): The user query.
+            deadline (Optional[Deadline]): Deadline of the request. Defaults to PIPELINE_TIMEOUT from now.
+            embedding (Optional[QueryWithEmbedding]): The query embedding, if already computed.
+
+        Returns:
+            QueryResult: The re-ranked chunks.
+        """
+        inputs = {"query": query, "embed_query": embedding} if embedding is not None else {"query": query}
+        results = await self._retrieval.run(inputs, deadline or Deadline(settings.pipeline_timeout))
+        return results["rerank"]
+
+    async def answer_query(self, query: str, deadline: Optional[Deadline] = None) -> PipelineResponse:
+        """
+        Answer a query from the response cache or by retrieval and generation.
+
+        Args:
+            query (str): The user query.
+            deadline (Optional[Deadline]): Deadline of the request. Defaults to PIPELINE_TIMEOUT from now.
+
+        Returns:
+            PipelineResponse: The answer and its sources.
+
+        Raises:
+            PipelineStageError: If generation fails or the deadline passes before it completes.
+        """
+        deadline = deadline or Deadline(settings.pipeline_timeout)
+        generation = self._generation()
+        embedding, cached = await self._lookup(query, deadline)
+        if cached is not None:
+            return cached
+        inputs = {"query": query, "embed_query": embedding} if embedding is not None else {"query": query}
+        results = await self._answer.run(inputs, deadline)
+        response = PipelineResponse(results["generate"], results["context"].chunks)
+        self._store(embedding, response.answer, response.sources, generation)
         return response
+
+    async def generate_response(self, query: str, deadline: Optional[Deadline] = None) -> str:
+        """
+        Answer a query.
+
+        Args:
+            query (str): The user query.
+            deadline (Optional[Deadline]): Deadline of the request. Defaults to PIPELINE_TIMEOUT from now.
+
+        Returns:
+            str: The generated answer.
+
+        Raises:
+            PipelineStageError: If generation fails or the deadline passes before it completes.
+        """
+        return (await self.answer_query(query, deadline)).answer
+
+    async def generate_response_stream(self, query: str) -> AsyncIterator[str]:
+        """
+        Stream the response to a query.
+
+        Retrieval completes first, within PIPELINE_TIMEOUT; generated text is
+        then yielded as it arrives, so the first fragment is available after
+        retrieval plus the first token. A cached answer is yielded at once.
+
+        Args:
+            query (str): The user query.
+
+        Yields:
+            str: The generated text fragments, in order.
+        """
+        deadline = Deadline(settings.pipeline_timeout)
+        generation = self._generation()
+        embedding, cached = await self._lookup(query, deadline)
+        if cached is not None:
+            yield cached.answer
+            return
+        retrieved_docs = await self.retrieve(query, deadline, embedding)
+        context = self.context_builder.build(query, retrieved_docs.data or [])
+        fragments = []
+        async for fragment in self.generator.generate_stream(context.prompt):
+            fragments.append(fragment)
+            yield fragment
+        self._store(embedding, "".join(fragments).strip(), context.chunks, generation)
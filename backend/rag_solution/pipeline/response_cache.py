@@ -0,0 +1,275 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.vectordbs.data_types import DocumentChunkWithScore, Embedding
+
+logger = logging.getLogger(__name__)
+
+MIN_CAPACITY = 64
+
+
+@dataclass
+class CachedResponse:
+    """
+    A generated answer and the chunks it was generated from.
+
+    Attributes:
+        query (str): The query the answer was generated for.
+        answer (str): The generated answer.
+        sources (List[DocumentChunkWithScore]): The chunks sent to the generator.
+        similarity (float): Cosine similarity between the cached query and the looked up query.
+    """
+    query: str
+    answer: str
+    sources: List[DocumentChunkWithScore] = field(default_factory=list)
+    similarity: float = 1.0
+
+
+class _Partition:
+    """
+    The cached responses of one set of collections.
+
+    Query vectors are L2-normalized rows of one contiguous matrix, so a lookup
+    is a single matrix-vector product. Slots of evicted entries are reused.
+    """
+
+    def __init__(self, dim: int, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.vectors = np.zeros((min(MIN_CAPACITY, max_entries), dim), dtype=np.float32)
+        self.expires_at = np.full(len(self.vectors), -np.inf)
+        # Slot -> response, least recently used first
+        self.entries: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        self.free: List[int] = list(range(len(self.vectors) - 1, -1, -1))
+
+    def _grow(self) -> None:
+        old = len(self.vectors)
+        new = min(old * 2, self.max_entries)
+        self.vectors = np.vstack([self.vectors, np.zeros((new - old, self.vectors.shape[1]), dtype=np.float32)])
+        self.expires_at = np.concatenate([self.expires_at, np.full(new - old, -np.inf)])
+        self.free.extend(range(new - 1, old - 1, -1))
+
+    def remove(self, slot: int) -> None:
+        del self.entries[slot]
+        self.expires_at[slot] = -np.inf
+        self.free.append(slot)
+
+    def search(self, vector: np.ndarray, now: float) -> Optional[tuple]:
+        if not self.entries:
+            return None
+        scores = self.vectors @ vector
+        scores[self.expires_at <= now] = -np.inf
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def add(self, vector: np.ndarray, response: CachedResponse, expires_at: float) -> bool:
+        """Store a response, evicting the least recently used one when full. Returns whether one was evicted."""
+        evicted = False
+        if not self.free and len(self.vectors) < self.max_entries:
+            self._grow()
+        if not self.free:
+            self.remove(next(iter(self.entries)))
+            evicted = True
+        slot = self.free.pop()
+        self.vectors[slot] = vector
+        self.expires_at[slot] = expires_at
+        self.entries[slot] = response
+        return evicted
+
+
+class ResponseCache:
+    """
+    Semantic cache of generated answers, keyed by query embedding.
+
+    A lookup returns the answer of the most similar cached query of the same
+    collections if its cosine similarity reaches the threshold. Entries expire
+    after a TTL and the least recently used entries are evicted once a set of
+    collections holds max_entries. Caches are per process, and so are
+    invalidations, so a deployment with several worker processes would serve
+    answers another process already invalidated.
+
+    At these sizes an exact search over one contiguous matrix takes well under
+    a millisecond, so no approximate index is needed.
+
+    Every invalidation of a collection bumps its generation. Callers capture
+    generation() before retrieving and pass it to store(), which drops answers
+    generated from documents that changed in the meantime.
+
+    Attributes:
+        threshold (float): Minimum cosine similarity of a hit.
+        ttl (Optional[float]): Lifetime of an entry in seconds, None for no expiry.
+        max_entries (int): Maximum number of entries per set of collections.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl: Optional[float] = None, max_entries: int = 1000) -> None:
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._partitions: Dict[FrozenSet[str], _Partition] = {}
+        # Invalidation counters per collection, and of clear() for all of them
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                       "stale_stores": 0}
+
+    @staticmethod
+    def _normalize(embedding: Embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def generation(self, collections: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Get the current generation of a set of collections, to pass to store().
+
+        Args:
+            collections (Iterable[str]): The collections a query is answered from.
+
+        Returns:
+            Tuple[int, ...]: A value that changes whenever any of the collections is invalidated.
+        """
+        with self._lock:
+            return self._generation(frozenset(collections))
+
+    def _generation(self, key: FrozenSet[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(name, 0) for name in sorted(key)))
+
+    def lookup(self, collections: Iterable[str], embedding: Embedding) -> Optional[CachedResponse]:
+        """
+        Find the cached response of the most similar query.
+
+        Args:
+            collections (Iterable[str]): The collections the query is answered from.
+            embedding (Embedding): The query embedding.
+
+        Returns:
+            Optional[CachedResponse]: The cached response, or None on a miss.
+        """
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            partition = self._partitions.get(frozenset(collections))
+            found = None
+            if vector is not None and partition is not None and partition.vectors.shape[1] == len(vector):
+                self._expire(partition, now)
+                found = partition.search(vector, now)
+            if found is None or found[1] < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            slot, similarity = found
+            partition.entries.move_to_end(slot)
+            self._stats["hits"] += 1
+            response = partition.entries[slot]
+        return CachedResponse(response.query, response.answer, list(response.sources), similarity)
+
+    def store(self, collections: Iterable[str], query: str, embedding: Embedding, answer: str,
+              sources: Optional[List[DocumentChunkWithScore]] = None,
+              generation: Optional[Tuple[int, ...]] = None) -> None:
+        """
+        Cache the answer to a query.
+
+        Args:
+            collections (Iterable[str]): The collections the query was answered from.
+            query (str): The query.
+            embedding (Embedding): The query embedding.
+            answer (str): The generated answer.
+            sources (Optional[List[DocumentChunkWithScore]]): The chunks the answer was generated from.
+            generation (Optional[Tuple[int, ...]]): generation() of the collections before retrieval. If a
+                collection has been invalidated since, the answer may be stale and is not cached.
+        """
+        vector = self._normalize(embedding)
+        if vector is None or not answer:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else np.inf
+        key = frozenset(collections)
+        with self._lock:
+            if generation is not None and generation != self._generation(key):
+                self._stats["stale_stores"] += 1
+                return
+            partition = self._partitions.get(key)
+            if partition is None or partition.vectors.shape[1] != len(vector):
+                # A new partition also replaces entries of a previous embedding model
+                partition = self._partitions[key] = _Partition(len(vector), self.max_entries)
+            if partition.add(vector, CachedResponse(query, answer, list(sources or [])), expires_at):
+                self._stats["evictions"] += 1
+
+    def _expire(self, partition: _Partition, now: float) -> None:
+        expired = [slot for slot in partition.entries if partition.expires_at[slot] <= now]
+        for slot in expired:
+            partition.remove(slot)
+        self._stats["expirations"] += len(expired)
+
+    def invalidate(self, collection_name: str) -> None:
+        """
+        Drop every cached response generated from a collection.
+
+        Args:
+            collection_name (str): The collection whose documents changed.
+        """
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            for key in [key for key in self._partitions if collection_name in key]:
+                del self._partitions[key]
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, float]: Hits, misses, hit rate, current entries, the number of
+                evicted, expired and invalidated entries or collections, and the number
+                of answers not cached because their collections changed during generation.
+        """
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+            stats["entries"] = sum(len(partition.entries) for partition in self._partitions.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Process-wide cache, created on first use
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache, or None if it is disabled.
+    """
+    global _response_cache
+    if not settings.response_cache_enabled:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                threshold=settings.response_cache_threshold,
+                ttl=settings.response_cache_ttl,
+                max_entries=settings.response_cache_max_entries,
+            )
+    return _response_cache
+
+
+def invalidate_response_cache(collection_name: str) -> None:
+    """
+    Drop the cached responses of a collection after its documents changed.
+
+    Args:
+        collection_name (str): The vector store name of the collection.
+    """
+    if _response_cache is not None:
+        _response_cache.invalidate(collection_name)
+        logger.info(f"Invalidated cached responses of collection {collection_name}")
@@ -1,4 +1,6 @@
 import logging
+from functools import lru_cache
+from typing import Optional
 
 from genai.client import Client
 from genai.credentials import Credentials
@@ -18,7 +20,7 @@ class QueryRewriter:
         credentials = Credentials(settings.genai_key, settings.api_endpoint)
         self.client = Client(credentials=credentials)
         self.model_id = settings.tokenizer
-        print("model_id: ", self.model_id)
+        logger.debug(f"Query rewriting uses model {self.model_id}")
 
     def rewrite_query(self, query: str) -> str:
         try:
@@ -45,6 +47,23 @@ class QueryRewriter:
             return query  # Fallback to original query in case of an error
 
 
+@lru_cache(maxsize=1)
+def get_query_rewriter() -> Optional[QueryRewriter]:
+    """
+    Get the shared query rewriter.
+
+    Returns:
+        Optional[QueryRewriter]: The rewriter, or None if query rewriting is off or the client cannot be created.
+    """
+    if not settings.pipeline_query_rewriting:
+        return None
+    try:
+        return QueryRewriter()
+    except Exception as e:
+        logger.error(f"Failed to create the query rewriter, continuing without it: {e}")
+        return None
+
+
 # Example usage
 if __name__ == "__main__":
     rewriter = QueryRewriter()
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.vectordbs.data_types import DocumentChunk, DocumentChunkWithScore
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILES = ["model_quantized.onnx", "model_int8.onnx", "model.onnx"]
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class CrossEncoderReranker:
+    """
+    Re-ranks retrieved chunks with a cross-encoder scoring (query, chunk) pairs on the CPU.
+
+    The model is an ONNX export of a sequence classification cross-encoder,
+    such as cross-encoder/ms-marco-MiniLM-L-6-v2, ideally quantized to int8,
+    next to its tokenizer.json. Requires the optional `onnxruntime` and
+    `tokenizers` packages.
+
+    Candidates are scored in batches on a thread pool (ONNX Runtime releases
+    the GIL), best retrieval rank first. Batches that have not finished when
+    the latency budget runs out are skipped, and their chunks rank after the
+    scored ones in retrieval order.
+
+    Attributes:
+        batch_size (int): Number of pairs per inference call.
+        max_length (int): Maximum number of tokens per pair; longer chunks are truncated.
+    """
+
+    def __init__(self, model_path: str, batch_size: int = 32, max_length: int = 512,
+                 workers: Optional[int] = None, threads_per_worker: int = 1) -> None:
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The 'onnxruntime' and 'tokenizers' packages are required for RERANKER_MODEL") from e
+
+        model_dir = model_path if os.path.isdir(model_path) else os.path.dirname(model_path)
+        model_file = model_path
+        if os.path.isdir(model_path):
+            candidates = [os.path.join(model_path, name) for name in MODEL_FILES]
+            model_file = next((path for path in candidates if os.path.exists(path)), candidates[-1])
+
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=max_length, strategy="only_second")
+        self._tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        # Parallelism comes from the worker threads, so each inference call stays on few cores
+        options.intra_op_num_threads = threads_per_worker
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+        workers = workers or min(4, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reranker")
+        logger.info(f"Loaded cross-encoder {model_file} with {workers} workers")
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """
+        Score (query, text) pairs in a single inference call.
+
+        Args:
+            query (str): The query.
+            texts (Sequence[str]): The candidate texts.
+
+        Returns:
+            np.ndarray: The relevance score of each text, higher is more relevant.
+        """
+        if not texts:
+            return np.empty(0, dtype=np.float32)
+        encodings = self._tokenizer.encode_batch([(query, text) for text in texts])
+        inputs: Dict[str, np.ndarray] = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+        }
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        logits = self._session.run(None, {name: value for name, value in inputs.items()
+                                          if name in self._input_names})[0]
+        logits = np.asarray(logits, dtype=np.float32).reshape(len(texts), -1)
+        # Single-logit models output relevance directly; two-class models output (irrelevant, relevant)
+        return logits[:, 0] if logits.shape[1] == 1 else logits[:, -1] - logits[:, 0]
+
+    async def rerank(self, query: str, chunks: Sequence[DocumentChunk], top_k: int,
+                     timeout: Optional[float] = None) -> List[DocumentChunkWithScore]:
+        """
+        Re-rank chunks by cross-encoder score and keep the best top_k.
+
+        Args:
+            query (str): The query.
+            chunks (Sequence[DocumentChunk]): The candidates, best retrieval rank first.
+            top_k (int): The number of chunks to return.
+            timeout (Optional[float]): Latency budget in seconds. None waits for every batch.
+
+        Returns:
+            List[DocumentChunkWithScore]: The best chunks, with their cross-encoder scores when they were scored.
+        """
+        if not chunks:
+            return []
+        loop = asyncio.get_running_loop()
+        batches = [list(chunks[start:start + self.batch_size]) for start in range(0, len(chunks), self.batch_size)]
+        futures = [loop.run_in_executor(self._executor, self.score, query, [chunk.text for chunk in batch])
+                   for batch in batches]
+        done, pending = await asyncio.wait(futures, timeout=timeout)
+        for future in pending:
+            future.cancel()
+        if pending:
+            logger.warning(f"Re-ranking budget of {timeout}s ran out, {len(pending)} of {len(batches)} "
+                           f"batches were not scored")
+
+        scored = []
+        unscored = []
+        for batch, future in zip(batches, futures):
+            if future in done and future.exception() is None:
+                scored.extend(zip(batch, future.result().tolist()))
+            else:
+                if future in done:
+                    logger.error(f"Error re-ranking a batch: {future.exception()}")
+                unscored.extend(batch)
+        scored.sort(key=lambda item: item[1], reverse=True)
+        ranked = [_with_score(chunk, score) for chunk, score in scored]
+        ranked.extend(_with_score(chunk, getattr(chunk, "score", None)) for chunk in unscored)
+        return ranked[:top_k]
+
+
+def _with_score(chunk: DocumentChunk, score: Optional[float]) -> DocumentChunkWithScore:
+    return DocumentChunkWithScore(
+        chunk_id=chunk.chunk_id,
+        text=chunk.text,
+        vectors=chunk.vectors,
+        metadata=chunk.metadata,
+        document_id=chunk.document_id,
+        score=score,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    Get the shared cross-encoder re-ranker.
+
+    Returns:
+        Optional[CrossEncoderReranker]: The re-ranker, or None if RERANKER_MODEL is not set or cannot be loaded.
+    """
+    if not settings.reranker_model:
+        return None
+    try:
+        return CrossEncoderReranker(settings.reranker_model, batch_size=settings.reranker_batch_size,
+                                    max_length=settings.reranker_max_length, workers=settings.reranker_workers)
+    except Exception as e:
+        logger.error(f"Failed to load the re-ranker, continuing without it: {e}")
+        return None
@@ -1,11 +1,13 @@
 # retriever.py
 import os
 import sys
+from typing import Optional, Union
 
 # Ensure the base directory is in the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from backend.vectordbs.data_types import QueryResult
+from backend.core.config import settings
+from backend.vectordbs.data_types import QueryResult, QueryWithEmbedding, VectorStoreQueryMode
 from backend.vectordbs.vector_store import VectorStore
 
 
@@ -15,22 +17,37 @@ class Retriever:
         vector_store: VectorStore,
         top_k: int = 5,
         similarity_threshold: float = 0.8,
+        collection_name: str = settings.collection_name,
+        mode: Optional[VectorStoreQueryMode] = None,
     ):
         self.vector_store = vector_store
-        self.top_k = top_k
+        self.collection_name = collection_name
+        self.mode = mode or VectorStoreQueryMode[settings.retrieval_mode.upper()]
+        # Never ask a store for more hits than it returns, e.g. a wide re-ranking candidate set
+        self.top_k = min(top_k, vector_store.max_query_results or top_k)
         self.similarity_threshold = similarity_threshold
 
-    async def retrieve(self, query: str) -> QueryResult:
+    async def retrieve(self, query: Union[str, QueryWithEmbedding]) -> QueryResult:
         try:
-            results = await self.vector_store.retrieve_documents_async(
-                query, limit=self.top_k
-            )
+            if isinstance(query, QueryWithEmbedding) and self.mode is VectorStoreQueryMode.DEFAULT:
+                # Already embedded, e.g. by a concurrent pipeline stage
+                results = await self.vector_store.query_async(
+                    self.collection_name, query, number_of_results=self.top_k
+                )
+            else:
+                text = query.text if isinstance(query, QueryWithEmbedding) else query
+                results = await self.vector_store.search_async(
+                    text, self.collection_name, limit=self.top_k, mode=self.mode
+                )
 
-            # Apply similarity threshold filter
+            # Apply similarity threshold filter. Sparse and fused scores are not
+            # similarities, so the threshold only applies to dense retrieval.
             filtered_results = [
-                result
-                for result in results.data
-                if result.score >= self.similarity_threshold
+                chunk
+                for result in results
+                for chunk in result.data
+                if self.mode is not VectorStoreQueryMode.DEFAULT
+                or (getattr(chunk, "score", None) is not None and chunk.score >= self.similarity_threshold)
             ]
 
             return QueryResult(data=filtered_results)
@@ -0,0 +1,112 @@
+import json
+import logging
+from functools import lru_cache
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.rag_solution.file_management.database import get_db
+from backend.rag_solution.generation.generator import Generator
+from backend.rag_solution.pipeline.pipeline import RAGPipeline
+from backend.rag_solution.pipeline.response_cache import get_response_cache
+from backend.rag_solution.repository.collection_repository import CollectionRepository
+from backend.rag_solution.retrieval.reranker import get_reranker
+from backend.rag_solution.retrieval.retriever import Retriever
+from backend.rag_solution.schemas.pipeline_schema import QueryInput
+from backend.vectordbs.factory import get_datastore
+from backend.vectordbs.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/pipeline", tags=["pipeline"])
+
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    """Return the vector store shared by all pipeline requests, so each request does not reconnect."""
+    return get_datastore(settings.vector_db)
+
+
+async def close_vector_store() -> None:
+    """Close the clients of the shared vector store, if it was created. Called on application shutdown."""
+    if get_vector_store.cache_info().currsize:
+        await get_vector_store().close_async()
+
+
+def _sse_event(data: dict, event: str = "message") -> str:
+    # JSON-encode the payload so newlines in the generated text cannot break the event framing
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_events(pipeline: RAGPipeline, query: str) -> AsyncIterator[str]:
+    try:
+        async for fragment in pipeline.generate_response_stream(query):
+            yield _sse_event({"text": fragment})
+        yield _sse_event({}, event="done")
+    except Exception as e:
+        # The response has already started, so the error is reported in-band
+        logger.error(f"Error streaming response: {e}")
+        yield _sse_event({"detail": str(e)}, event="error")
+
+
+@router.post("/stream",
+    summary="Stream a response",
+    description="Answer a query against a collection, streaming the generated text as server-sent events",
+    responses={
+        200: {"description": "Server-sent events: `message` events with a text fragment, then `done` or `error`"},
+        404: {"description": "Collection not found"},
+        500: {"description": "Internal server error"}
+    }
+)
+def stream_response(query_input: QueryInput, db: Session = Depends(get_db)):
+    """
+    Answer a query against a collection, streaming the generated text.
+
+    Args:
+        query_input (QueryInput): The query and the collection to answer it from.
+        db (Session): The database session.
+
+    Returns:
+        StreamingResponse: A text/event-stream of the generated text fragments.
+    """
+    collection = CollectionRepository(db).get(query_input.collection_id)
+    if collection is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+    # With a re-ranker, retrieve a wide candidate set cheaply and let it pick the final chunks,
+    # rather than dropping candidates below the retriever's default similarity threshold.
+    # The Retriever caps the candidate count at what the store accepts per query.
+    candidates = {"top_k": settings.reranker_candidates,
+                  "similarity_threshold": settings.reranker_candidate_threshold} if get_reranker() is not None else {}
+    retriever = Retriever(get_vector_store(), collection_name=collection.vector_db_name, **candidates)
+    pipeline = RAGPipeline(retriever, Generator())
+    return StreamingResponse(
+        _stream_events(pipeline, query_input.query),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream, which would delay the first token
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats",
+    summary="Get response cache statistics",
+    description="Get the hit rate and size of the semantic response cache of this process",
+    response_model=dict,
+    responses={
+        200: {"description": "Statistics retrieved successfully"}
+    }
+)
+def get_cache_stats():
+    """
+    Get the response cache statistics.
+
+    Returns:
+        dict: Whether the cache is enabled and, if it is, its hit and miss counters, hit rate and size.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -20,6 +20,7 @@ class CollectionInput(BaseModel):
     is_private: bool
     users: List[UUID] = []
     status: CollectionStatus = CollectionStatus.CREATED
+    index_profile: Optional[str] = None
 
 class CollectionOutput(BaseModel):
     id: UUID
@@ -0,0 +1,8 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class QueryInput(BaseModel):
+    query: str
+    collection_id: UUID
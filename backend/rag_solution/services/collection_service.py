@@ -9,6 +9,7 @@ from fastapi import BackgroundTasks, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
 from backend.rag_solution.data_ingestion.ingestion import ingest_documents
+from backend.rag_solution.pipeline.response_cache import invalidate_response_cache
 from backend.rag_solution.repository.collection_repository import CollectionRepository
 from backend.rag_solution.schemas.collection_schema import CollectionInput, CollectionOutput, CollectionStatus
 from backend.rag_solution.services.file_management_service import FileManagementService
@@ -55,7 +56,10 @@ class CollectionService:
             new_collection = self.collection_repository.create(collection, vector_db_name)
 
             # 2. Create in vector database
-            self.vector_store.create_collection(vector_db_name, {"is_private": collection.is_private})
+            metadata = {"is_private": collection.is_private}
+            if collection.index_profile:
+                metadata["index_profile"] = collection.index_profile
+            self.vector_store.create_collection(vector_db_name, metadata)
             logger.info(f"Collections created in both databases: {new_collection.id}")
 
             # 3. Add the creator to the collection
@@ -171,6 +175,7 @@ class CollectionService:
 
             # Delete from vector database
             self.vector_store.delete_collection(collection.vector_db_name)
+            invalidate_response_cache(collection.vector_db_name)
             logger.info(f"Collection {collection_id} deleted successfully")
             return True
         except Exception as e:
@@ -222,8 +227,14 @@ class CollectionService:
     
     def process_documents(self, file_paths: List[str], collection_id: UUID, vector_db_name: str):
         try:
-            ingest_documents(file_paths, self.vector_store, vector_db_name)
-            self.update_collection_status(collection_id, CollectionStatus.COMPLETED)
+            result = ingest_documents(file_paths, self.vector_store, vector_db_name)
+            if result.succeeded:
+                self.update_collection_status(collection_id, CollectionStatus.COMPLETED)
+            else:
+                logger.error(f"Documents of collection {collection_id} failed to ingest: "
+                             f"files {result.failed_files}, documents {result.failed_documents}, "
+                             f"flush {result.flush_error}")
+                self.update_collection_status(collection_id, CollectionStatus.ERROR)
         except Exception as e:
             logger.error(f"Error processing documents for collection {collection_id}: {str(e)}")
             self.update_collection_status(collection_id, CollectionStatus.ERROR)
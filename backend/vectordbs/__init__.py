@@ -1,6 +1,7 @@
 # vectordbs/__init__.py
 from backend.vectordbs.chroma_store import ChromaDBStore
 from backend.vectordbs.elasticsearch_store import ElasticSearchStore
+from backend.vectordbs.local_store import LocalVectorStore
 from backend.vectordbs.milvus_store import MilvusStore
 from backend.vectordbs.pinecone_store import PineconeStore
 from backend.vectordbs.vector_store import VectorStore
@@ -13,4 +14,5 @@ __all__ = [
     "ChromaStore",
     "ElasticsearchStore",
     "PineconeStore",
+    "LocalVectorStore",
 ]
@@ -4,11 +4,15 @@ from typing import Dict, List, Mapping, Optional, Union
 from chromadb import ClientAPI, chromadb
 
 from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_mongo_filter
+from backend.vectordbs.utils.sparse_index import (drop_sparse_index,
+                                                  get_sparse_index,
+                                                  sparse_index_enabled)
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
-                         DocumentMetadataFilter, QueryResult,
-                         QueryWithEmbedding, Source)
+                         MetadataFilter, QueryResult, QueryWithEmbedding,
+                         Source, vector_to_list)
 from .error_types import CollectionError, DocumentError
 from .vector_store import VectorStore
 
@@ -51,11 +55,13 @@ class ChromaDBStore(VectorStore):
         self._initialize_collection(collection_name)
 
         docs, embeddings, metadatas, ids = [], [], [], []
+        chunks: List[DocumentChunk] = []
 
         for document in documents:
             for chunk in document.chunks:
+                chunks.append(chunk)
                 docs.append(chunk.text)
-                embeddings.append(chunk.vectors)
+                embeddings.append(vector_to_list(chunk.vectors))
                 metadata: MetadataType = {
                     "source": str(chunk.metadata.source),
                     "source_id": chunk.metadata.source_id or "",
@@ -73,6 +79,9 @@ class ChromaDBStore(VectorStore):
                 embeddings=embeddings,
                 metadatas=metadatas,
                 documents=docs)
+            # Chroma has no BM25 search, so hybrid retrieval uses a local sparse index
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).add(chunks)
             logging.info(f"Successfully added documents to collection '{collection_name}'")
         except Exception as e:
             logging.error(f"Failed to add documents to ChromaDB collection '{collection_name}': {e}")
@@ -81,28 +90,47 @@ class ChromaDBStore(VectorStore):
         return ids
 
     def retrieve_documents(
-        self, query: str, collection_name: str, limit: int = 10
+        self, query: str, collection_name: str, limit: int = 10,
+        output_fields: Optional[List[str]] = None, include_vectors: bool = False
     ) -> List[QueryResult]:
         """Retrieves documents based on a query string."""
         query_embeddings = get_embeddings(query)
-        if not query_embeddings:
+        if len(query_embeddings) == 0:
             raise DocumentError("Failed to generate embeddings for the query string.")
-        query_with_embedding = QueryWithEmbedding(text=query, vectors=query_embeddings)
-        return self.query(collection_name, query_with_embedding, number_of_results=limit)
+        query_with_embedding = QueryWithEmbedding(text=query, vectors=query_embeddings[0])
+        return self.query(collection_name, query_with_embedding, number_of_results=limit,
+                          output_fields=output_fields, include_vectors=include_vectors)
 
     def query(
         self, collection_name: str, query: QueryWithEmbedding,
-        number_of_results: int = 10, filter: Optional[DocumentMetadataFilter] = None
+        number_of_results: int = 10, filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None, include_vectors: bool = False
     ) -> List[QueryResult]:
         """Queries the vector store with filtering and query mode options."""
+        return self.query_batch(collection_name, [query], number_of_results=number_of_results, filter=filter,
+                                output_fields=output_fields, include_vectors=include_vectors)[0]
+
+    def query_batch(
+        self, collection_name: str, queries: List[QueryWithEmbedding],
+        number_of_results: int = 10, filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None, include_vectors: bool = False
+    ) -> List[List[QueryResult]]:
+        """Queries the vector store with several embeddings in one call, one result list per query."""
+        if not queries:
+            return []
         collection = self._get_collection(collection_name)
 
+        include = ["documents", "metadatas", "distances"]
+        if include_vectors:
+            include.append("embeddings")
         try:
             response = collection.query(
-                query_embeddings=query.vectors,
-                n_results=number_of_results)
-            logging.info(f"Query response: {response}")
-            return self._process_search_results(response)
+                query_embeddings=[vector_to_list(query.vectors) for query in queries],
+                n_results=number_of_results,
+                where=to_mongo_filter(filter),
+                include=include)
+            logging.debug(f"Query response: {response}")
+            return [self._process_search_results(response, output_fields, index=i) for i in range(len(queries))]
         except Exception as e:
             logging.error(f"Failed to query ChromaDB collection '{collection_name}': {e}")
             raise DocumentError(f"Failed to query ChromaDB collection '{collection_name}': {e}")
@@ -112,6 +140,7 @@ class ChromaDBStore(VectorStore):
 
         try:
             self._client.delete_collection(collection_name)
+            drop_sparse_index(collection_name)
             logging.info(f"Deleted collection '{collection_name}'")
         except Exception as e:
             logging.error(f"Failed to delete ChromaDB collection: {e}")
@@ -123,40 +152,55 @@ class ChromaDBStore(VectorStore):
 
         try:
             deleted_count = collection.delete(ids=document_ids)
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).remove_documents(document_ids)
             logging.info(f"Deleted {deleted_count} documents from collection '{collection_name}'")
             return deleted_count
         except Exception as e:
             logging.error(f"Failed to delete documents from ChromaDB collection '{collection_name}': {e}")
             raise DocumentError(f"Failed to delete documents from ChromaDB collection '{collection_name}': {e}")
 
+    def flush(self, collection_name: str) -> None:
+        """Persists the local sparse index of the collection. Upserts are written through."""
+        if sparse_index_enabled():
+            get_sparse_index(collection_name).save()
+
     def _convert_to_chunk(self, id: str, text: str, vectors: Optional[List[float]], metadata: Dict) -> DocumentChunk:
         return DocumentChunk(
             chunk_id=id,
             text=text,
             vectors=vectors,
             metadata=DocumentChunkMetadata(
-                source=Source(metadata["source"]) if metadata["source"] else Source.OTHER,
-                source_id=metadata["source_id"],
-                url=metadata["url"],
-                created_at=metadata["created_at"],
-                author=metadata["author"],
+                source=Source(metadata["source"]) if metadata.get("source") else Source.OTHER,
+                source_id=metadata.get("source_id"),
+                url=metadata.get("url"),
+                created_at=metadata.get("created_at"),
+                author=metadata.get("author"),
             ),
-            document_id=metadata["document_id"],
+            document_id=metadata.get("document_id"),
         )
 
-    def _process_search_results(self, response: Dict) -> List[QueryResult]:
+    def _process_search_results(self, response: Dict, output_fields: Optional[List[str]] = None,
+                                index: int = 0) -> List[QueryResult]:
+        """Converts the hits of the query embedding at `index` in a (batched) query response."""
         results = []
-        ids = response.get("ids", [[]])[0]
-        distances = response.get("distances", [[]])[0]
-        metadatas = response.get("metadatas", [[]])[0]
-        documents = response.get("documents", [[]])[0]
+        ids = (response.get("ids") or [[]])[index]
+        distances = (response.get("distances") or [[]])[index]
+        metadatas = (response.get("metadatas") or [[]])[index]
+        documents = (response.get("documents") or [[]])[index]
+        # Only present when the query asked for embeddings
+        embeddings = (response.get("embeddings") or [None] * (index + 1))[index]
 
         for i in range(len(ids)):
+            metadata = metadatas[i]
+            if output_fields is not None:
+                metadata = {key: value for key, value in metadata.items()
+                            if key in output_fields or key == "document_id"}
             chunk = self._convert_to_chunk(
                 id=ids[i],
                 text=documents[i],
-                vectors=None,  # Assuming vectors are not returned in the response, otherwise add appropriate key
-                metadata=metadatas[i],
+                vectors=embeddings[i] if embeddings is not None else None,
+                metadata=metadata,
             )
             results.append(QueryResult(data=[chunk], similarities=[distances[i]], ids=[ids[i]]))
         return results
@@ -4,10 +4,19 @@ from dataclasses import dataclass
 from enum import Enum, auto
 from typing import Any, List, Optional, Sequence, Union
 
-Embedding = Union[Sequence[float], Sequence[int]]
+import numpy as np
+
+Embedding = Union[Sequence[float], Sequence[int], np.ndarray]
 Embeddings = List[Embedding]
 
 
+def vector_to_list(vector: Optional[Embedding]) -> Optional[List[float]]:
+    """Convert a numpy vector to a plain list for clients that only accept JSON-serializable values."""
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return vector
+
+
 @dataclass
 class Document:
     name: str
@@ -21,7 +30,7 @@ class Document:
 class DocumentChunk:
     chunk_id: str
     text: str
-    vectors: Optional[List[float]] = None
+    vectors: Optional[Embedding] = None
     metadata: Optional[DocumentChunkMetadata] = None
     document_id: Optional[str] = None
 
@@ -74,6 +83,22 @@ class DocumentMetadataFilter:
     value: Any = None
 
 
+class FilterCondition(str, Enum):
+    AND = "and"
+    OR = "or"
+    NOT = "not"
+
+
+@dataclass
+class MetadataFilterGroup:
+    """Boolean combination of filters. NOT negates the conjunction of its filters."""
+    filters: List[MetadataFilter]
+    condition: FilterCondition = FilterCondition.AND
+
+
+MetadataFilter = Union[DocumentMetadataFilter, MetadataFilterGroup]
+
+
 @dataclass
 class DocumentChunkWithScore(DocumentChunk):
     score: Optional[float] = None
@@ -97,7 +122,7 @@ class VectorStoreQuery:
 @dataclass
 class QueryWithEmbedding:
     text: str
-    vectors: List[float]
+    vectors: Embedding
 
 
 @dataclass
@@ -107,7 +132,6 @@ class VectorStoreData:
     embedding: List[float]
 
 
-@dataclass
 class VectorStoreQueryMode(Enum):
     DEFAULT = auto()
     SPARSE = auto()
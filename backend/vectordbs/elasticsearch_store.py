@@ -1,14 +1,18 @@
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
-from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, NotFoundError
+from elasticsearch.helpers import streaming_bulk
 
 from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_elasticsearch_query
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
-                         DocumentMetadataFilter, QueryResult,
-                         QueryWithEmbedding, Source)
+                         DocumentChunkWithScore, MetadataFilter, QueryResult,
+                         QueryWithEmbedding, Source, vector_to_list)
 from .error_types import CollectionError, DocumentError
 from .vector_store import VectorStore
 
@@ -23,20 +27,48 @@ ELASTIC_PASSWORD = settings.elastic_password
 ELASTIC_CACERT_PATH = settings.elastic_cacert_path
 ELASTIC_CLOUD_ID = settings.elastic_cloud_id
 ELASTIC_API_KEY = settings.elastic_api_key
+ELASTIC_BULK_CHUNK_SIZE = settings.elastic_bulk_chunk_size
+ELASTIC_BULK_MAX_RETRIES = settings.elastic_bulk_max_retries
+ELASTIC_BULK_REFRESH_INTERVAL = settings.elastic_bulk_refresh_interval
+# Candidates considered per requested result by a KNN search, at least MIN_NUM_CANDIDATES
+KNN_CANDIDATES_PER_RESULT = 10
+MIN_NUM_CANDIDATES = 100
+# Elasticsearch rejects KNN searches with k or num_candidates above this limit, or with k above num_candidates
+MAX_NUM_CANDIDATES = 10000
 
 
 class ElasticSearchStore(VectorStore):
+    max_query_results = MAX_NUM_CANDIDATES
+
     def __init__(self, host: str = ELASTICSEARCH_HOST, port: int = int(ELASTICSEARCH_PORT)) -> None:
         self.index_name = ELASTICSEARCH_INDEX
         if ELASTIC_CLOUD_ID:
-            self.client = Elasticsearch(ELASTIC_CLOUD_ID, api_key=ELASTIC_API_KEY)
+            self._client_args: Dict[str, Any] = {"cloud_id": ELASTIC_CLOUD_ID, "api_key": ELASTIC_API_KEY}
         else:
-            self.client = Elasticsearch(
-                hosts=[{"host": host, "port": int(port), "scheme": "https"}],
-                ca_certs=ELASTIC_CACERT_PATH,
-                basic_auth=("elastic", ELASTIC_PASSWORD),
-                verify_certs=False  # Disable SSL verification
-            )
+            self._client_args = {
+                "hosts": [{"host": host, "port": int(port), "scheme": "https"}],
+                "ca_certs": ELASTIC_CACERT_PATH,
+                "basic_auth": ("elastic", ELASTIC_PASSWORD),
+                "verify_certs": False,  # Disable SSL verification
+            }
+        self.client = Elasticsearch(**self._client_args)
+        # Created on first use, since it must be bound to the running event loop
+        self._async_client: Optional[AsyncElasticsearch] = None
+        # Number of open bulk loads of each index, and the refresh_interval this process replaced
+        self._bulk_loads: Dict[str, int] = {}
+        self._refresh_intervals: Dict[str, Optional[str]] = {}
+        self._refresh_lock = threading.Lock()
+
+    def _get_async_client(self) -> AsyncElasticsearch:
+        if self._async_client is None:
+            self._async_client = AsyncElasticsearch(**self._client_args)
+        return self._async_client
+
+    async def close_async(self) -> None:
+        """Close the async client, if it was created."""
+        if self._async_client is not None:
+            client, self._async_client = self._async_client, None
+            await client.close()
 
     def create_collection(self, collection_name: str, metadata: Optional[dict] = None) -> None:
         """
@@ -76,62 +108,244 @@ class ElasticSearchStore(VectorStore):
             logging.error(f"Failed to create collection '{collection_name}': {e}", exc_info=True)
             raise CollectionError(f"Failed to create collection '{collection_name}': {e}")
 
-    def add_documents(self, collection_name: str, documents: List[Document]) -> None:
+    def add_documents(self, collection_name: str, documents: List[Document]) -> List[str]:
         """
-        Add documents to the specified Elasticsearch index.
+        Add documents to the specified Elasticsearch index with the _bulk API.
+
+        Each chunk becomes one Elasticsearch document whose _id is the chunk id,
+        so retried batches overwrite instead of duplicating. Chunks that already
+        carry vectors are indexed as is; the rest are embedded in one request.
+        Inside bulk_load() the index is not refreshed periodically while documents are added.
 
         Args:
             collection_name (str): The name of the index to add documents to.
             documents (List[Document]): A list of documents to add.
+
+        Returns:
+            List[str]: The IDs of the documents whose chunks were all indexed.
+
+        Raises:
+            DocumentError: If the bulk request fails or no chunk could be indexed.
         """
+        chunks: List[DocumentChunk] = []
+        for document in documents:
+            for chunk in document.chunks:
+                chunk.document_id = document.document_id
+                chunks.append(chunk)
+        if not chunks:
+            return []
+
+        missing = [chunk for chunk in chunks if chunk.vectors is None]
+        if missing:
+            embeddings = get_embeddings([chunk.text for chunk in missing])
+            if len(embeddings) != len(missing):
+                raise DocumentError(f"Failed to generate embeddings for {len(missing)} chunks")
+            for chunk, vector in zip(missing, embeddings):
+                chunk.vectors = vector
+
+        chunk_documents = {chunk.chunk_id: chunk.document_id for chunk in chunks}
+        failed_documents = set()
         try:
-            for document in documents:
-                embeddings = get_embeddings(document.content, EMBEDDING_MODEL)
-                body = {
-                    "text": document.content,
-                    "embedding": embeddings,
-                    "source": document.metadata.source,
-                    "url": document.metadata.url,
-                    "created_at": document.metadata.created_at,
-                    "author": document.metadata.author,
-                    "document_id": document.document_id,
-                    "chunk_id": document.chunk_id,
-                }
-                self.client.index(index=collection_name, body=body)
-            logging.info(f"Documents added to collection '{collection_name}' successfully")
+            for ok, item in streaming_bulk(
+                self.client,
+                (self._bulk_action(collection_name, chunk) for chunk in chunks),
+                chunk_size=ELASTIC_BULK_CHUNK_SIZE,
+                max_retries=ELASTIC_BULK_MAX_RETRIES,
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                if not ok:
+                    result = item.get("index", {})
+                    logging.error(f"Failed to index chunk '{result.get('_id')}' into '{collection_name}': "
+                                  f"{result.get('error')}")
+                    failed_documents.add(chunk_documents.get(result.get("_id")))
         except Exception as e:
             logging.error(f"Failed to add documents to collection '{collection_name}': {e}", exc_info=True)
             raise DocumentError(f"Failed to add documents to collection '{collection_name}': {e}")
 
+        document_ids = [document.document_id for document in documents if document.document_id not in failed_documents]
+        if failed_documents and not document_ids:
+            raise DocumentError(f"Failed to index any of {len(chunks)} chunks into collection '{collection_name}'")
+        logging.info(f"Indexed {len(chunks)} chunks into collection '{collection_name}' "
+                     f"with {len(failed_documents)} failed documents")
+        return document_ids
+
+    @staticmethod
+    def _bulk_action(collection_name: str, chunk: DocumentChunk) -> Dict[str, Any]:
+        """Build the bulk index action for a single chunk."""
+        metadata = chunk.metadata
+        return {
+            "_op_type": "index",
+            "_index": collection_name,
+            "_id": chunk.chunk_id,
+            "_source": {
+                "text": chunk.text,
+                "embedding": vector_to_list(chunk.vectors),
+                "source": metadata.source.value if metadata and metadata.source else Source.OTHER.value,
+                "url": metadata.url if metadata and metadata.url else None,
+                "created_at": metadata.created_at if metadata and metadata.created_at else None,
+                "author": metadata.author if metadata and metadata.author else None,
+                "document_id": chunk.document_id,
+                "chunk_id": chunk.chunk_id,
+            },
+        }
+
+    @contextmanager
+    def bulk_load(self, collection_name: str) -> Iterator[None]:
+        """
+        Disable periodic refreshes of an index while documents are loaded into it.
+
+        Loads are reference counted: the first one to open sets the refresh interval to
+        ELASTIC_BULK_REFRESH_INTERVAL and the last one to close restores the previous value,
+        even if the load fails. If the index already has the bulk value, e.g. set by a load
+        in another process, it is left to that load to restore it.
+
+        Args:
+            collection_name (str): The name of the index being loaded.
+        """
+        with self._refresh_lock:
+            self._bulk_loads[collection_name] = self._bulk_loads.get(collection_name, 0) + 1
+            if self._bulk_loads[collection_name] == 1:
+                self._relax_refresh_interval(collection_name)
+        try:
+            yield
+        finally:
+            with self._refresh_lock:
+                self._bulk_loads[collection_name] -= 1
+                if not self._bulk_loads[collection_name]:
+                    del self._bulk_loads[collection_name]
+                    self._restore_refresh_interval(collection_name)
+
+    def _relax_refresh_interval(self, collection_name: str) -> None:
+        """Set the bulk refresh interval, remembering the previous value. Called with the refresh lock held."""
+        if not ELASTIC_BULK_REFRESH_INTERVAL:
+            return
+        try:
+            response = self.client.indices.get_settings(index=collection_name, name="index.refresh_interval")
+            index_settings = response.get(collection_name, {}).get("settings", {}).get("index", {})
+            refresh_interval = index_settings.get("refresh_interval")
+            if refresh_interval == ELASTIC_BULK_REFRESH_INTERVAL:
+                logging.info(f"refresh_interval of '{collection_name}' is already {refresh_interval}")
+                return
+            self.client.indices.put_settings(
+                index=collection_name, settings={"index": {"refresh_interval": ELASTIC_BULK_REFRESH_INTERVAL}}
+            )
+            # None restores the cluster default when the index had no explicit value
+            self._refresh_intervals[collection_name] = refresh_interval
+            logging.info(f"Set refresh_interval of '{collection_name}' to {ELASTIC_BULK_REFRESH_INTERVAL} for bulk load")
+        except Exception as e:
+            logging.warning(f"Could not relax refresh_interval of '{collection_name}': {e}")
+
+    def _restore_refresh_interval(self, collection_name: str) -> None:
+        """Restore the refresh interval replaced by _relax_refresh_interval. Called with the refresh lock held."""
+        if collection_name not in self._refresh_intervals:
+            return
+        refresh_interval = self._refresh_intervals.pop(collection_name)
+        try:
+            self.client.indices.put_settings(
+                index=collection_name, settings={"index": {"refresh_interval": refresh_interval}}
+            )
+            logging.info(f"Restored refresh_interval of '{collection_name}' to {refresh_interval or 'default'}")
+        except Exception as e:
+            logging.error(f"Could not restore refresh_interval of '{collection_name}' to "
+                          f"{refresh_interval or 'default'}: {e}")
+
+    def flush(self, collection_name: str) -> None:
+        """
+        Refresh the index, making the added documents visible to searches.
+
+        Args:
+            collection_name (str): The name of the index to flush.
+        """
+        try:
+            self.client.indices.refresh(index=collection_name)
+        except Exception as e:
+            logging.error(f"Failed to flush collection '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to flush collection '{collection_name}': {e}")
+
     def retrieve_documents(
         self,
         query: str,
         collection_name: str,
         limit: int = 10,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[QueryResult]:
+        """
+        Retrieve documents from the specified Elasticsearch index by embedding similarity.
+
+        Args:
+            query (str): The query string.
+            collection_name (Optional[str]): The name of the index to query.
+            limit (int): The number of results to return.
+            output_fields (Optional[List[str]]): Fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
+
+        Returns:
+            List[QueryResult]: A list of query results.
+        """
+        query_embeddings = self._embed_query(query)
+        return self.query(collection_name, query_embeddings, number_of_results=limit,
+                          output_fields=output_fields, include_vectors=include_vectors)
+
+    async def retrieve_documents_async(
+        self,
+        query: str,
+        collection_name: str,
+        limit: int = 10,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[QueryResult]:
+        """Async version of retrieve_documents using the native async client."""
+        query_embeddings = await self._run_sync(self._embed_query, query)
+        return await self.query_async(collection_name, query_embeddings, number_of_results=limit,
+                                      output_fields=output_fields, include_vectors=include_vectors)
+
+    @staticmethod
+    def _embed_query(query: str) -> QueryWithEmbedding:
+        embeddings = get_embeddings(query)
+        if len(embeddings) == 0:
+            raise DocumentError("Failed to generate embeddings for the query string.")
+        return QueryWithEmbedding(text=query, vectors=embeddings[0])
+
+    def sparse_retrieve(
+        self,
+        query: str,
+        collection_name: str,
+        limit: int = 10,
+        output_fields: Optional[List[str]] = None,
     ) -> List[QueryResult]:
         """
-        Retrieve documents from the specified Elasticsearch index based on a query.
+        Retrieve documents from the specified Elasticsearch index with a BM25 match query.
 
         Args:
             query (str): The query string.
             collection_name (Optional[str]): The name of the index to query.
             limit (int): The number of results to return.
+            output_fields (Optional[List[str]]): Fields to return. Defaults to all of them.
 
         Returns:
             List[QueryResult]: A list of query results.
         """
         try:
-            response = self.client.search(
-                index=collection_name,
-                body={
-                    "query": {
-                        "match": {
-                            "text": query
-                        }
-                    },
-                    "size": limit
-                }
-            )
+            body = self._match_body(query, limit, output_fields, include_vectors=False)
+            response = self.client.search(index=collection_name, body=body)
+            return self._process_search_results(response)
+        except Exception as e:
+            logging.error(f"Failed to retrieve documents from index '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to retrieve documents from index '{collection_name}': {e}")
+
+    async def sparse_retrieve_async(
+        self,
+        query: str,
+        collection_name: str,
+        limit: int = 10,
+        output_fields: Optional[List[str]] = None,
+    ) -> List[QueryResult]:
+        """Async version of sparse_retrieve using the native async client."""
+        try:
+            body = self._match_body(query, limit, output_fields, include_vectors=False)
+            response = await self._get_async_client().search(index=collection_name, body=body)
             return self._process_search_results(response)
         except Exception as e:
             logging.error(f"Failed to retrieve documents from index '{collection_name}': {e}", exc_info=True)
@@ -142,7 +356,9 @@ class ElasticSearchStore(VectorStore):
         collection_name: str,
         query: QueryWithEmbedding,
         number_of_results: int = 10,
-        filter: Optional[DocumentMetadataFilter] = None,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
     ) -> List[QueryResult]:
         """
         Query the specified Elasticsearch index using KNN.
@@ -151,34 +367,92 @@ class ElasticSearchStore(VectorStore):
             collection_name (str): The name of the index to query.
             query (QueryWithEmbedding): The query embedding.
             number_of_results (int): The number of results to return.
-            filter (Optional[DocumentMetadataFilter]): A filter to apply to the query.
+            filter (Optional[MetadataFilter]): A filter to apply to the query.
+            output_fields (Optional[List[str]]): Fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
 
         Returns:
             List[QueryResult]: A list of query results.
         """
         try:
-            body = {
-                "size": number_of_results,
-                "query": {
-                    "bool": {
-                        "must": {
-                            "knn": {
-                                "field": "embedding",
-                                "query_vector": query.vectors,
-                                "k": number_of_results,
-                                "num_candidates": 100,
-                            }
-                        },
-                        "filter": self._build_filters(filter),
-                    }
-                }
-            }
+            body = self._knn_body(query, number_of_results, filter, output_fields, include_vectors)
             response = self.client.search(index=collection_name, body=body)
             return self._process_search_results(response)
         except Exception as e:
             logging.error(f"Failed to query documents from index '{collection_name}': {e}", exc_info=True)
             raise DocumentError(f"Failed to query documents from index '{collection_name}': {e}")
 
+    async def query_async(
+        self,
+        collection_name: str,
+        query: QueryWithEmbedding,
+        number_of_results: int = 10,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[QueryResult]:
+        """Async version of query using the native async client."""
+        try:
+            body = self._knn_body(query, number_of_results, filter, output_fields, include_vectors)
+            response = await self._get_async_client().search(index=collection_name, body=body)
+            return self._process_search_results(response)
+        except Exception as e:
+            logging.error(f"Failed to query documents from index '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to query documents from index '{collection_name}': {e}")
+
+    def query_batch(
+        self,
+        collection_name: str,
+        queries: List[QueryWithEmbedding],
+        number_of_results: int = 10,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[List[QueryResult]]:
+        """
+        Query the specified Elasticsearch index with several embeddings in one _msearch request.
+
+        Args:
+            collection_name (str): The name of the index to query.
+            queries (List[QueryWithEmbedding]): The query embeddings.
+            number_of_results (int): The number of results to return per query.
+            filter (Optional[MetadataFilter]): A filter to apply to every query.
+            output_fields (Optional[List[str]]): Fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
+
+        Returns:
+            List[List[QueryResult]]: The query results of each query, in the order of the queries.
+        """
+        if not queries:
+            return []
+        try:
+            searches = self._msearch_body(queries, number_of_results, filter, output_fields, include_vectors)
+            response = self.client.msearch(index=collection_name, searches=searches)
+            return self._process_msearch_results(response)
+        except Exception as e:
+            logging.error(f"Failed to query documents from index '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to query documents from index '{collection_name}': {e}")
+
+    async def query_batch_async(
+        self,
+        collection_name: str,
+        queries: List[QueryWithEmbedding],
+        number_of_results: int = 10,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[List[QueryResult]]:
+        """Async version of query_batch using the native async client."""
+        if not queries:
+            return []
+        try:
+            searches = self._msearch_body(queries, number_of_results, filter, output_fields, include_vectors)
+            response = await self._get_async_client().msearch(index=collection_name, searches=searches)
+            return self._process_msearch_results(response)
+        except Exception as e:
+            logging.error(f"Failed to query documents from index '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to query documents from index '{collection_name}': {e}")
+
     def delete_collection(self, collection_name: str) -> None:
         """
         Delete the specified Elasticsearch index.
@@ -195,36 +469,158 @@ class ElasticSearchStore(VectorStore):
             logging.error(f"Failed to delete collection '{collection_name}': {e}", exc_info=True)
             raise CollectionError(f"Failed to delete collection '{collection_name}': {e}")
 
+    async def delete_collection_async(self, collection_name: str) -> None:
+        """Async version of delete_collection using the native async client."""
+        try:
+            await self._get_async_client().indices.delete(index=collection_name)
+            logging.info(f"Collection '{collection_name}' deleted successfully")
+        except NotFoundError:
+            logging.warning(f"Collection '{collection_name}' not found")
+        except Exception as e:
+            logging.error(f"Failed to delete collection '{collection_name}': {e}", exc_info=True)
+            raise CollectionError(f"Failed to delete collection '{collection_name}': {e}")
+
     def delete_documents(self, document_ids: List[str], collection_name: str) -> None:
         """
         Delete documents from the specified Elasticsearch index.
 
+        Chunks are indexed under their own IDs, so all chunks of the given
+        documents are removed with a single delete-by-query.
+
         Args:
             document_ids (List[str]): A list of document IDs to delete.
             collection_name (Optional[str]): The name of the index to delete documents from.
         """
         try:
-            for document_id in document_ids:
-                self.client.delete(index=collection_name, id=document_id)
+            self.client.delete_by_query(index=collection_name, query={"terms": {"document_id": document_ids}})
             logging.info(f"Documents deleted from collection '{collection_name}' successfully")
         except Exception as e:
             logging.error(f"Failed to delete documents from collection '{collection_name}': {e}", exc_info=True)
             raise DocumentError(f"Failed to delete documents from collection '{collection_name}': {e}")
 
-    def _build_filters(
-        self, filter: Optional[DocumentMetadataFilter]
-    ) -> Dict[str, Any]:
-        """Build Elasticsearch filters from a DocumentMetadataFilter."""
-        if not filter:
-            return {}
-        filters = []
-        if filter.operator.lower() in ["eq", "equals", "term"]:
-            field_filter = {"term": {filter.field_name: filter.value}}
-            filters.append(field_filter)
-        elif filter.operator.lower() == "gte":
-            range_filter = {"range": {filter.field_name: {"gte": filter.value}}}
-            filters.append(range_filter)
-        elif filter.operator.lower() == "lte":
-            range_filter = {"range": {filter.field_name: {"lte": filter.value}}}
-            filters.append(range_filter)
-        return {"bool": {"filter": filters}}
+    async def delete_documents_async(self, collection_name: str, document_ids: List[str]) -> None:
+        """Async version of delete_documents using the native async client."""
+        try:
+            await self._get_async_client().delete_by_query(
+                index=collection_name, query={"terms": {"document_id": document_ids}}
+            )
+            logging.info(f"Documents deleted from collection '{collection_name}' successfully")
+        except Exception as e:
+            logging.error(f"Failed to delete documents from collection '{collection_name}': {e}", exc_info=True)
+            raise DocumentError(f"Failed to delete documents from collection '{collection_name}': {e}")
+
+    def _match_body(self, query: str, limit: int, output_fields: Optional[List[str]],
+                    include_vectors: bool) -> Dict[str, Any]:
+        """Build the request body of a full-text search."""
+        return {
+            "query": {
+                "match": {
+                    "text": query
+                }
+            },
+            "size": limit,
+            "_source": self._source_filter(output_fields, include_vectors),
+        }
+
+    def _knn_body(self, query: QueryWithEmbedding, number_of_results: int,
+                  filter: Optional[MetadataFilter], output_fields: Optional[List[str]],
+                  include_vectors: bool) -> Dict[str, Any]:
+        """
+        Build the request body of a KNN search.
+
+        The filter is set on the knn clause itself, so it restricts the
+        candidates during the graph search instead of post-filtering the top k.
+        num_candidates grows with k, so large requests (e.g. re-ranker
+        candidates) keep the same oversampling and stay within the limits
+        Elasticsearch accepts.
+        """
+        k = min(number_of_results, MAX_NUM_CANDIDATES)
+        knn: Dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": vector_to_list(query.vectors),
+            "k": k,
+            "num_candidates": min(max(k * KNN_CANDIDATES_PER_RESULT, MIN_NUM_CANDIDATES), MAX_NUM_CANDIDATES),
+        }
+        filters = self._build_filters(filter)
+        if filters:
+            knn["filter"] = filters
+        return {
+            "size": k,
+            "query": {"knn": knn},
+            "_source": self._source_filter(output_fields, include_vectors),
+        }
+
+    def _msearch_body(self, queries: List[QueryWithEmbedding], number_of_results: int,
+                      filter: Optional[MetadataFilter], output_fields: Optional[List[str]],
+                      include_vectors: bool) -> List[Dict[str, Any]]:
+        """Build the header and body pairs of a multi search over the request index."""
+        searches: List[Dict[str, Any]] = []
+        for query in queries:
+            searches.append({})
+            searches.append(self._knn_body(query, number_of_results, filter, output_fields, include_vectors))
+        return searches
+
+    @staticmethod
+    def _source_filter(output_fields: Optional[List[str]], include_vectors: bool) -> Dict[str, Any]:
+        """
+        Build the _source projection for a search request.
+
+        The embedding is excluded unless include_vectors is set, so hits only
+        carry the fields the caller reads.
+        """
+        source: Dict[str, Any] = {}
+        if output_fields is not None:
+            source["includes"] = list(dict.fromkeys(["chunk_id", "document_id", *output_fields]))
+        if include_vectors:
+            if "includes" in source:
+                source["includes"].append("embedding")
+        else:
+            source["excludes"] = ["embedding"]
+        return source
+
+    def _process_search_results(self, response: Dict[str, Any]) -> List[QueryResult]:
+        """
+        Process search results from Elasticsearch.
+
+        Args:
+            response (Dict[str, Any]): The search response to process.
+
+        Returns:
+            List[QueryResult]: The list of query results.
+        """
+        chunks_with_scores = []
+        similarities = []
+        ids = []
+        for hit in response["hits"]["hits"]:
+            source = hit.get("_source", {})
+            chunks_with_scores.append(
+                DocumentChunkWithScore(
+                    chunk_id=source.get("chunk_id", hit["_id"]),
+                    text=source.get("text"),
+                    vectors=source.get("embedding"),
+                    metadata=DocumentChunkMetadata(
+                        source=Source(source["source"]) if source.get("source") else Source.OTHER,
+                        url=source.get("url", ""),
+                        created_at=source.get("created_at", ""),
+                        author=source.get("author", ""),
+                    ),
+                    document_id=source.get("document_id"),
+                    score=hit["_score"],
+                )
+            )
+            similarities.append(hit["_score"])
+            ids.append(source.get("chunk_id", hit["_id"]))
+        return [QueryResult(data=chunks_with_scores, similarities=similarities, ids=ids)]
+
+    def _process_msearch_results(self, response: Dict[str, Any]) -> List[List[QueryResult]]:
+        """Process the responses of a multi search, failing if any of the searches failed."""
+        results = []
+        for item in response["responses"]:
+            if "error" in item:
+                raise DocumentError(f"Search failed: {item['error']}")
+            results.append(self._process_search_results(item))
+        return results
+
+    def _build_filters(self, filter: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
+        """Build an Elasticsearch filter clause from a metadata filter."""
+        return to_elasticsearch_query(filter)
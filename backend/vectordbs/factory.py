@@ -21,5 +21,9 @@ def get_datastore(datastore: str) -> VectorStore:
         from .elasticsearch_store import ElasticSearchStore
 
         return ElasticSearchStore()
+    elif datastore == "local":
+        from .local_store import get_local_store
+
+        return get_local_store()
     else:
         raise ValueError(f"Unsupported vector database: {datastore}")
@@ -0,0 +1,681 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_predicate
+from backend.vectordbs.utils.sparse_index import (drop_sparse_index,
+                                                  get_sparse_index,
+                                                  sparse_index_enabled)
+from backend.vectordbs.utils.watsonx import get_embeddings
+
+from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
+                         DocumentChunkWithScore, MetadataFilter,
+                         MetadataFilterGroup, QueryResult,
+                         QueryWithEmbedding, Source)
+from .error_types import CollectionError, DocumentError, VectorStoreError
+from .vector_store import VectorStore
+
+EMBEDDING_DIM = settings.embedding_dim
+LOCAL_STORE_DIR = settings.local_store_dir or os.path.join(settings.file_storage_path, "local_store")
+LOCAL_STORE_INDEX = settings.local_store_index
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+METADATA_FILE = "metadata.json"
+HNSW_FILE = "index.hnsw"
+IVF_FILE = "index.ivf.npz"
+
+# Metadata columns kept for every row, in addition to the vector
+COLUMNS = ["chunk_id", "document_id", "text", "source", "source_id", "url", "created_at", "author"]
+MIN_CAPACITY = 1024
+
+
+class FlatIndex:
+    """Exact search over all live rows. Used for small collections and as the fallback index."""
+
+    name = "flat"
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        pass
+
+    def resize(self, capacity: int) -> None:
+        pass
+
+    def mark_deleted(self, rows: List[int]) -> None:
+        pass
+
+    def search(self, query: np.ndarray, k: int, vectors: np.ndarray,
+               live: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return _exact_search(query, k, vectors, live)
+
+    def save(self, path: str, count: int) -> None:
+        pass
+
+    def load(self, path: str, count: int, capacity: int) -> bool:
+        """Load the index saved under path. Returns False if it must be rebuilt from the vectors."""
+        return True
+
+
+class IVFIndex(FlatIndex):
+    """
+    Inverted file index: rows are assigned to the nearest of nlist k-means
+    centroids and a query only scans the rows of its nprobe nearest centroids.
+
+    The centroids are trained once enough rows exist; until then searches are exact.
+    """
+
+    name = "ivf"
+
+    def __init__(self, nlist: Optional[int], nprobe: int) -> None:
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int32)
+
+    def resize(self, capacity: int) -> None:
+        if capacity > len(self.assignments):
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[:len(self.assignments)] = self.assignments
+            self.assignments = grown
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.centroids is not None:
+            self.assignments[rows] = np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def train(self, vectors: np.ndarray, live: np.ndarray, iterations: int = 10) -> None:
+        """Cluster the live rows with spherical k-means and assign every row to a centroid."""
+        rows = np.flatnonzero(live)
+        nlist = self.nlist or max(1, int(np.sqrt(len(rows))))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(rows, size=min(len(rows), nlist * 256), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Keep the previous centroid for clusters that lost all their points
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self.centroids = centroids.astype(np.float32)
+        count = len(live)
+        for start in range(0, count, 65536):
+            block = vectors[start:min(start + 65536, count)]
+            self.assignments[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        logging.info(f"Trained IVF index with {nlist} lists on {len(sample)} vectors")
+
+    def search(self, query: np.ndarray, k: int, vectors: np.ndarray,
+               live: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.centroids is None:
+            return super().search(query, k, vectors, live)
+        probes = np.argsort(self.centroids @ query)[::-1][:self.nprobe]
+        return _exact_search(query, k, vectors, live & np.isin(self.assignments[:len(live)], probes))
+
+    def save(self, path: str, count: int) -> None:
+        if self.centroids is not None:
+            np.savez(os.path.join(path, IVF_FILE), centroids=self.centroids, assignments=self.assignments[:count])
+
+    def load(self, path: str, count: int, capacity: int) -> bool:
+        self.resize(capacity)
+        ivf_path = os.path.join(path, IVF_FILE)
+        if not os.path.exists(ivf_path):
+            # Untrained indexes hold no state; they are trained on the next search
+            return True
+        data = np.load(ivf_path)
+        self.centroids = data["centroids"]
+        saved = data["assignments"][:count]
+        self.assignments[:len(saved)] = saved
+        return len(saved) == count
+
+
+class HNSWIndex(FlatIndex):
+    """Hierarchical navigable small world graph backed by the optional `hnswlib` package."""
+
+    name = "hnsw"
+
+    def __init__(self, dim: int, m: int, ef_construction: int, ef_search: int) -> None:
+        import hnswlib
+
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="ip", dim=dim)
+        self._initialized = False
+
+    def _init(self, capacity: int) -> None:
+        self._index.init_index(max_elements=capacity, ef_construction=self.ef_construction, M=self.m)
+        self._index.set_ef(self.ef_search)
+        self._initialized = True
+
+    def resize(self, capacity: int) -> None:
+        if not self._initialized:
+            self._init(capacity)
+        elif capacity > self._index.get_max_elements():
+            self._index.resize_index(capacity)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        self._index.add_items(vectors, rows)
+
+    def mark_deleted(self, rows: List[int]) -> None:
+        for row in rows:
+            self._index.mark_deleted(row)
+
+    def search(self, query: np.ndarray, k: int, vectors: np.ndarray,
+               live: np.ndarray, row_filter: Optional[Callable[[int], bool]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, int(live.sum()))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(query, k=k, filter=row_filter)
+        # hnswlib returns 1 - inner product for the "ip" space
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+    def save(self, path: str, count: int) -> None:
+        if self._initialized:
+            self._index.save_index(os.path.join(path, HNSW_FILE))
+
+    def load(self, path: str, count: int, capacity: int) -> bool:
+        hnsw_path = os.path.join(path, HNSW_FILE)
+        if os.path.exists(hnsw_path):
+            self._index.load_index(hnsw_path, max_elements=capacity)
+            self._index.set_ef(self.ef_search)
+            self._initialized = True
+            return self._index.get_current_count() >= count
+        self.resize(capacity)
+        return count == 0
+
+
+def _exact_search(query: np.ndarray, k: int, vectors: np.ndarray,
+                  mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Score the rows selected by mask by inner product and return the top k, best first."""
+    candidates = np.flatnonzero(mask)
+    if len(candidates) == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if len(candidates) * 2 > len(mask):
+        # Mostly live rows: one contiguous matrix-vector product beats gathering rows
+        scores = (vectors[:len(mask)] @ query)[candidates]
+    else:
+        scores = vectors[candidates] @ query
+    if k < len(candidates):
+        top = np.argpartition(scores, -k)[-k:]
+    else:
+        top = np.arange(len(candidates))
+    top = top[np.argsort(scores[top])[::-1]]
+    return candidates[top], scores[top]
+
+
+def _create_index(name: str, dim: int) -> FlatIndex:
+    if name == "hnsw":
+        try:
+            return HNSWIndex(dim, settings.local_store_hnsw_m, settings.local_store_hnsw_ef_construction,
+                             settings.local_store_hnsw_ef_search)
+        except ImportError:
+            logging.warning("hnswlib is not installed, falling back to exact search")
+            return FlatIndex()
+    elif name == "ivf":
+        return IVFIndex(settings.local_store_ivf_nlist, settings.local_store_ivf_nprobe)
+    elif name == "flat":
+        return FlatIndex()
+    raise ValueError(f"Unsupported local store index: {name}")
+
+
+class LocalCollection:
+    """
+    One collection of the local store, kept in its own directory.
+
+    Vectors are L2-normalized and appended to a memory-mapped float32 file, so
+    inner product equals cosine similarity. Metadata is kept column by column
+    in a JSON sidecar. Deleted rows are tombstoned and skipped by searches
+    rather than rewritten.
+
+    Attributes:
+        path (str): The collection directory.
+        dim (int): The embedding dimension.
+        count (int): The number of rows written, including tombstoned ones.
+    """
+
+    def __init__(self, path: str, dim: int, index_name: str) -> None:
+        self.path = path
+        self.dim = dim
+        self.index_name = index_name
+        self.count = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        self._deleted: Set[int] = set()
+        self._live = np.zeros(0, dtype=bool)
+        self._rows: Dict[str, int] = {}  # chunk_id -> live row
+        self._index = _create_index(index_name, dim)
+        self._lock = threading.RLock()
+        # Manifest version this instance was loaded from or last saved, and whether it has unsaved changes
+        self._version: Optional[Tuple[int, int]] = None
+        self._dirty = False
+
+    @classmethod
+    def create(cls, path: str, dim: int, index_name: str) -> "LocalCollection":
+        os.makedirs(path, exist_ok=True)
+        collection = cls(path, dim, index_name)
+        collection._ensure_capacity(MIN_CAPACITY)
+        collection.save()
+        return collection
+
+    @classmethod
+    def open(cls, path: str) -> "LocalCollection":
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        collection = cls(path, manifest["dim"], manifest["index"])
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        collection._columns = metadata["columns"]
+        collection._deleted = set(metadata["deleted"])
+        collection.count = len(collection._columns["chunk_id"])
+        collection._capacity = manifest["capacity"]
+        collection._vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32, mode="r+",
+                                        shape=(collection._capacity, collection.dim))
+        collection._live = np.zeros(collection._capacity, dtype=bool)
+        collection._live[:collection.count] = True
+        collection._live[list(collection._deleted)] = False
+        collection._rows = {chunk_id: row for row, chunk_id in enumerate(collection._columns["chunk_id"])
+                            if row not in collection._deleted}
+        if not collection._index.load(path, collection.count, collection._capacity):
+            logging.warning(f"Index of {path} is missing or stale, rebuilding it")
+            collection._index = _create_index(collection.index_name, collection.dim)
+            collection._index.resize(collection._capacity)
+            rows = np.arange(collection.count)
+            collection._index.add(rows, np.asarray(collection._vectors[:collection.count]))
+            collection._index.mark_deleted(sorted(collection._deleted))
+        collection._version = _manifest_version(path)
+        return collection
+
+    def is_stale(self) -> bool:
+        """Return True if another process (or store instance) saved or deleted the collection since it was loaded."""
+        with self._lock:
+            # Unsaved writes win; they are persisted by the next flush
+            return not self._dirty and _manifest_version(self.path) != self._version
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the vector file (and index) so that `needed` rows fit, doubling its size."""
+        if needed <= self._capacity:
+            return
+        capacity = max(MIN_CAPACITY, self._capacity * 2, needed)
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * np.dtype(np.float32).itemsize)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        self._index.resize(capacity)
+        self._capacity = capacity
+
+    def add(self, chunks: List[DocumentChunk]) -> None:
+        """Append chunks, tombstoning any earlier row with the same chunk ID."""
+        vectors = np.asarray([chunk.vectors for chunk in chunks], dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise DocumentError(f"Expected vectors of dimension {self.dim}, got shape {vectors.shape}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-12)
+
+        with self._lock:
+            replaced = [self._rows[chunk.chunk_id] for chunk in chunks if chunk.chunk_id in self._rows]
+            self._tombstone(replaced)
+            self._ensure_capacity(self.count + len(chunks))
+            rows = np.arange(self.count, self.count + len(chunks))
+            self._vectors[rows] = vectors
+            for row, chunk in zip(rows, chunks):
+                metadata = chunk.metadata
+                self._columns["chunk_id"].append(chunk.chunk_id)
+                self._columns["document_id"].append(chunk.document_id)
+                self._columns["text"].append(chunk.text)
+                self._columns["source"].append(metadata.source.value if metadata and metadata.source else None)
+                self._columns["source_id"].append(metadata.source_id if metadata else None)
+                self._columns["url"].append(metadata.url if metadata else None)
+                self._columns["created_at"].append(metadata.created_at if metadata else None)
+                self._columns["author"].append(metadata.author if metadata else None)
+                self._rows[chunk.chunk_id] = int(row)
+            self._live[rows] = True
+            self.count += len(chunks)
+            self._index.add(rows, vectors)
+            self._dirty = True
+
+    def delete_documents(self, document_ids: List[str]) -> int:
+        """Tombstone every row of the given documents and return how many were deleted."""
+        targets = set(document_ids)
+        with self._lock:
+            rows = [row for row in self._rows.values() if self._columns["document_id"][row] in targets]
+            self._tombstone(rows)
+            return len(rows)
+
+    def _tombstone(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        for row in rows:
+            self._rows.pop(self._columns["chunk_id"][row], None)
+        self._deleted.update(rows)
+        self._live[rows] = False
+        self._index.mark_deleted(rows)
+        self._dirty = True
+
+    def search(self, query: np.ndarray, k: int,
+               row_filter: Optional[Callable[[int], bool]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows and cosine similarities of the k nearest live rows."""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock:
+            live = self._live[:self.count]
+            if isinstance(self._index, IVFIndex) and self._index.centroids is None \
+                    and live.sum() >= settings.local_store_ivf_train_size:
+                self._index.train(self._vectors, live)
+            if row_filter is None:
+                return self._index.search(query, k, self._vectors, live)
+            if isinstance(self._index, HNSWIndex):
+                try:
+                    return self._index.search(query, k, self._vectors, live, row_filter)
+                except RuntimeError:
+                    # Fewer than k rows pass a selective filter: fall through to exact search
+                    pass
+            mask = live.copy()
+            mask[[row for row in np.flatnonzero(live) if not row_filter(row)]] = False
+            if isinstance(self._index, HNSWIndex):
+                return _exact_search(query, k, self._vectors, mask)
+            return self._index.search(query, k, self._vectors, mask)
+
+    def row(self, row: int, output_fields: Optional[List[str]] = None,
+            include_vectors: bool = False) -> DocumentChunkWithScore:
+        """Materialize a row as a DocumentChunk, keeping only the requested metadata fields."""
+        def column(name: str) -> Any:
+            if output_fields is not None and name not in output_fields:
+                return None
+            return self._columns[name][row]
+
+        source = column("source")
+        return DocumentChunkWithScore(
+            chunk_id=self._columns["chunk_id"][row],
+            text=self._columns["text"][row],
+            vectors=np.array(self._vectors[row]) if include_vectors else None,
+            metadata=DocumentChunkMetadata(
+                source=Source(source) if source else Source.OTHER,
+                source_id=column("source_id"),
+                url=column("url"),
+                created_at=column("created_at"),
+                author=column("author"),
+            ),
+            document_id=self._columns["document_id"][row],
+        )
+
+    def column_value(self, name: str, row: int) -> Any:
+        return self._columns[name][row]
+
+    def save(self) -> None:
+        """Flush the vectors and write the metadata, index and manifest to disk."""
+        with self._lock:
+            self._vectors.flush()
+            self._index.save(self.path, self.count)
+            _write_json(os.path.join(self.path, METADATA_FILE),
+                        {"columns": self._columns, "deleted": sorted(self._deleted)})
+            _write_json(os.path.join(self.path, MANIFEST_FILE),
+                        {"dim": self.dim, "index": self._index.name, "capacity": self._capacity})
+            self._version = _manifest_version(self.path)
+            self._dirty = False
+
+
+def _manifest_version(path: str) -> Optional[Tuple[int, int]]:
+    """Identify a saved state of a collection; the manifest is replaced atomically on every save."""
+    try:
+        stat = os.stat(os.path.join(path, MANIFEST_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON atomically, so a crash never leaves a truncated file behind."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store persisted under LOCAL_STORE_DIR.
+
+    Needs no external service, which makes it suitable for development, tests
+    and small single-tenant deployments. Writes are buffered in memory-mapped
+    files and persisted by flush().
+    """
+
+    def __init__(self, root: str = LOCAL_STORE_DIR, index: str = LOCAL_STORE_INDEX) -> None:
+        self.root = root
+        self.index = index
+        self._collections: Dict[str, LocalCollection] = {}
+        self._collections_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _collection_path(self, collection_name: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^a-zA-Z0-9_.-]", "_", collection_name))
+
+    def _get_collection(self, collection_name: str) -> LocalCollection:
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is not None and collection.is_stale():
+                logging.info(f"Collection '{collection_name}' changed on disk, reloading it")
+                del self._collections[collection_name]
+                collection = None
+            if collection is None:
+                path = self._collection_path(collection_name)
+                if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+                    raise CollectionError(f"Collection '{collection_name}' does not exist")
+                try:
+                    collection = LocalCollection.open(path)
+                except Exception as e:
+                    logging.error(f"Failed to open collection '{collection_name}': {e}")
+                    raise CollectionError(f"Failed to open collection '{collection_name}': {e}")
+                self._collections[collection_name] = collection
+            return collection
+
+    def create_collection(self, collection_name: str, metadata: Optional[dict] = None) -> None:
+        """
+        Create a new collection, or do nothing if it already exists.
+
+        Args:
+            collection_name (str): The name of the collection to create.
+            metadata (Optional[dict]): Unused, accepted for interface compatibility.
+        """
+        path = self._collection_path(collection_name)
+        with self._collections_lock:
+            if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+                logging.debug(f"Collection '{collection_name}' already exists")
+                return
+            try:
+                self._collections[collection_name] = LocalCollection.create(path, EMBEDDING_DIM, self.index)
+                logging.info(f"Collection '{collection_name}' created successfully")
+            except Exception as e:
+                logging.error(f"Failed to create collection '{collection_name}': {e}")
+                raise CollectionError(f"Failed to create collection '{collection_name}': {e}")
+
+    def add_documents(self, collection_name: str, documents: List[Document]) -> List[str]:
+        """
+        Add documents to the collection, replacing chunks with the same IDs.
+
+        Chunks without vectors are embedded in one request.
+
+        Args:
+            collection_name (str): The name of the collection to add documents to.
+            documents (List[Document]): The documents to add.
+
+        Returns:
+            List[str]: The IDs of the added documents.
+        """
+        collection = self._get_collection(collection_name)
+        chunks: List[DocumentChunk] = []
+        for document in documents:
+            for chunk in document.chunks:
+                chunk.document_id = document.document_id
+                chunks.append(chunk)
+        if not chunks:
+            return []
+
+        missing = [chunk for chunk in chunks if chunk.vectors is None]
+        if missing:
+            embeddings = get_embeddings([chunk.text for chunk in missing])
+            if len(embeddings) != len(missing):
+                raise DocumentError(f"Failed to generate embeddings for {len(missing)} chunks")
+            for chunk, vector in zip(missing, embeddings):
+                chunk.vectors = vector
+
+        collection.add(chunks)
+        if sparse_index_enabled():
+            get_sparse_index(collection_name).add(chunks)
+        logging.info(f"Added {len(chunks)} chunks to collection '{collection_name}'")
+        return [document.document_id for document in documents]
+
+    def flush(self, collection_name: str) -> None:
+        """
+        Persist the collection's vectors, metadata and index.
+
+        Args:
+            collection_name (str): The name of the collection to flush.
+        """
+        try:
+            self._get_collection(collection_name).save()
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).save()
+        except CollectionError:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to flush collection '{collection_name}': {e}")
+            raise CollectionError(f"Failed to flush collection '{collection_name}': {e}")
+
+    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10,
+                           output_fields: Optional[List[str]] = None,
+                           include_vectors: bool = False) -> List[QueryResult]:
+        """
+        Retrieve the chunks most similar to a query string.
+
+        Args:
+            query (str): The query string.
+            collection_name (str): The name of the collection to search.
+            limit (int): The maximum number of results to return.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the (normalized) vector of each hit.
+
+        Returns:
+            List[QueryResult]: The query results.
+        """
+        embeddings = get_embeddings(query)
+        if len(embeddings) == 0:
+            raise VectorStoreError("Failed to generate embeddings for the query string.")
+        return self.query(collection_name, QueryWithEmbedding(text=query, vectors=embeddings[0]),
+                          number_of_results=limit, output_fields=output_fields, include_vectors=include_vectors)
+
+    def query(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10,
+              filter: Optional[MetadataFilter] = None,
+              output_fields: Optional[List[str]] = None,
+              include_vectors: bool = False) -> List[QueryResult]:
+        """
+        Query the collection with an embedding.
+
+        Args:
+            collection_name (str): The name of the collection to query.
+            query (QueryWithEmbedding): The query embedding.
+            number_of_results (int): The maximum number of results to return.
+            filter (Optional[MetadataFilter]): Optional metadata filter.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the (normalized) vector of each hit.
+
+        Returns:
+            List[QueryResult]: The query results.
+        """
+        collection = self._get_collection(collection_name)
+        rows, scores = collection.search(query.vectors, number_of_results, self._build_filter(collection, filter))
+        chunks = []
+        for row, score in zip(rows, scores):
+            chunk = collection.row(int(row), output_fields, include_vectors)
+            chunk.score = float(score)
+            chunks.append(chunk)
+        return [QueryResult(data=chunks, similarities=[chunk.score for chunk in chunks],
+                            ids=[chunk.chunk_id for chunk in chunks])]
+
+    @staticmethod
+    def _build_filter(collection: LocalCollection,
+                      filter: Optional[MetadataFilter]) -> Optional[Callable[[int], bool]]:
+        """Build a row predicate from a metadata filter."""
+        if not filter:
+            return None
+        fields = []
+        pending: List[MetadataFilter] = [filter]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, MetadataFilterGroup):
+                pending.extend(node.filters)
+            else:
+                fields.append(node.field_name)
+        unsupported = sorted(set(fields) - set(COLUMNS))
+        if unsupported:
+            raise VectorStoreError(f"Unsupported filter fields: {unsupported}")
+        return to_predicate(filter, lambda row, field: collection.column_value(field, row))
+
+    def delete_collection(self, collection_name: str) -> None:
+        """
+        Delete a collection and its files.
+
+        Args:
+            collection_name (str): The name of the collection to delete.
+        """
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+            path = self._collection_path(collection_name)
+            if not os.path.exists(path):
+                logging.debug(f"Collection '{collection_name}' does not exist.")
+                return
+            try:
+                shutil.rmtree(path)
+                drop_sparse_index(collection_name)
+                logging.info(f"Deleted collection '{collection_name}'")
+            except OSError as e:
+                logging.error(f"Failed to delete collection '{collection_name}': {e}")
+                raise CollectionError(f"Failed to delete collection '{collection_name}': {e}")
+
+    def delete_documents(self, collection_name: str, document_ids: List[str]) -> int:
+        """
+        Tombstone all chunks of the given documents.
+
+        Args:
+            collection_name (str): The name of the collection to delete documents from.
+            document_ids (List[str]): The IDs of the documents to delete.
+
+        Returns:
+            int: The number of deleted chunks.
+        """
+        collection = self._get_collection(collection_name)
+        deleted = collection.delete_documents(document_ids)
+        if sparse_index_enabled():
+            get_sparse_index(collection_name).remove_documents(document_ids)
+        logging.info(f"Deleted {deleted} chunks of documents {document_ids} from collection '{collection_name}'")
+        return deleted
+
+
+@lru_cache(maxsize=1)
+def get_local_store() -> LocalVectorStore:
+    """
+    Get the process-wide local store.
+
+    Every caller shares one instance, so writes made through one are seen by all others without
+    reopening the collection.
+
+    Returns:
+        LocalVectorStore: The local store rooted at LOCAL_STORE_DIR.
+    """
+    return LocalVectorStore()
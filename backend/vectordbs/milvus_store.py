@@ -1,18 +1,30 @@
 import asyncio
-import json
 import logging
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from pymilvus import (Collection, CollectionSchema, DataType, FieldSchema,
                       MilvusException, connections, utility)
 
 from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_milvus_expr
+from backend.vectordbs.utils.index_profiles import (INDEX_PROFILES,
+                                                    IndexProfile,
+                                                    get_index_profile)
+from backend.vectordbs.utils.index_tuning import (DEFAULT_SWEEPS,
+                                                  TuningResult,
+                                                  select_setting,
+                                                  sweep_search_param)
+from backend.vectordbs.utils.sparse_index import (drop_sparse_index,
+                                                  get_sparse_index,
+                                                  sparse_index_enabled)
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
                          DocumentChunkWithScore, DocumentMetadataFilter,
-                         Embeddings, QueryResult, QueryWithEmbedding, Source)
+                         Embeddings, MetadataFilter, QueryResult,
+                         QueryWithEmbedding, Source)
 from .error_types import CollectionError, DocumentError, VectorStoreError
 from .vector_store import VectorStore
 
@@ -27,6 +39,11 @@ EMBEDDING_FIELD = settings.embedding_field
 EMBEDDING_MODEL = settings.embedding_model
 MILVUS_INDEX_PARAMS = settings.milvus_index_params
 MILVUS_SEARCH_PARAMS = settings.milvus_search_params
+MILVUS_INDEX_PROFILE = settings.milvus_index_profile
+# Collection property holding the JSON IndexProfile of the collection
+INDEX_PROFILE_PROPERTY = "rag_modulo.index_profile"
+UPSERT_BATCH_SIZE = settings.upsert_batch_size or 100
+UPSERT_FLUSH_INTERVAL = settings.upsert_flush_interval
 
 SCHEMA = [
     FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
@@ -41,8 +58,131 @@ SCHEMA = [
     FieldSchema(name="author", dtype=DataType.VARCHAR, max_length=100),
 ]
 
+# Fields supplied on insert, in schema order (the primary key is generated by Milvus)
+INSERT_FIELDS = [field.name for field in SCHEMA if not field.auto_id]
+# Fields returned by searches by default: everything except the primary key and the vector
+METADATA_FIELDS = [name for name in INSERT_FIELDS if name != EMBEDDING_FIELD]
+
+
+class MilvusBulkWriter:
+    """
+    Buffers rows for a single collection and inserts them in columnar batches.
+
+    Rows leave the buffer only once their insert succeeds, so a failed batch is retried with the next
+    insert instead of being lost. A timer inserts the remainder once it reaches flush_interval, even
+    if no further rows arrive.
+
+    Attributes:
+        collection (Collection): The collection to insert into.
+        batch_size (int): Number of rows per insert call.
+        flush_interval (float): Maximum age in seconds of a buffered row before it is inserted.
+    """
+
+    def __init__(self, collection: Collection, batch_size: int, flush_interval: float) -> None:
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._columns: Dict[str, List[Any]] = {name: [] for name in INSERT_FIELDS}
+        self._oldest_row_at: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._columns["chunk_id"])
+
+    def add(self, chunks: List[DocumentChunk]) -> None:
+        """
+        Buffer chunks and insert every full batch, plus the remainder if it has waited too long.
+
+        Args:
+            chunks (List[DocumentChunk]): The chunks to write. document_id must already be set.
+        """
+        with self._lock:
+            for chunk in chunks:
+                metadata = chunk.metadata
+                self._columns["document_id"].append(chunk.document_id)
+                self._columns[EMBEDDING_FIELD].append(chunk.vectors)
+                self._columns["text"].append(chunk.text)
+                self._columns["chunk_id"].append(chunk.chunk_id)
+                self._columns["source_id"].append(metadata.source_id if metadata else "")
+                self._columns["source"].append(metadata.source.value if metadata else "")
+                self._columns["url"].append(metadata.url if metadata else "")
+                self._columns["created_at"].append(metadata.created_at if metadata else "")
+                self._columns["author"].append(metadata.author if metadata else "")
+            if self._oldest_row_at is None and len(self):
+                self._oldest_row_at = time.monotonic()
+
+            try:
+                while len(self) >= self.batch_size:
+                    self._insert(self.batch_size)
+                if len(self) and time.monotonic() - self._oldest_row_at >= self.flush_interval:
+                    self._insert(len(self))
+            except MilvusException as e:
+                # The chunks are accepted either way; re-raising would make callers add them twice
+                self._insert_failed(e)
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        """
+        Insert all buffered rows and stop the flush timer.
+
+        Raises:
+            MilvusException: If an insert fails. The rows not yet inserted stay buffered for the next flush.
+        """
+        with self._lock:
+            self._cancel_timer()
+            while len(self):
+                self._insert(min(len(self), self.batch_size))
+
+    def close(self) -> None:
+        """Stop the flush timer without inserting the buffered rows."""
+        with self._lock:
+            self._cancel_timer()
+
+    def _insert(self, count: int) -> None:
+        batch = [self._columns[name][:count] for name in INSERT_FIELDS]
+        self.collection.insert(batch)
+        for name in INSERT_FIELDS:
+            del self._columns[name][:count]
+        self._oldest_row_at = time.monotonic() if len(self) else None
+        logging.debug(f"Inserted {count} rows into collection {self.collection.name}")
+
+    def _schedule_flush(self) -> None:
+        # Called with the lock held; one pending timer covers the oldest buffered row
+        if not len(self) or self._timer is not None:
+            return
+        delay = max(0.0, self.flush_interval - (time.monotonic() - self._oldest_row_at))
+        self._timer = threading.Timer(delay, self._flush_aged)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_aged(self) -> None:
+        with self._lock:
+            self._timer = None
+            try:
+                if len(self) and time.monotonic() - self._oldest_row_at >= self.flush_interval:
+                    while len(self):
+                        self._insert(min(len(self), self.batch_size))
+            except MilvusException as e:
+                self._insert_failed(e)
+            self._schedule_flush()
+
+    def _insert_failed(self, error: MilvusException) -> None:
+        # The rows stay buffered and are retried after another flush_interval, or by flush()
+        self._oldest_row_at = time.monotonic()
+        logging.error(f"Insert into collection {self.collection.name} failed, "
+                      f"{len(self)} rows remain buffered: {error}", exc_info=True)
+
 
 class MilvusStore(VectorStore):
+    # Milvus rejects searches with a topk above this
+    max_query_results = 16384
+
     def __init__(self, host: str = MILVUS_HOST,
                  port: str = MILVUS_PORT) -> None:
         """
@@ -52,6 +192,13 @@ class MilvusStore(VectorStore):
             host (str): The host address for Milvus.
             port (str): The port for Milvus.
         """
+        self._writers: Dict[str, MilvusBulkWriter] = {}
+        # Collection handles and the names of collections known to be loaded, so that
+        # hot paths skip the has_collection/describe round trips of building a handle
+        self._collections: Dict[str, Collection] = {}
+        self._loaded: Set[str] = set()
+        self._profiles: Dict[str, IndexProfile] = {}
+        self._collections_lock = threading.Lock()
         self._connect(host, port)
 
     def _connect(self, host: str, port: str) -> None:
@@ -78,27 +225,65 @@ class MilvusStore(VectorStore):
         """
         Retrieve the collection from Milvus.
 
+        Handles are cached per collection name, so only the first call for a
+        collection checks that it exists on the server.
+
         Args:
             collection_name (str): The name of the collection to retrieve.
 
         Returns:
             Collection: The retrieved Milvus collection.
         """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
         if utility.has_collection(collection_name):
-            return Collection(name=collection_name)
+            with self._collections_lock:
+                return self._collections.setdefault(collection_name, Collection(name=collection_name))
         else:
             raise CollectionError(f"Collection '{collection_name}' does not exist")
 
+    def _get_loaded_collection(self, collection_name: str) -> Collection:
+        """
+        Retrieve the collection and load it into memory if this store has not loaded it yet.
+
+        Args:
+            collection_name (str): The name of the collection to retrieve.
+
+        Returns:
+            Collection: The loaded Milvus collection.
+        """
+        collection = self._get_collection(collection_name)
+        if collection_name not in self._loaded:
+            collection.load()
+            self._loaded.add(collection_name)
+        return collection
+
+    def _invalidate_collection(self, collection_name: str) -> None:
+        """
+        Forget the cached handle and loaded state of a collection.
+
+        Args:
+            collection_name (str): The name of the collection to forget.
+        """
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+            self._loaded.discard(collection_name)
+            self._profiles.pop(collection_name, None)
+
     def create_collection(self, collection_name: str, metadata: Optional[dict] = None) -> Collection:
         """
         Create a new Milvus collection.
 
         Args:
             collection_name (str): The name of the collection to create.
-            metadata: Optional metadata for the collection.
+            metadata: Optional metadata for the collection. Its "index_profile" entry selects the
+                index profile (a name from INDEX_PROFILES or a profile dict). Defaults to MILVUS_INDEX_PROFILE.
         Returns:
             Collection: The created or loaded Milvus collection.
         """
+        profile = get_index_profile((metadata or {}).get("index_profile") or MILVUS_INDEX_PROFILE,
+                                    MILVUS_INDEX_PARAMS, MILVUS_SEARCH_PARAMS)
         try:
             if utility.has_collection(collection_name):
                 raise CollectionError(f"Collection {collection_name} already exists.")
@@ -106,46 +291,154 @@ class MilvusStore(VectorStore):
                 schema = CollectionSchema(fields=SCHEMA)
                 collection = Collection(name=collection_name, schema=schema)
                 logging.info(f"Created Milvus collection '{collection_name}' with schema {schema}")
-                self._create_index(collection)
+                self._create_index(collection, profile)
+                collection.set_properties({INDEX_PROFILE_PROPERTY: profile.to_json()})
                 collection.load()
+                with self._collections_lock:
+                    self._collections[collection_name] = collection
+                    self._loaded.add(collection_name)
+                    self._profiles[collection_name] = profile
         except MilvusException as e:
             logging.error(f"Failed to create collection '{collection_name}': {e}")
             raise CollectionError(f"Failed to create collection '{collection_name}': {e}")
         return collection
 
-    def _create_index(self, collection: Collection) -> None:
+    def _create_index(self, collection: Collection, profile: IndexProfile) -> None:
         """
         Create an index for the Milvus collection.
         """
         try:
-            self.index_params = (json.loads(MILVUS_INDEX_PARAMS) if MILVUS_INDEX_PARAMS else None)
-            self.search_params = (json.loads(MILVUS_SEARCH_PARAMS) if MILVUS_SEARCH_PARAMS else None)
-
             if len(collection.indexes) == 0:
-                if self.index_params:
-                    collection.create_index(
-                        field_name=EMBEDDING_FIELD,
-                        index_params=self.index_params)
-                    logging.info(
-                        f"Created index for collection '{collection.name}' with params {self.index_params}")
-                else:
-                    i_p = {
-                        "metric_type": "IP",
-                        "index_type": "HNSW",
-                        "params": {"M": 8, "efConstruction": 64},
-                    }
-                    collection.create_index(field_name=EMBEDDING_FIELD, index_params=i_p)
-                    logging.info(f"Created default index for collection '{collection.name}'")
+                collection.create_index(field_name=EMBEDDING_FIELD, index_params=profile.index_params())
+                logging.info(f"Created index for collection '{collection.name}' with params {profile.index_params()}")
             else:
                 logging.info(f"Index already exists for collection '{collection.name}'")
         except MilvusException as e:
             logging.error(f"Failed to create index for collection '{collection.name}': {e}")
             raise CollectionError(f"Failed to create index for collection '{collection.name}': {e}")
 
+    def get_index_profile(self, collection_name: str) -> IndexProfile:
+        """
+        Get the index profile of a collection.
+
+        The profile is read from the collection properties once and cached. For
+        collections created without one, it is derived from the collection's index.
+
+        Args:
+            collection_name (str): The name of the collection.
+
+        Returns:
+            IndexProfile: The index profile of the collection.
+        """
+        profile = self._profiles.get(collection_name)
+        if profile is not None:
+            return profile
+
+        collection = self._get_collection(collection_name)
+        try:
+            stored = (collection.describe().get("properties") or {}).get(INDEX_PROFILE_PROPERTY)
+            if stored:
+                profile = IndexProfile.from_json(stored)
+            else:
+                index = collection.indexes[0].params
+                index_type = index["index_type"].upper()
+                defaults = next((p for p in INDEX_PROFILES.values() if p.index_type == index_type), None)
+                profile = IndexProfile(index_type, index.get("metric_type", "IP"), index.get("params", {}),
+                                       dict(defaults.search_params) if defaults else {})
+        except (MilvusException, IndexError, KeyError, ValueError) as e:
+            logging.error(f"Failed to read the index profile of collection '{collection_name}', using defaults: {e}")
+            profile = get_index_profile(MILVUS_INDEX_PROFILE, MILVUS_INDEX_PARAMS, MILVUS_SEARCH_PARAMS)
+        with self._collections_lock:
+            return self._profiles.setdefault(collection_name, profile)
+
+    def set_search_params(self, collection_name: str, **search_params: Any) -> IndexProfile:
+        """
+        Update and persist the search parameters of a collection, e.g. ef=128 or nprobe=32.
+
+        Args:
+            collection_name (str): The name of the collection.
+            **search_params: The search parameters to set.
+
+        Returns:
+            IndexProfile: The updated index profile.
+        """
+        profile = self.get_index_profile(collection_name).with_search_params(**search_params)
+        try:
+            self._get_collection(collection_name).set_properties({INDEX_PROFILE_PROPERTY: profile.to_json()})
+        except MilvusException as e:
+            logging.error(f"Failed to update the index profile of collection '{collection_name}': {e}")
+            raise CollectionError(f"Failed to update the index profile of collection '{collection_name}': {e}")
+        with self._collections_lock:
+            self._profiles[collection_name] = profile
+        logging.info(f"Set search params of collection '{collection_name}' to {profile.search_params}")
+        return profile
+
+    def tune_search_params(self, collection_name: str, queries: List[QueryWithEmbedding], k: int = 10,
+                           target_recall: float = 0.95, values: Optional[List[int]] = None,
+                           ground_truth: Optional[List[List[str]]] = None,
+                           apply: bool = False) -> Tuple[Optional[TuningResult], List[TuningResult]]:
+        """
+        Sweep the search parameter of the collection's index (ef, nprobe or search_list)
+        and pick the lowest latency value meeting a target recall@k.
+
+        Without ground truth, the results of the most exhaustive search (all IVF
+        lists, or a candidate list four times the largest value tried) are used.
+
+        Args:
+            collection_name (str): The name of the collection to tune.
+            queries (List[QueryWithEmbedding]): Held-out queries, ideally sampled from real traffic.
+            k (int): The number of results per query.
+            target_recall (float): The minimum mean recall@k.
+            values (Optional[List[int]]): Parameter values to try. Defaults to DEFAULT_SWEEPS.
+            ground_truth (Optional[List[List[str]]]): The expected top k chunk IDs of each query.
+            apply (bool): Whether to persist the selected value with set_search_params.
+
+        Returns:
+            Tuple[Optional[TuningResult], List[TuningResult]]: The selected setting (None if no
+            value reaches the target) and the measurements of every value.
+        """
+        if not queries:
+            raise VectorStoreError("At least one query is required to tune search parameters.")
+        collection = self._get_loaded_collection(collection_name)
+        profile = self.get_index_profile(collection_name)
+        name = profile.search_param_name
+        nlist = profile.build_params.get("nlist")
+        values = sorted(values or [value for value in DEFAULT_SWEEPS[name]
+                                   if (name != "nprobe" or nlist is None or value <= nlist)
+                                   and (name == "nprobe" or value >= k)])
+
+        def search(index: int, value: int) -> List[str]:
+            param = profile.with_search_params(**{name: value}).search_request_params(k)
+            result = collection.search(data=[queries[index].vectors], anns_field=EMBEDDING_FIELD,
+                                       param=param, output_fields=["chunk_id"], limit=k)
+            return [hit.entity.get("chunk_id") for hit in result[0]]
+
+        try:
+            if ground_truth is None:
+                exhaustive = nlist if name == "nprobe" and nlist else max(values) * 4
+                ground_truth = [search(i, exhaustive) for i in range(len(queries))]
+            results = sweep_search_param(search, len(queries), values, ground_truth, k)
+        except MilvusException as e:
+            self._invalidate_collection(collection_name)
+            logging.error(f"Failed to tune collection '{collection_name}': {e}")
+            raise CollectionError(f"Failed to tune collection '{collection_name}': {e}")
+
+        selected = select_setting(results, target_recall)
+        if selected is None:
+            logging.warning(f"No {name} value reached recall@{k} >= {target_recall} on '{collection_name}'")
+        elif apply:
+            self.set_search_params(collection_name, **{name: selected.value})
+        return selected, results
+
     def add_documents(self, collection_name: str, documents: List[Document]) -> List[str]:
         """
         Add a list of documents to the collection.
 
+        Rows are buffered per collection and inserted in columnar batches of
+        UPSERT_BATCH_SIZE rows, or sooner once the oldest buffered row is
+        UPSERT_FLUSH_INTERVAL seconds old. Call flush() at the end of an
+        ingestion job to write the remainder and load the collection.
+
         Args:
             collection_name (str): The name of the collection to add documents to.
             documents (List[Document]): The list of documents to add.
@@ -154,38 +447,58 @@ class MilvusStore(VectorStore):
             List[str]: The list of document IDs that were added.
         """
         collection = self._get_collection(collection_name)
+        chunks: List[DocumentChunk] = []
+        for document in documents:
+            for chunk in document.chunks:
+                chunk.document_id = document.document_id
+                chunks.append(chunk)
         try:
-            data = []
-            for document in documents:
-                for chunk in document.chunks:
-                    chunk.document_id = document.document_id
-                    data.append(
-                        {
-                            "document_id": chunk.document_id,
-                            "embedding": chunk.vectors,
-                            "text": chunk.text,
-                            "chunk_id": chunk.chunk_id,
-                            "source_id": chunk.metadata.source_id if chunk.metadata else "",
-                            "source": chunk.metadata.source.value if chunk.metadata else "",
-                            "url": chunk.metadata.url if chunk.metadata else "",
-                            "created_at": chunk.metadata.created_at if chunk.metadata else "",
-                            "author": chunk.metadata.author if chunk.metadata else "",
-                        }
-                    )
-            logging.info(f"Inserting text: : {chunk.text}")
-            collection.insert(data)
-            collection.load()
-            logging.info(f"Successfully added documents to collection {collection_name}")
+            writer = self._writers.get(collection_name)
+            if writer is None:
+                writer = self._writers.setdefault(
+                    collection_name, MilvusBulkWriter(collection, UPSERT_BATCH_SIZE, UPSERT_FLUSH_INTERVAL))
+            writer.add(chunks)
+            # Milvus has no full-text search, so hybrid retrieval uses a local BM25 index
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).add(chunks)
+            logging.info(f"Buffered {len(chunks)} chunks for collection {collection_name}")
             return [doc.document_id for doc in documents]
         except MilvusException as e:
             logging.error(f"Failed to add documents to collection {collection_name}: {e}", exc_info=True)
             raise DocumentError(f"Failed to add documents to collection {collection_name}: {e}")
 
+    def flush(self, collection_name: str) -> None:
+        """
+        Insert any buffered rows, then flush and load the collection once.
+
+        Args:
+            collection_name (str): The name of the collection to flush.
+        """
+        writer = self._writers.get(collection_name)
+        try:
+            if writer is not None:
+                writer.flush()
+                # Only an empty writer is dropped, so a failed flush can be retried without losing rows
+                self._writers.pop(collection_name, None)
+            collection = self._get_collection(collection_name)
+            collection.flush()
+            if collection_name not in self._loaded:
+                collection.load()
+                self._loaded.add(collection_name)
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).save()
+            logging.info(f"Flushed and loaded collection {collection_name}")
+        except MilvusException as e:
+            logging.error(f"Failed to flush collection {collection_name}: {e}", exc_info=True)
+            raise DocumentError(f"Failed to flush collection {collection_name}: {e}")
+
     def retrieve_documents(
         self,
         query: str,
         collection_name: str,
         limit: int = 10,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
     ) -> List[QueryResult]:
         """
         Retrieve documents from the collection.
@@ -194,40 +507,18 @@ class MilvusStore(VectorStore):
             query (Union[str, QueryWithEmbedding]): The query string or query with embedding.
             collection_name (Optional[str]): The name of the collection to retrieve documents from.
             limit (int): The maximum number of results to return.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
 
         Returns:
             List[QueryResult]: The list of query results.
         """
-        collection = self._get_collection(collection_name)
-
         embeddings = get_embeddings(query)
-        if not embeddings:
+        if len(embeddings) == 0:
             raise VectorStoreError("Failed to generate embeddings for the query string.")
-        query_embeddings = QueryWithEmbedding(text=query, vectors=embeddings)
-
-        try:
-            search_params = {"metric_type": "IP", "params": {"nprobe": 10}}
-            search_results = collection.search(
-                data=[query_embeddings.vectors],
-                anns_field=EMBEDDING_FIELD,
-                param=search_params,
-                output_fields=[
-                    "chunk_id",
-                    "text",
-                    "document_id",
-                    "embedding",
-                    "source",
-                    "source_id",
-                    "url",
-                    "created_at",
-                    "author",
-                ],
-                limit=limit,
-            )
-            return self._process_search_results(search_results)
-        except MilvusException as e:
-            logging.error(f"Failed to retrieve documents from collection '{collection_name}': {e}")
-            raise CollectionError(f"Failed to retrieve documents from collection '{collection_name}': {e}")
+        query_embeddings = QueryWithEmbedding(text=query, vectors=embeddings[0])
+        return self.query(collection_name, query_embeddings, number_of_results=limit,
+                          output_fields=output_fields, include_vectors=include_vectors)
 
     def delete_documents(self, document_ids: List[str], collection_name: str) -> int:
         """
@@ -242,8 +533,10 @@ class MilvusStore(VectorStore):
         """
         collection = self._get_collection(collection_name)
         try:
-            expr = f"document_id in {tuple(document_ids)}"
+            expr = to_milvus_expr(DocumentMetadataFilter("document_id", "in", document_ids))
             collection.delete(expr)
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).remove_documents(document_ids)
             logging.info(f"Deleted documents with IDs {document_ids} from collection '{collection_name}'")
             return len(document_ids)
         except MilvusException as e:
@@ -258,8 +551,13 @@ class MilvusStore(VectorStore):
             name (str): The name of the collection to delete.
         """
         if utility.has_collection(name):
+            writer = self._writers.pop(name, None)
+            if writer is not None:
+                writer.close()
+            self._invalidate_collection(name)
             try:
                 utility.drop_collection(name)
+                drop_sparse_index(name)
                 logging.info(f"Deleted collection '{name}'")
             except MilvusException as e:
                 logging.error(f"Failed to delete collection '{name}': {e}")
@@ -278,15 +576,16 @@ class MilvusStore(VectorStore):
         Returns:
             Optional[Document]: The retrieved document or None if not found.
         """
-        collection = self._get_collection(collection_name)
+        collection = self._get_loaded_collection(collection_name)
         try:
-            expr = f"document_id == '{document_id}'"
+            expr = to_milvus_expr(DocumentMetadataFilter("document_id", "eq", document_id))
             results = collection.query(expr=expr, output_fields=["*"])
             if results:
                 chunks = [self._convert_to_chunk(result) for result in results]
                 return Document(document_id=document_id, name=document_id, chunks=chunks)
             return None
         except MilvusException as e:
+            self._invalidate_collection(collection_name)
             logging.error(f"Failed to get document '{document_id}' from collection '{collection_name}': {e}")
             raise CollectionError(f"Failed to get document '{document_id}' from collection '{collection_name}': {e}")
 
@@ -295,7 +594,9 @@ class MilvusStore(VectorStore):
         collection_name: str,
         query: QueryWithEmbedding,
         number_of_results: int = 10,
-        filter: Optional[DocumentMetadataFilter] = None,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
     ) -> List[QueryResult]:
         """
         Query the collection with an embedding query.
@@ -304,26 +605,77 @@ class MilvusStore(VectorStore):
             collection_name (str): The name of the collection to query.
             query (QueryWithEmbedding): The query with embedding to search for.
             number_of_results (int): The maximum number of results to return.
-            filter (Optional[DocumentMetadataFilter]): Optional filter to apply to the query.
+            filter (Optional[MetadataFilter]): Optional filter, evaluated by Milvus during the search.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
 
         Returns:
             List[QueryResult]: The list of query results.
         """
-        collection = self._get_collection(collection_name)
+        return self.query_batch(collection_name, [query], number_of_results=number_of_results, filter=filter,
+                                output_fields=output_fields, include_vectors=include_vectors)[0]
+
+    def query_batch(
+        self,
+        collection_name: str,
+        queries: List[QueryWithEmbedding],
+        number_of_results: int = 10,
+        filter: Optional[MetadataFilter] = None,
+        output_fields: Optional[List[str]] = None,
+        include_vectors: bool = False,
+    ) -> List[List[QueryResult]]:
+        """
+        Query the collection with several embeddings in a single search request.
+
+        Args:
+            collection_name (str): The name of the collection to query.
+            queries (List[QueryWithEmbedding]): The queries with embeddings to search for.
+            number_of_results (int): The maximum number of results to return per query.
+            filter (Optional[MetadataFilter]): Optional filter, evaluated by Milvus during the search.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each hit.
+
+        Returns:
+            List[List[QueryResult]]: The query results of each query, in the order of the queries.
+        """
+        if not queries:
+            return []
+        collection = self._get_loaded_collection(collection_name)
+        search_params = self.get_index_profile(collection_name).search_request_params(number_of_results)
 
         try:
-            search_params = {"metric_type": "IP", "params": {"nprobe": 10}}
             result = collection.search(
-                data=[query.vectors],
+                data=[query.vectors for query in queries],
                 anns_field=EMBEDDING_FIELD,
                 param=search_params,
+                output_fields=self._output_fields(output_fields, include_vectors),
                 limit=number_of_results,
+                expr=to_milvus_expr(filter),
             )
-            return self._process_search_results(result)
+            return [[query_result] for query_result in self._process_search_results(result)]
         except MilvusException as e:
+            self._invalidate_collection(collection_name)
             logging.error(f"Failed to query collection '{collection_name}': {e}")
             raise CollectionError(f"Failed to query collection '{collection_name}': {e}")
 
+    @staticmethod
+    def _output_fields(output_fields: Optional[List[str]], include_vectors: bool) -> List[str]:
+        """
+        Build the projection for a search request.
+
+        The embedding field is only requested when include_vectors is set, since
+        shipping the vectors dominates the response size and decode time.
+        """
+        fields = list(output_fields) if output_fields is not None else list(METADATA_FIELDS)
+        # Chunk and document IDs are always returned; context assembly groups chunks by document
+        for required in ("document_id", "chunk_id"):
+            if required not in fields:
+                fields.insert(0, required)
+        fields = [field for field in fields if field != EMBEDDING_FIELD]
+        if include_vectors:
+            fields.append(EMBEDDING_FIELD)
+        return fields
+
     def _convert_to_chunk(self, data: Dict[str, Any]) -> DocumentChunk:
         """
         Convert data to a DocumentChunk.
@@ -337,7 +689,7 @@ class MilvusStore(VectorStore):
         return DocumentChunk(
             chunk_id=str(data["chunk_id"]),
             text=data["text"],
-            vectors=data["embedding"],
+            vectors=data.get(EMBEDDING_FIELD),
             metadata=DocumentChunkMetadata(
                 source=Source(data["source"]),
                 source_id=data.get("source_id"),
@@ -353,24 +705,25 @@ class MilvusStore(VectorStore):
         Process search results from Milvus.
 
         Args:
-            results (Any): The search results to process.
+            results (Any): The search results to process, one set of hits per query vector.
 
         Returns:
-            List[QueryResult]: The list of query results.
+            List[QueryResult]: One query result per query vector.
         """
         if not results:
-            return [QueryResult(data=[], similarities=[[]], ids=[])]
+            return [QueryResult(data=[], similarities=[], ids=[])]
 
-        chunks_with_scores = []
-        similarities = []
-        ids = []
+        query_results = []
         for result in results:
+            chunks_with_scores = []
+            ids = []
             for hit in result:
                 chunks_with_scores.append(
                     DocumentChunkWithScore(
                         chunk_id=hit.entity.get("chunk_id"),
                         text=hit.entity.get("text"),
-                        vectors=hit.entity.get("embedding"),
+                        vectors=hit.entity.get(EMBEDDING_FIELD),
+                        document_id=hit.entity.get("document_id"),
                         metadata=DocumentChunkMetadata(
                             source=(Source(hit.entity.get("source")) if hit.entity.get("source") else Source.OTHER),
                             source_id=(hit.entity.get("source_id") if hit.entity.get("source_id") else ""),
@@ -382,5 +735,5 @@ class MilvusStore(VectorStore):
                     )
                 )
                 ids.append(hit.entity.get("chunk_id"))
-            similarities.append(result.distances)
-        return [QueryResult(data=chunks_with_scores, similarities=similarities, ids=ids)]
+            query_results.append(QueryResult(data=chunks_with_scores, similarities=list(result.distances), ids=ids))
+        return query_results
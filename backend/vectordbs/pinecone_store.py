@@ -4,11 +4,15 @@ from typing import Any, Dict, List, Optional
 from pinecone import Pinecone, ServerlessSpec
 
 from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_mongo_filter
+from backend.vectordbs.utils.sparse_index import (drop_sparse_index,
+                                                  get_sparse_index,
+                                                  sparse_index_enabled)
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
-                         DocumentMetadataFilter, QueryResult,
-                         QueryWithEmbedding, Source)
+                         MetadataFilter, QueryResult, QueryWithEmbedding,
+                         Source, vector_to_list)
 from .error_types import CollectionError, VectorStoreError
 from .vector_store import VectorStore
 
@@ -21,6 +25,9 @@ logging.basicConfig(level=logging.INFO)
 
 
 class PineconeStore(VectorStore):
+    # Pinecone rejects queries with a top_k above this
+    max_query_results = 10000
+
     def __init__(self) -> None:
         try:
             self.client = Pinecone(api_key=PINECONE_API_KEY, pool_threads=30)
@@ -75,11 +82,14 @@ class PineconeStore(VectorStore):
 
         vectors = []
         document_ids = []
+        chunks: List[DocumentChunk] = []
         for document in documents:
             for chunk in document.chunks:
+                chunk.document_id = document.document_id
+                chunks.append(chunk)
                 vector = {
                     "id": chunk.chunk_id,
-                    "values": chunk.vectors,
+                    "values": vector_to_list(chunk.vectors),
                     "metadata": {
                         "text": chunk.text,
                         "document_id": document.document_id if document.document_id is not None else "",
@@ -93,10 +103,15 @@ class PineconeStore(VectorStore):
                 vectors.append(vector)
                 document_ids.append(chunk.chunk_id)
         self.client.Index(collection_name).upsert(vectors=vectors, async_req=False)
+        # Pinecone has no full-text search, so hybrid retrieval uses a local BM25 index
+        if sparse_index_enabled():
+            get_sparse_index(collection_name).add(chunks)
         logging.info(f"Successfully added documents to index '{collection_name}'")
         return document_ids
 
-    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10) -> List[QueryResult]:
+    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10,
+                           output_fields: Optional[List[str]] = None,
+                           include_vectors: bool = False) -> List[QueryResult]:
         """
         Retrieve documents from the specified Pinecone collection.
 
@@ -104,6 +119,8 @@ class PineconeStore(VectorStore):
             query (str): The query string.
             collection_name (str): The name of the collection to retrieve documents from.
             limit (int): The number of results to return.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each match.
 
         Returns:
             List[QueryResult]: The list of query results.
@@ -112,35 +129,44 @@ class PineconeStore(VectorStore):
             raise CollectionError(f"Collection '{collection_name}' does not exist")
 
         embeddings = get_embeddings(query)
-        if not embeddings:
+        if len(embeddings) == 0:
             raise VectorStoreError("Failed to generate embeddings for the query string.")
-        query_embeddings = QueryWithEmbedding(text=query, vectors=embeddings)
+        query_embeddings = QueryWithEmbedding(text=query, vectors=embeddings[0])
 
-        results = self.query(collection_name, query_embeddings, number_of_results=limit)
+        results = self.query(collection_name, query_embeddings, number_of_results=limit,
+                             output_fields=output_fields, include_vectors=include_vectors)
         return results
 
     def query(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10,
-              filter: Optional[DocumentMetadataFilter] = None) -> List[QueryResult]:
+              filter: Optional[MetadataFilter] = None,
+              output_fields: Optional[List[str]] = None,
+              include_vectors: bool = False) -> List[QueryResult]:
         """
         Query the specified Pinecone collection using an embedding.
 
+        Pinecone always returns the whole metadata object, so output_fields is
+        applied to the matches after they are received.
+
         Args:
             collection_name (str): The name of the collection to query.
             query (QueryWithEmbedding): The query embedding.
             number_of_results (int): The number of results to return.
-            filter (Optional[DocumentMetadataFilter]): Optional filter for the query.
+            filter (Optional[MetadataFilter]): Optional metadata filter, applied by Pinecone during the search.
+            output_fields (Optional[List[str]]): Metadata fields to return. Defaults to all of them.
+            include_vectors (bool): Whether to return the stored embedding of each match.
 
         Returns:
             List[QueryResult]: The list of query results.
         """
         try:
             response = self.client.Index(collection_name).query(
-                vector=query.vectors,
+                vector=vector_to_list(query.vectors),
                 top_k=number_of_results,
                 include_metadata=True,
-                include_values=True,
+                include_values=include_vectors,
+                filter=self._build_filters(filter),
             )
-            return self._process_search_results(response)
+            return self._process_search_results(response, output_fields)
         except Exception as e:
             logging.error(f"Failed to query Pinecone index '{collection_name}': {e}")
             raise CollectionError(f"Failed to query Pinecone index '{collection_name}': {e}")
@@ -155,6 +181,7 @@ class PineconeStore(VectorStore):
         try:
             self.client.delete_index(collection_name)
             self.index = None
+            drop_sparse_index(collection_name)
             logging.info(f"Pinecone index '{collection_name}' deleted successfully")
         except Exception as e:
             logging.error(f"Failed to delete Pinecone index '{collection_name}': {e}")
@@ -180,49 +207,68 @@ class PineconeStore(VectorStore):
 
         try:
             self.client.Index(collection_name).delete(ids=document_ids)
+            if sparse_index_enabled():
+                get_sparse_index(collection_name).remove_documents(document_ids)
             logging.info(f"Deleted documents from index '{collection_name}'")
             return len(document_ids)
         except Exception as e:
             logging.error(f"Failed to delete documents from Pinecone index '{collection_name}': {e}")
             raise CollectionError(f"Failed to delete documents from Pinecone index '{collection_name}': {e}")
 
-    def _convert_to_chunk(self, data: Dict) -> DocumentChunk:
+    def flush(self, collection_name: str) -> None:
+        """
+        Persist the local sparse index of the collection. Upserts are written through.
+
+        Args:
+            collection_name (str): The name of the collection to flush.
+        """
+        if sparse_index_enabled():
+            get_sparse_index(collection_name).save()
+
+    def _convert_to_chunk(self, data: Dict, output_fields: Optional[List[str]] = None) -> DocumentChunk:
         """
         Convert data to a DocumentChunk.
 
         Args:
             data (Dict): The data to convert.
+            output_fields (Optional[List[str]]): Metadata fields to keep. Defaults to all of them.
 
         Returns:
             DocumentChunk: The converted DocumentChunk.
         """
+        metadata = data["metadata"]
+        if output_fields is not None:
+            metadata = {key: value for key, value in metadata.items()
+                        if key in output_fields or key in ("text", "document_id")}
         return DocumentChunk(
             chunk_id=data["id"],
-            text=data["metadata"]["text"],
-            vectors=data["values"],
+            text=metadata.get("text"),
+            # Pinecone returns an empty list when include_values is False
+            vectors=data.get("values") or None,
             metadata=DocumentChunkMetadata(
-                source=Source(data["metadata"]["source"]) if data["metadata"]["source"] else Source.OTHER,
-                source_id=data["metadata"]["source_id"],
-                url=data["metadata"]["url"],
-                created_at=data["metadata"]["created_at"],
-                author=data["metadata"]["author"],
+                source=Source(metadata["source"]) if metadata.get("source") else Source.OTHER,
+                source_id=metadata.get("source_id"),
+                url=metadata.get("url"),
+                created_at=metadata.get("created_at"),
+                author=metadata.get("author"),
             ),
-            document_id=data["metadata"]["document_id"],
+            document_id=metadata.get("document_id"),
         )
 
-    def _process_search_results(self, response: Dict) -> List[QueryResult]:
+    def _process_search_results(self, response: Dict, output_fields: Optional[List[str]] = None) -> List[QueryResult]:
         """
         Process search results from Pinecone.
 
         Args:
             response (Dict): The search results to process.
+            output_fields (Optional[List[str]]): Metadata fields to keep. Defaults to all of them.
 
         Returns:
             List[QueryResult]: The list of query results.
         """
         results = []
         for match in response["matches"]:
-            chunk = self._convert_to_chunk(match)
+            chunk = self._convert_to_chunk(match, output_fields)
             results.append(
                 QueryResult(
                     data=[chunk], similarities=[match["score"]], ids=[match["id"]]
@@ -230,14 +276,14 @@ class PineconeStore(VectorStore):
             )
         return results
 
-    def _build_filters(self, filter: Optional[DocumentMetadataFilter]) -> Dict[str, Any]:
+    def _build_filters(self, filter: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
         """
         Build filters for Pinecone queries.
 
         Args:
-            filter (Optional[DocumentMetadataFilter]): The metadata filter to build.
+            filter (Optional[MetadataFilter]): The metadata filter to build.
 
         Returns:
-            Dict[str, Any]: The built filter dictionary.
+            Optional[Dict[str, Any]]: The built filter dictionary, or None without a filter.
         """
-        raise NotImplementedError("Filter building is not supported in PineconeStore.")
+        return to_mongo_filter(filter)
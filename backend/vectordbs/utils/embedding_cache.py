@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.sqlite3"
+VECTORS_FILE = "vectors.f32"
+# Keys of slots reserved by put_many while their vectors are written
+PENDING_KEY_PREFIX = "pending:"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so that trivially different inputs share a cache entry.
+
+    Applies Unicode NFC normalization, collapses runs of whitespace and strips
+    leading/trailing whitespace. Case is preserved because embeddings are case sensitive.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed, content-addressed cache of text embeddings.
+
+    Entries are keyed by a hash of the embedding model and the normalized text.
+    Vectors live in a fixed-size memory-mapped float32 file, one slot per entry,
+    so lookups read rows directly instead of deserializing them. A SQLite index
+    maps keys to slots and tracks last access time for LRU eviction once
+    max_entries slots are in use.
+
+    The capacity is stored in the index, so the vector file is never read with
+    a different shape than it was written with. A cache opened with a larger
+    max_entries grows; one opened with a smaller max_entries keeps its capacity.
+
+    Several processes may share a cache directory. A writer unlinks an evicted
+    key before it overwrites the slot and publishes the new key only after the
+    vector is written, and readers re-check their keys after reading the vectors.
+
+    Attributes:
+        model (str): The embedding model the cached vectors belong to.
+        dim (int): The embedding dimension.
+        max_entries (int): The maximum number of cached vectors.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found in the cache.
+        evictions (int): Number of entries evicted to make room for new ones.
+    """
+
+    def __init__(self, cache_dir: str, model: str, dim: int, max_entries: int) -> None:
+        self.model = model
+        self.dim = dim
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        model_dir = os.path.join(cache_dir, re.sub(r"[^a-zA-Z0-9_.-]", "_", model), str(dim))
+        os.makedirs(model_dir, exist_ok=True)
+        self._vectors_path = os.path.join(model_dir, VECTORS_FILE)
+        self._vectors: Optional[np.memmap] = None
+
+        self._conn = sqlite3.connect(os.path.join(model_dir, INDEX_FILE), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+        with self._transaction():
+            capacity = self._stored_capacity()
+            if capacity is None and os.path.exists(self._vectors_path):
+                # Caches written before the capacity was stored hold exactly as many slots as the file
+                capacity = os.path.getsize(self._vectors_path) // (dim * np.dtype(np.float32).itemsize)
+            if capacity and capacity > max_entries:
+                logger.info(f"Embedding cache at {model_dir} keeps its capacity of {capacity} entries")
+            capacity = max(capacity or 0, max_entries)
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('capacity', ?)", (capacity,))
+            self._map(capacity)
+        logger.info(f"Opened embedding cache at {model_dir} with capacity {self.max_entries}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _stored_capacity(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'capacity'").fetchone()
+        return row[0] if row else None
+
+    def _map(self, capacity: int) -> None:
+        """Map the vector file with the given number of slots, growing the file if needed. It never shrinks."""
+        size = capacity * self.dim * np.dtype(np.float32).itemsize
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self.max_entries = capacity
+
+    def _sync_capacity(self) -> None:
+        """Remap the vector file if another process has grown the cache."""
+        capacity = self._stored_capacity()
+        if capacity is not None and capacity > self.max_entries:
+            self._map(capacity)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _slots(self, keys: List[str]) -> Dict[str, int]:
+        slots: Dict[str, int] = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Look up cached embeddings for a list of texts.
+
+        Args:
+            texts (Sequence[str]): The texts to look up.
+
+        Returns:
+            Tuple[np.ndarray, List[int]]: A float32 matrix of shape (len(texts), dim) holding the
+            cached vectors, and the indices of the texts that were not found (their rows are zero).
+        """
+        keys = [self._key(text) for text in texts]
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        with self._lock:
+            self._sync_capacity()
+            slots = self._slots(list(set(keys)))
+            hit_rows = [i for i, key in enumerate(keys) if key in slots]
+            if hit_rows:
+                # Fancy indexing copies the rows, so later evictions cannot change the result
+                matrix[hit_rows] = self._vectors[[slots[keys[i]] for i in hit_rows]]
+                # Another process may have evicted a key and overwritten its slot while the rows were read.
+                # Keys are unlinked before their slot is reused, so a key still on the same slot is intact.
+                current = self._slots(list(slots))
+                slots = {key: slot for key, slot in slots.items() if current.get(key) == slot}
+
+            if slots:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in slots]
+                )
+
+            missing = [i for i, key in enumerate(keys) if key not in slots]
+            matrix[missing] = 0.0
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return matrix, missing
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings for a list of texts, evicting least recently used entries when full.
+
+        Slots are first reserved under placeholder keys, which unlinks evicted keys, then
+        written, and only then published under their real keys, so no reader in another
+        process can see a key whose vector is being written.
+
+        Args:
+            texts (Sequence[str]): The texts that were embedded.
+            vectors (np.ndarray): A float32 matrix with one row per text.
+        """
+        with self._lock:
+            reserved: List[Tuple[str, str, int, np.ndarray]] = []
+            with self._transaction():
+                self._sync_capacity()
+                keys: Set[str] = set()
+                for text, vector in zip(texts, vectors):
+                    key = self._key(text)
+                    now = time.time()
+                    row = self._conn.execute("SELECT slot FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+                        continue
+                    if key in keys:
+                        continue
+                    keys.add(key)
+                    slot = self._allocate_slot()
+                    placeholder = f"{PENDING_KEY_PREFIX}{uuid.uuid4().hex}"
+                    self._conn.execute(
+                        "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)", (placeholder, slot, now)
+                    )
+                    reserved.append((placeholder, key, slot, vector))
+            if not reserved:
+                return
+
+            for _, _, slot, vector in reserved:
+                self._vectors[slot] = vector
+            self._vectors.flush()
+
+            with self._transaction():
+                for placeholder, key, _, _ in reserved:
+                    # Another process may have cached the same text meanwhile; then the reservation is
+                    # dropped and its slot is left free for _allocate_slot
+                    self._conn.execute("UPDATE OR IGNORE entries SET key = ? WHERE key = ?", (key, placeholder))
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (placeholder,))
+
+    def _allocate_slot(self) -> int:
+        """Return a free vector slot, evicting the least recently used entry if the cache is full."""
+        (count, last) = self._conn.execute("SELECT COUNT(*), MAX(slot) FROM entries").fetchone()
+        if count < self.max_entries:
+            if last is None or last == count - 1:
+                # Used slots are 0..count-1, as they are unless a reservation was dropped
+                return count
+            # A reservation dropped by put_many left a hole: reuse the lowest free slot
+            (slot,) = self._conn.execute(
+                "SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM entries WHERE slot = 0) "
+                "UNION ALL SELECT MIN(slot + 1) FROM entries AS used "
+                "WHERE NOT EXISTS (SELECT 1 FROM entries WHERE slot = used.slot + 1) LIMIT 1"
+            ).fetchone()
+            return slot
+
+        key, slot = self._conn.execute(
+            "SELECT key, slot FROM entries ORDER BY last_used ASC LIMIT 1"
+        ).fetchone()
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self.evictions += 1
+        return slot
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return cache hit/miss counters for this process.
+
+        Returns:
+            Dict[str, int]: The hit, miss and eviction counts and the number of stored entries.
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries}
@@ -0,0 +1,252 @@
+import json
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional
+
+from ..data_types import (DocumentMetadataFilter, FilterCondition,
+                          MetadataFilter, MetadataFilterGroup)
+from ..error_types import VectorStoreError
+
+# Accepted spellings of each canonical operator
+OPERATOR_ALIASES: Dict[str, str] = {
+    "": "eq", "eq": "eq", "equals": "eq", "term": "eq", "==": "eq",
+    "ne": "ne", "not_equals": "ne", "!=": "ne",
+    "gt": "gt", ">": "gt",
+    "gte": "gte", ">=": "gte",
+    "lt": "lt", "<": "lt",
+    "lte": "lte", "<=": "lte",
+    "in": "in",
+    "nin": "nin", "not_in": "nin",
+}
+
+# Operator matching exactly the complement of each operator
+_NEGATED_OPERATORS = {"eq": "ne", "ne": "eq", "gt": "lte", "gte": "lt", "lt": "gte", "lte": "gt", "in": "nin", "nin": "in"}
+
+
+def _operator(filter: DocumentMetadataFilter) -> str:
+    operator = OPERATOR_ALIASES.get((filter.operator or "").lower())
+    if operator is None:
+        raise VectorStoreError(f"Unsupported filter operator: {filter.operator}")
+    if operator in ("in", "nin") and not isinstance(filter.value, (list, tuple, set)):
+        raise VectorStoreError(f"Filter operator '{filter.operator}' on '{filter.field_name}' requires a list value")
+    return operator
+
+
+def normalize_filter(filter: MetadataFilter, negate: bool = False) -> MetadataFilter:
+    """
+    Rewrite a filter into negation normal form.
+
+    NOT groups are pushed down to the conditions with De Morgan's laws, so the
+    result only contains AND and OR groups over conditions with canonical
+    operators. Single-member groups are unwrapped.
+
+    Args:
+        filter (MetadataFilter): The filter to normalize.
+        negate (bool): Whether to return the complement of the filter.
+
+    Returns:
+        MetadataFilter: The normalized filter.
+
+    Raises:
+        VectorStoreError: If the filter has an unknown operator or an empty group.
+    """
+    if isinstance(filter, DocumentMetadataFilter):
+        operator = _operator(filter)
+        value = list(filter.value) if operator in ("in", "nin") else filter.value
+        return DocumentMetadataFilter(field_name=filter.field_name,
+                                      operator=_NEGATED_OPERATORS[operator] if negate else operator,
+                                      value=value)
+
+    if not filter.filters:
+        raise VectorStoreError("Filter groups must contain at least one filter")
+    condition = FilterCondition(filter.condition)
+    if condition == FilterCondition.NOT:
+        # NOT applies to the conjunction of its members
+        condition, negate = FilterCondition.AND, not negate
+    if negate:
+        condition = FilterCondition.OR if condition == FilterCondition.AND else FilterCondition.AND
+
+    members: List[MetadataFilter] = []
+    for member in filter.filters:
+        member = normalize_filter(member, negate)
+        # Flatten nested groups with the same condition
+        if isinstance(member, MetadataFilterGroup) and member.condition == condition:
+            members.extend(member.filters)
+        else:
+            members.append(member)
+    if len(members) == 1:
+        return members[0]
+    return MetadataFilterGroup(filters=members, condition=condition)
+
+
+def _compile(filter: Optional[MetadataFilter], condition: Callable[[DocumentMetadataFilter], Any],
+             all_of: Callable[[List[Any]], Any], any_of: Callable[[List[Any]], Any]) -> Any:
+    if filter is None:
+        return None
+
+    def visit(node: MetadataFilter) -> Any:
+        if isinstance(node, DocumentMetadataFilter):
+            return condition(node)
+        members = [visit(member) for member in node.filters]
+        return all_of(members) if node.condition == FilterCondition.AND else any_of(members)
+
+    return visit(normalize_filter(filter))
+
+
+def _milvus_literal(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"[{', '.join(_milvus_literal(item) for item in value)}]"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    # JSON string escaping matches the escapes accepted by the Milvus expression parser
+    return json.dumps(str(value))
+
+
+_MILVUS_OPERATORS = {"eq": "==", "ne": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "in": "in", "nin": "not in"}
+
+
+def to_milvus_expr(filter: Optional[MetadataFilter]) -> Optional[str]:
+    """
+    Compile a filter into a Milvus boolean expression.
+
+    Args:
+        filter (Optional[MetadataFilter]): The filter to compile.
+
+    Returns:
+        Optional[str]: The expression, e.g. `(author == "a") and (created_at >= "2024")`, or None without a filter.
+    """
+    return _compile(
+        filter,
+        lambda f: f"{f.field_name} {_MILVUS_OPERATORS[f.operator]} {_milvus_literal(f.value)}",
+        lambda members: " and ".join(f"({member})" for member in members),
+        lambda members: " or ".join(f"({member})" for member in members),
+    )
+
+
+def to_mongo_filter(filter: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
+    """
+    Compile a filter into the MongoDB-style metadata filter of Pinecone and Chroma.
+
+    Pinecone only supports the range operators on numbers.
+
+    Args:
+        filter (Optional[MetadataFilter]): The filter to compile.
+
+    Returns:
+        Optional[Dict[str, Any]]: The filter, e.g. `{"$and": [{"author": {"$eq": "a"}}, ...]}`, or None without a filter.
+    """
+    return _compile(
+        filter,
+        lambda f: {f.field_name: {f"${f.operator}": f.value}},
+        lambda members: {"$and": members},
+        lambda members: {"$or": members},
+    )
+
+
+def _elasticsearch_condition(filter: DocumentMetadataFilter) -> Dict[str, Any]:
+    if filter.operator in ("eq", "ne"):
+        clause = {"term": {filter.field_name: filter.value}}
+    elif filter.operator in ("in", "nin"):
+        clause = {"terms": {filter.field_name: filter.value}}
+    else:
+        return {"range": {filter.field_name: {filter.operator: filter.value}}}
+    if filter.operator in ("ne", "nin"):
+        return {"bool": {"must_not": [clause]}}
+    return clause
+
+
+def to_elasticsearch_query(filter: Optional[MetadataFilter]) -> Optional[Dict[str, Any]]:
+    """
+    Compile a filter into an Elasticsearch query clause for filter context.
+
+    Args:
+        filter (Optional[MetadataFilter]): The filter to compile.
+
+    Returns:
+        Optional[Dict[str, Any]]: A term, terms, range or bool clause, or None without a filter.
+    """
+    return _compile(
+        filter,
+        _elasticsearch_condition,
+        lambda members: {"bool": {"filter": members}},
+        lambda members: {"bool": {"should": members, "minimum_should_match": 1}},
+    )
+
+
+def _weaviate_condition(filter: DocumentMetadataFilter) -> Any:
+    from weaviate.classes.query import Filter
+
+    prop = Filter.by_property(filter.field_name)
+    if filter.operator == "in":
+        return reduce(lambda a, b: a | b, [prop.equal(value) for value in filter.value])
+    if filter.operator == "nin":
+        return reduce(lambda a, b: a & b, [prop.not_equal(value) for value in filter.value])
+    return {
+        "eq": prop.equal,
+        "ne": prop.not_equal,
+        "gt": prop.greater_than,
+        "gte": prop.greater_or_equal,
+        "lt": prop.less_than,
+        "lte": prop.less_or_equal,
+    }[filter.operator](filter.value)
+
+
+def to_weaviate_filter(filter: Optional[MetadataFilter]) -> Any:
+    """
+    Compile a filter into a Weaviate v4 `Filter`.
+
+    Args:
+        filter (Optional[MetadataFilter]): The filter to compile.
+
+    Returns:
+        Any: The weaviate.classes.query filter, or None without a filter.
+    """
+    return _compile(
+        filter,
+        _weaviate_condition,
+        lambda members: reduce(lambda a, b: a & b, members),
+        lambda members: reduce(lambda a, b: a | b, members),
+    )
+
+
+def _matches_condition(filter: DocumentMetadataFilter, value: Any) -> bool:
+    if filter.operator == "eq":
+        return value == filter.value
+    if filter.operator == "ne":
+        return value != filter.value
+    if filter.operator == "in":
+        return value in filter.value
+    if filter.operator == "nin":
+        return value not in filter.value
+    if value is None:
+        return False
+    try:
+        return {
+            "gt": value > filter.value,
+            "gte": value >= filter.value,
+            "lt": value < filter.value,
+            "lte": value <= filter.value,
+        }[filter.operator]
+    except TypeError:
+        return False
+
+
+def to_predicate(filter: Optional[MetadataFilter],
+                 get_value: Callable[[Any, str], Any]) -> Optional[Callable[[Any], bool]]:
+    """
+    Compile a filter into a Python predicate, for stores that filter in process.
+
+    Args:
+        filter (Optional[MetadataFilter]): The filter to compile.
+        get_value (Callable[[Any, str], Any]): Returns the value of a field of a record.
+
+    Returns:
+        Optional[Callable[[Any], bool]]: A predicate over records, or None without a filter.
+    """
+    return _compile(
+        filter,
+        lambda f: lambda record: _matches_condition(f, get_value(record, f.field_name)),
+        lambda members: lambda record: all(member(record) for member in members),
+        lambda members: lambda record: any(member(record) for member in members),
+    )
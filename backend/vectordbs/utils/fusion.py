@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Sequence
+
+from ..data_types import DocumentChunk, DocumentChunkWithScore, QueryResult
+
+RRF_K = 60  # Rank offset from the original reciprocal rank fusion paper
+
+
+def flatten_results(results: List[QueryResult]) -> List[DocumentChunk]:
+    """Flatten the QueryResults of a store into one ranked list of chunks."""
+    return [chunk for result in results for chunk in (result.data or [])]
+
+
+def _with_score(chunk: DocumentChunk, score: float) -> DocumentChunkWithScore:
+    return DocumentChunkWithScore(
+        chunk_id=chunk.chunk_id,
+        text=chunk.text,
+        vectors=chunk.vectors,
+        metadata=chunk.metadata,
+        document_id=chunk.document_id,
+        score=score,
+    )
+
+
+def _fuse(ranked_lists: Sequence[Sequence[DocumentChunk]], scores: Dict[str, float],
+          limit: Optional[int]) -> List[DocumentChunkWithScore]:
+    # The first list wins when the same chunk appears in several, so put the richest payload first
+    chunks: Dict[str, DocumentChunk] = {}
+    for ranked in ranked_lists:
+        for chunk in ranked:
+            chunks.setdefault(chunk.chunk_id, chunk)
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    return [_with_score(chunks[chunk_id], score) for chunk_id, score in ordered]
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[DocumentChunk]], k: int = RRF_K,
+                           weights: Optional[Sequence[float]] = None,
+                           limit: Optional[int] = None) -> List[DocumentChunkWithScore]:
+    """
+    Fuse ranked result lists with (weighted) reciprocal rank fusion.
+
+    Each chunk scores sum(weight / (k + rank)) over the lists it appears in,
+    so only ranks matter and scores on different scales need no calibration.
+
+    Args:
+        ranked_lists (Sequence[Sequence[DocumentChunk]]): Result lists, best match first.
+        k (int): Rank offset dampening the influence of top ranks.
+        weights (Optional[Sequence[float]]): Weight of each list. Defaults to 1 for all.
+        limit (Optional[int]): The maximum number of fused results to return.
+
+    Returns:
+        List[DocumentChunkWithScore]: The fused results, highest fused score first.
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    scores: Dict[str, float] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, chunk in enumerate(ranked, start=1):
+            scores[chunk.chunk_id] = scores.get(chunk.chunk_id, 0.0) + weight / (k + rank)
+    return _fuse(ranked_lists, scores, limit)
+
+
+def weighted_score_fusion(ranked_lists: Sequence[Sequence[DocumentChunk]],
+                          weights: Optional[Sequence[float]] = None,
+                          limit: Optional[int] = None) -> List[DocumentChunkWithScore]:
+    """
+    Fuse ranked result lists by a weighted sum of min-max normalized scores.
+
+    Lists whose chunks carry no score (some stores only return distances in a
+    separate field) are normalized by rank instead.
+
+    Args:
+        ranked_lists (Sequence[Sequence[DocumentChunk]]): Result lists, best match first.
+        weights (Optional[Sequence[float]]): Weight of each list. Defaults to 1 for all.
+        limit (Optional[int]): The maximum number of fused results to return.
+
+    Returns:
+        List[DocumentChunkWithScore]: The fused results, highest fused score first.
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    scores: Dict[str, float] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        if not ranked:
+            continue
+        raw = [getattr(chunk, "score", None) for chunk in ranked]
+        if any(score is None for score in raw):
+            raw = [float(len(ranked) - rank) for rank in range(len(ranked))]
+        low, high = min(raw), max(raw)
+        for chunk, score in zip(ranked, raw):
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            scores[chunk.chunk_id] = scores.get(chunk.chunk_id, 0.0) + weight * normalized
+    return _fuse(ranked_lists, scores, limit)
@@ -0,0 +1,109 @@
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Union
+
+from ..error_types import VectorStoreError
+
+# The search parameter that trades recall for latency on each index type
+SEARCH_PARAM_NAMES: Dict[str, str] = {
+    "HNSW": "ef",
+    "IVF_FLAT": "nprobe",
+    "IVF_PQ": "nprobe",
+    "DISKANN": "search_list",
+}
+
+
+@dataclass
+class IndexProfile:
+    """
+    ANN index and search parameters of a collection.
+
+    Attributes:
+        index_type (str): The index type, one of SEARCH_PARAM_NAMES.
+        metric_type (str): The similarity metric.
+        build_params (Dict[str, Any]): Parameters used when building the index.
+        search_params (Dict[str, Any]): Parameters used when searching the index.
+    """
+    index_type: str
+    metric_type: str = "IP"
+    build_params: Dict[str, Any] = field(default_factory=dict)
+    search_params: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.index_type = self.index_type.upper()
+        if self.index_type not in SEARCH_PARAM_NAMES:
+            raise VectorStoreError(f"Unsupported index type: {self.index_type}")
+
+    @property
+    def search_param_name(self) -> str:
+        return SEARCH_PARAM_NAMES[self.index_type]
+
+    def index_params(self) -> Dict[str, Any]:
+        """The index_params of a Milvus create_index call."""
+        return {"index_type": self.index_type, "metric_type": self.metric_type, "params": dict(self.build_params)}
+
+    def search_request_params(self, limit: int) -> Dict[str, Any]:
+        """
+        The param of a Milvus search call returning `limit` results.
+
+        HNSW and DiskANN require their candidate list to be at least as long as
+        the number of results, so ef and search_list are raised to the limit.
+        """
+        params = dict(self.search_params)
+        if self.index_type in ("HNSW", "DISKANN"):
+            name = self.search_param_name
+            params[name] = max(int(params.get(name, limit)), limit)
+        return {"metric_type": self.metric_type, "params": params}
+
+    def with_search_params(self, **search_params: Any) -> "IndexProfile":
+        """Return a copy of the profile with some search parameters replaced."""
+        return IndexProfile(self.index_type, self.metric_type, dict(self.build_params),
+                            {**self.search_params, **search_params})
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, value: str) -> "IndexProfile":
+        return cls(**json.loads(value))
+
+
+# Named starting points. HNSW suits most collections; IVF_PQ and DISKANN trade
+# some recall for memory once a collection outgrows RAM.
+INDEX_PROFILES: Dict[str, IndexProfile] = {
+    "hnsw": IndexProfile("HNSW", build_params={"M": 16, "efConstruction": 200}, search_params={"ef": 64}),
+    "ivf_flat": IndexProfile("IVF_FLAT", build_params={"nlist": 1024}, search_params={"nprobe": 16}),
+    "ivf_pq": IndexProfile("IVF_PQ", build_params={"nlist": 1024, "m": 16, "nbits": 8}, search_params={"nprobe": 32}),
+    "diskann": IndexProfile("DISKANN", search_params={"search_list": 100}),
+}
+
+
+def get_index_profile(profile: Union[str, Dict[str, Any], IndexProfile, None],
+                      index_params: Optional[str] = None,
+                      search_params: Optional[str] = None) -> IndexProfile:
+    """
+    Resolve an index profile.
+
+    Args:
+        profile (Union[str, Dict[str, Any], IndexProfile, None]): A profile name from INDEX_PROFILES,
+            a profile as a dict, or a profile. None falls back to the raw parameters, then to "hnsw".
+        index_params (Optional[str]): JSON index_params of a create_index call, e.g. MILVUS_INDEX_PARAMS.
+        search_params (Optional[str]): JSON param of a search call, e.g. MILVUS_SEARCH_PARAMS.
+
+    Returns:
+        IndexProfile: A copy of the resolved profile.
+    """
+    if isinstance(profile, IndexProfile):
+        return profile.with_search_params()
+    if isinstance(profile, dict):
+        return IndexProfile(**profile)
+    if profile:
+        if profile.lower() not in INDEX_PROFILES:
+            raise VectorStoreError(f"Unknown index profile: {profile}. Choose one of {sorted(INDEX_PROFILES)}")
+        return INDEX_PROFILES[profile.lower()].with_search_params()
+    if index_params:
+        index = json.loads(index_params)
+        search = json.loads(search_params) if search_params else {}
+        return IndexProfile(index["index_type"], index.get("metric_type", "IP"), index.get("params", {}),
+                            search.get("params", {}))
+    return INDEX_PROFILES["hnsw"].with_search_params()
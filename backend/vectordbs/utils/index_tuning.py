@@ -0,0 +1,134 @@
+import argparse
+import logging
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Candidate values of each search parameter, cheapest first
+DEFAULT_SWEEPS = {
+    "ef": [16, 32, 64, 128, 256, 512, 1024],
+    "nprobe": [1, 2, 4, 8, 16, 32, 64, 128, 256],
+    "search_list": [16, 32, 64, 128, 256, 512],
+}
+
+
+@dataclass
+class TuningResult:
+    """
+    Recall and latency of one search parameter value.
+
+    Attributes:
+        value (int): The value of the search parameter.
+        recall (float): Mean recall@k against the ground truth.
+        mean_latency_ms (float): Mean latency of a single-query search.
+        p95_latency_ms (float): 95th percentile latency of a single-query search.
+    """
+    value: int
+    recall: float
+    mean_latency_ms: float
+    p95_latency_ms: float
+
+
+def recall_at_k(retrieved: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    """Fraction of the top k ground truth IDs found in the top k retrieved IDs."""
+    expected = set(relevant[:k])
+    if not expected:
+        return 1.0
+    return len(expected.intersection(retrieved[:k])) / len(expected)
+
+
+def sweep_search_param(search: Callable[[int, int], List[str]], num_queries: int, values: Sequence[int],
+                       ground_truth: Sequence[Sequence[str]], k: int) -> List[TuningResult]:
+    """
+    Measure recall@k and latency of each search parameter value.
+
+    Queries are sent one at a time, as the application sends them, after one
+    untimed warm-up query per value.
+
+    Args:
+        search (Callable[[int, int], List[str]]): Searches with (query index, parameter value)
+            and returns the IDs of the top k hits.
+        num_queries (int): The number of held-out queries.
+        values (Sequence[int]): The parameter values to try.
+        ground_truth (Sequence[Sequence[str]]): The expected top k IDs of each query.
+        k (int): The number of results per query.
+
+    Returns:
+        List[TuningResult]: One result per value, in the order of the values.
+    """
+    results = []
+    for value in values:
+        search(0, value)
+        recalls, latencies = [], []
+        for i in range(num_queries):
+            start = time.perf_counter()
+            ids = search(i, value)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(recall_at_k(ids, ground_truth[i], k))
+        latencies.sort()
+        result = TuningResult(
+            value=value,
+            recall=statistics.fmean(recalls),
+            mean_latency_ms=statistics.fmean(latencies),
+            p95_latency_ms=latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        )
+        logger.info(f"value={result.value} recall@{k}={result.recall:.4f} "
+                    f"mean={result.mean_latency_ms:.2f}ms p95={result.p95_latency_ms:.2f}ms")
+        results.append(result)
+    return results
+
+
+def select_setting(results: Sequence[TuningResult], target_recall: float) -> Optional[TuningResult]:
+    """
+    Pick the lowest latency setting meeting the target recall.
+
+    Args:
+        results (Sequence[TuningResult]): The measured settings.
+        target_recall (float): The minimum mean recall@k.
+
+    Returns:
+        Optional[TuningResult]: The selected setting, or None if no setting reaches the target.
+    """
+    eligible = [result for result in results if result.recall >= target_recall]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: result.mean_latency_ms)
+
+
+def main() -> None:
+    """Tune the search parameters of a Milvus collection against a file of held-out queries, one per line."""
+    from backend.vectordbs.data_types import QueryWithEmbedding
+    from backend.vectordbs.milvus_store import MilvusStore
+    from backend.vectordbs.utils.watsonx import get_embeddings
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("collection", help="The Milvus collection to tune")
+    parser.add_argument("queries", help="Text file with one held-out query per line")
+    parser.add_argument("--k", type=int, default=10, help="Number of results per query")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Minimum mean recall@k")
+    parser.add_argument("--values", type=int, nargs="*", help="Parameter values to try")
+    parser.add_argument("--apply", action="store_true", help="Persist the selected setting on the collection")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.queries) as f:
+        texts = [line.strip() for line in f if line.strip()]
+    queries = [QueryWithEmbedding(text=text, vectors=vector) for text, vector in zip(texts, get_embeddings(texts))]
+
+    store = MilvusStore()
+    selected, results = store.tune_search_params(args.collection, queries, k=args.k, target_recall=args.target_recall,
+                                                 values=args.values, apply=args.apply)
+    for result in results:
+        print(f"{result.value}\trecall@{args.k}={result.recall:.4f}\t"
+              f"mean={result.mean_latency_ms:.2f}ms\tp95={result.p95_latency_ms:.2f}ms")
+    if selected is None:
+        print(f"No setting reached recall@{args.k} >= {args.target_recall}")
+    else:
+        print(f"Selected {store.get_index_profile(args.collection).search_param_name}={selected.value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.core.config import settings
+
+from ..data_types import (DocumentChunk, DocumentChunkMetadata,
+                          DocumentChunkWithScore, Source)
+
+logger = logging.getLogger(__name__)
+
+# Chunks are only indexed when retrieval can use them
+SPARSE_INDEX_ENABLED = settings.retrieval_mode.lower() in ("sparse", "hybrid")
+SPARSE_INDEX_DIR = settings.sparse_index_dir or os.path.join(settings.file_storage_path, "sparse_index")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokenizer shared by indexing and querying."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class SparseIndex:
+    """
+    In-process BM25 index over the chunks of one collection.
+
+    Used as the lexical side of hybrid retrieval for stores without native
+    full-text search. Chunks are stored without their vectors, so results can
+    be returned without a round trip to the vector store.
+
+    Attributes:
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 document length normalization.
+        path (Optional[str]): JSON file the index is persisted to by save(), if any.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, path: Optional[str] = None) -> None:
+        self.k1 = k1
+        self.b = b
+        self.path = path
+        self._chunks: Dict[str, DocumentChunk] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._document_chunks: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        # File version this index was loaded from or last saved, and whether it has unsaved changes
+        self._version: Optional[Tuple[int, int]] = None
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def add(self, chunks: List[DocumentChunk]) -> None:
+        """
+        Index chunks, replacing any previously indexed chunk with the same ID.
+
+        Args:
+            chunks (List[DocumentChunk]): The chunks to index.
+        """
+        with self._lock:
+            self._dirty = True
+            for chunk in chunks:
+                if chunk.chunk_id in self._chunks:
+                    self._remove_chunk(chunk.chunk_id)
+                terms = Counter(tokenize(chunk.text or ""))
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[chunk.chunk_id] = count
+                length = sum(terms.values())
+                self._lengths[chunk.chunk_id] = length
+                self._total_length += length
+                self._chunks[chunk.chunk_id] = DocumentChunk(
+                    chunk_id=chunk.chunk_id,
+                    text=chunk.text,
+                    metadata=chunk.metadata,
+                    document_id=chunk.document_id,
+                )
+                if chunk.document_id:
+                    self._document_chunks.setdefault(chunk.document_id, set()).add(chunk.chunk_id)
+
+    def remove_documents(self, document_ids: List[str]) -> None:
+        """
+        Remove all chunks of the given documents.
+
+        Args:
+            document_ids (List[str]): The IDs of the documents to remove.
+        """
+        with self._lock:
+            self._dirty = True
+            for document_id in document_ids:
+                for chunk_id in self._document_chunks.pop(document_id, set()):
+                    self._remove_chunk(chunk_id)
+
+    def _remove_chunk(self, chunk_id: str) -> None:
+        chunk = self._chunks.pop(chunk_id)
+        for term in set(tokenize(chunk.text or "")):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(chunk_id)
+        if chunk.document_id in self._document_chunks:
+            self._document_chunks[chunk.document_id].discard(chunk_id)
+
+    def search(self, query: str, limit: int = 10) -> List[DocumentChunkWithScore]:
+        """
+        Rank indexed chunks against a query with BM25.
+
+        Args:
+            query (str): The query text.
+            limit (int): The maximum number of results to return.
+
+        Returns:
+            List[DocumentChunkWithScore]: The best matching chunks, highest score first.
+        """
+        with self._lock:
+            count = len(self._chunks)
+            if count == 0:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            results = []
+            for chunk_id, score in best:
+                chunk = self._chunks[chunk_id]
+                results.append(DocumentChunkWithScore(
+                    chunk_id=chunk.chunk_id,
+                    text=chunk.text,
+                    metadata=chunk.metadata,
+                    document_id=chunk.document_id,
+                    score=score,
+                ))
+            return results
+
+    def is_stale(self) -> bool:
+        """Return True if another process saved the index since it was loaded. Unsaved changes are kept."""
+        with self._lock:
+            return bool(self.path) and not self._dirty and _file_version(self.path) != self._version
+
+    def save(self) -> None:
+        """Persist the index to its path, if it has one."""
+        if not self.path:
+            return
+        with self._lock:
+            # Postings are rebuilt on load, so only the chunks are written
+            state = {"chunks": [_chunk_to_json(chunk) for chunk in self._chunks.values()]}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+            self._version = _file_version(self.path)
+            self._dirty = False
+        logger.info(f"Saved sparse index with {len(self)} chunks to {self.path}")
+
+    def load(self) -> None:
+        """Load the index from its path, if the file exists."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with self._lock:
+            version = _file_version(self.path)
+            with open(self.path) as f:
+                state = json.load(f)
+            self._chunks = {}
+            self._postings = {}
+            self._lengths = {}
+            self._total_length = 0
+            self._document_chunks = {}
+            self.add([_chunk_from_json(chunk) for chunk in state["chunks"]])
+            self._version = version
+            self._dirty = False
+        logger.info(f"Loaded sparse index with {len(self)} chunks from {self.path}")
+
+
+def _file_version(path: str) -> Optional[Tuple[int, int]]:
+    """Identify a saved state of an index file; it is replaced atomically on every save."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _chunk_to_json(chunk: DocumentChunk) -> Dict[str, Any]:
+    return {
+        "chunk_id": chunk.chunk_id,
+        "text": chunk.text,
+        "document_id": chunk.document_id,
+        "metadata": asdict(chunk.metadata) if chunk.metadata else None,
+    }
+
+
+def _chunk_from_json(data: Dict[str, Any]) -> DocumentChunk:
+    metadata = data.get("metadata")
+    if metadata and metadata.get("source"):
+        metadata["source"] = Source(metadata["source"])
+    return DocumentChunk(chunk_id=data["chunk_id"], text=data["text"],
+                         metadata=DocumentChunkMetadata(**metadata) if metadata else None,
+                         document_id=data.get("document_id"))
+
+
+# Process-wide sparse indexes by collection name
+_indexes: Dict[str, SparseIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_path(collection_name: str) -> str:
+    os.makedirs(SPARSE_INDEX_DIR, exist_ok=True)
+    return os.path.join(SPARSE_INDEX_DIR, f"{re.sub(r'[^a-zA-Z0-9_.-]', '_', collection_name)}.bm25.json")
+
+
+def sparse_index_enabled() -> bool:
+    """Return True if RETRIEVAL_MODE uses the sparse index, so stores must keep it up to date."""
+    return SPARSE_INDEX_ENABLED
+
+
+def get_sparse_index(collection_name: str) -> SparseIndex:
+    """
+    Get the sparse index of a collection from SPARSE_INDEX_DIR.
+
+    The index is loaded on first use and reloaded whenever another process saves a newer version.
+
+    Args:
+        collection_name (str): The name of the collection.
+
+    Returns:
+        SparseIndex: The collection's sparse index.
+    """
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is not None and index.is_stale():
+            logger.info(f"Sparse index of collection {collection_name} changed on disk, reloading it")
+            index = None
+        if index is None:
+            index = SparseIndex(path=_index_path(collection_name))
+            try:
+                index.load()
+            except Exception as e:
+                logger.error(f"Failed to load sparse index for collection {collection_name}, starting empty: {e}")
+                index = SparseIndex(path=index.path)
+            _indexes[collection_name] = index
+        return index
+
+
+def drop_sparse_index(collection_name: str) -> None:
+    """
+    Discard the sparse index of a collection, including its persisted file.
+
+    Args:
+        collection_name (str): The name of the collection.
+    """
+    with _indexes_lock:
+        _indexes.pop(collection_name, None)
+        path = _index_path(collection_name)
+        if os.path.exists(path):
+            os.remove(path)
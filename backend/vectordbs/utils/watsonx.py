@@ -1,7 +1,8 @@
 import json
 import logging
-from typing import List, Optional, Union, Tuple
+from typing import Dict, Iterator, List, Optional, Union, Tuple
 
+import numpy as np
 from chromadb.api.types import Documents, EmbeddingFunction
 from dotenv import load_dotenv
 from genai.client import Client
@@ -16,6 +17,7 @@ from genai.text.generation import CreateExecutionOptions
 from backend.core.config import settings
 import logging
 from ..data_types import Embeddings
+from .embedding_cache import EmbeddingCache
 
 EMBEDDING_MODEL = settings.embedding_model
 TOKENIZATION_MODEL = "google/flan-t5-xl"  # You can change this to your preferred model
@@ -26,6 +28,8 @@ logger = logging.getLogger(__name__)
 
 # Global client
 client = None
+# Global embedding cache, opened lazily on first use
+embedding_cache: Optional[EmbeddingCache] = None
 
 def _get_client() -> Client:
     global client
@@ -35,31 +39,100 @@ def _get_client() -> Client:
         client = Client(credentials=creds)
     return client
 
-def get_embeddings(texts: Union[str | List[str]]) -> List[float]:
+def _get_embedding_cache() -> Optional[EmbeddingCache]:
     """
-    Get embeddings for a given text or a list of texts.
+    Return the process-wide embedding cache, or None if caching is not configured.
+    """
+    global embedding_cache
+    if embedding_cache is None and settings.embedding_cache_dir and settings.embedding_dim:
+        try:
+            embedding_cache = EmbeddingCache(
+                cache_dir=settings.embedding_cache_dir,
+                model=EMBEDDING_MODEL,
+                dim=settings.embedding_dim,
+                max_entries=settings.embedding_cache_max_entries,
+            )
+        except Exception as e:
+            logging.error(f"Failed to open embedding cache, continuing without it: {e}")
+            settings.embedding_cache_dir = None
+    return embedding_cache
 
-    :param texts: A single string or a list of strings.
-    :return: A list of floats representing the embeddings.
+def get_embedding_cache_stats() -> Optional[Dict[str, int]]:
+    """
+    Get hit/miss counters for the embedding cache.
+
+    :return: The cache statistics, or None if caching is not configured.
+    """
+    cache = _get_embedding_cache()
+    return cache.stats() if cache else None
+
+def _create_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Request embeddings from WatsonX for a list of texts.
+
+    The SDK still runs its sub-batches concurrently; ordered=True only makes it
+    yield the responses in input order, so rows line up with texts.
     """
-    embeddings: List[float] = []
+    vectors: List[List[float]] = []
     client = _get_client()
+    for response in client.text.embedding.create(
+        model_id=EMBEDDING_MODEL,
+        inputs=texts,
+        parameters=TextEmbeddingParameters(truncate_input_tokens=True),
+        execution_options=CreateExecutionOptions(ordered=True),
+    ):
+        vectors.extend(result.embedding for result in response.results)
+    return np.array(vectors, dtype=np.float32)
+
+def get_embeddings(texts: Union[str | List[str]]) -> np.ndarray:
+    """
+    Get embeddings for a given text or a list of texts.
 
+    When EMBEDDING_CACHE_DIR is set, cached vectors are reused and only the
+    remaining texts are sent to WatsonX.
+
+    :param texts: A single string or a list of strings.
+    :return: A contiguous float32 array of shape (len(texts), dim), one row per
+        text in input order. On error an array with zero rows is returned.
+    """
     # Ensure texts is a list
     if isinstance(texts, str):
         texts = [texts]
+    empty = np.empty((0, settings.embedding_dim or 0), dtype=np.float32)
+    if not texts:
+        return empty
+
+    cache = _get_embedding_cache()
+    embeddings, missing = None, list(range(len(texts)))
+    if cache:
+        try:
+            embeddings, missing = cache.get_many(texts)
+        except Exception as e:
+            logging.error(f"Failed to read embedding cache, embedding all texts: {e}")
+    if not missing:
+        return embeddings
+
     try:
-        for response in client.text.embedding.create(
-            model_id=EMBEDDING_MODEL,
-            inputs=texts,
-            parameters=TextEmbeddingParameters(truncate_input_tokens=True),
-            execution_options=CreateExecutionOptions(ordered=False),
-        ):
-            for result in response.results:
-                embeddings.extend(result.embedding)  # assuming result is already a list of floats
+        new_embeddings = _create_embeddings([texts[i] for i in missing])
     except Exception as e:
-        logging.error(e)
+        logging.error(f"Error getting embeddings: {e}")
+        return empty
+    if new_embeddings.shape[0] != len(missing):
+        logging.error(f"Expected {len(missing)} embeddings but received {new_embeddings.shape[0]}")
+        return empty
+
+    if cache:
+        try:
+            cache.put_many([texts[i] for i in missing], new_embeddings)
+        except Exception as e:
+            logging.error(f"Failed to update embedding cache: {e}")
 
+    if embeddings is None:
+        return new_embeddings
+    if embeddings.shape[1] != new_embeddings.shape[1]:
+        logging.error(f"EMBEDDING_DIM {embeddings.shape[1]} does not match model dimension {new_embeddings.shape[1]}")
+        return empty
+    embeddings[missing] = new_embeddings
     return embeddings
 
 def get_tokenization(texts: Union[str, List[str]], batch_size: int = 100) -> List[List[str]]:
@@ -99,12 +172,12 @@ def get_tokenization(texts: Union[str, List[str]], batch_size: int = 100) -> Lis
 
     return all_tokens
 
-def get_tokenization_and_embeddings(texts: Union[str, List[str]]) -> Tuple[List[List[str]], List[float]]:
+def get_tokenization_and_embeddings(texts: Union[str, List[str]]) -> Tuple[List[List[str]], np.ndarray]:
     """
     Get both tokenization and embeddings for a given text or a list of texts.
 
     :param texts: A single string or a list of strings.
-    :return: A tuple containing a list of lists of strings (tokens) and a list of floats (embeddings).
+    :return: A tuple containing a list of lists of strings (tokens) and a float32 array of embeddings.
     """
     tokenized_texts = get_tokenization(texts)
     embeddings = get_embeddings(texts)
@@ -174,3 +247,30 @@ def generate_text(prompt: str, max_tokens: int = 150, temperature: float = 0.7)
     except Exception as e:
         logging.error(f"Error generating text: {e}")
         return ""
+
+
+def generate_text_stream(prompt: str, max_tokens: int = 150, temperature: float = 0.7,
+                         model_id: str = "meta/llama3-8b-v1") -> Iterator[str]:
+    """
+    Generate text with the streaming endpoint, yielding the text as the model produces it.
+
+    :param prompt: The prompt.
+    :param max_tokens: The maximum number of new tokens.
+    :param temperature: The sampling temperature.
+    :param model_id: The model to generate with.
+    :return: An iterator over the generated text fragments.
+    """
+    client = _get_client()
+    try:
+        for response in client.text.generation.create_stream(
+            model_id=model_id,
+            input=prompt,
+            parameters=TextGenerationParameters(max_new_tokens=max_tokens, temperature=temperature),
+        ):
+            # Moderation events arrive as responses without results
+            for result in response.results or []:
+                if result.generated_text:
+                    yield result.generated_text
+    except Exception as e:
+        logging.error(f"Error streaming generated text: {e}")
+        raise
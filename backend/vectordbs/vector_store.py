@@ -1,12 +1,51 @@
+import asyncio
+import functools
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
 
-from .data_types import (Document, DocumentMetadataFilter, QueryResult,
-                         QueryWithEmbedding)
+from backend.core.config import settings
+
+from .data_types import (Document, MetadataFilter, QueryResult,
+                         QueryWithEmbedding, VectorStoreQueryMode)
+from .utils.fusion import (flatten_results, reciprocal_rank_fusion,
+                           weighted_score_fusion)
+from .utils.sparse_index import get_sparse_index
+
+# Shared by all stores that have no native async client, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.vector_store_async_workers,
+                                           thread_name_prefix="vector-store")
+    return _executor
 
 
 class VectorStore(ABC):
-    """Abstract base class for vector stores."""
+    """Abstract base class for vector stores.
+
+    Every operation has an async counterpart. By default the async methods run
+    the blocking implementation on a shared thread pool, so concurrent requests
+    do not block the event loop or each other. Stores with a native async
+    client override them.
+
+    search() adds lexical and hybrid retrieval on top of retrieve_documents.
+    Stores with native full-text search override sparse_retrieve; the others
+    use a local BM25 index that they keep up to date in add_documents.
+
+    Stores whose backend caps the number of hits per query set
+    max_query_results, and the Retriever never asks them for more.
+    """
+
+    # Largest number_of_results the backend accepts in one query, None if it has no limit
+    max_query_results: Optional[int] = None
 
     @abstractmethod
     def create_collection(self, collection_name: str, metadata: Optional[dict] = None):
@@ -19,13 +58,17 @@ class VectorStore(ABC):
         pass
 
     @abstractmethod
-    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10) -> List[QueryResult]:
+    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10,
+                           output_fields: Optional[List[str]] = None,
+                           include_vectors: bool = False) -> List[QueryResult]:
         """Retrieves documents based on a query or query embedding.
 
         Args:
             query: Either a text string or a QueryWithEmbedding object.
             collection_name: Optional name of the collection.
             limit: Number of top results to return. (Default: 10)
+            output_fields: Metadata fields to return for each hit. None returns all of them.
+            include_vectors: Whether to return the stored embedding of each hit. (Default: False)
 
         Returns:
             A list of QueryResult objects containing the retrieved documents and their scores.
@@ -33,7 +76,10 @@ class VectorStore(ABC):
         pass
 
     @abstractmethod
-    def query(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10, filter: Optional[DocumentMetadataFilter] = None) -> List[QueryResult]:
+    def query(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10,
+              filter: Optional[MetadataFilter] = None,
+              output_fields: Optional[List[str]] = None,
+              include_vectors: bool = False) -> List[QueryResult]:
         """Queries the vector store with filtering and query mode options.
 
         Args:
@@ -41,12 +87,43 @@ class VectorStore(ABC):
             collection_name: Optional name of the collection.
             number_of_results: Number of top results to return. (Default: 10)
             filter: Optional metadata filter to apply to the search.
+            output_fields: Metadata fields to return for each hit. None returns all of them.
+            include_vectors: Whether to return the stored embedding of each hit. (Default: False)
 
         Returns:
             A list of QueryResult objects containing the retrieved documents and their scores.
         """
         pass
 
+    def query_batch(self, collection_name: str, queries: List[QueryWithEmbedding], number_of_results: int = 10,
+                    filter: Optional[MetadataFilter] = None,
+                    output_fields: Optional[List[str]] = None,
+                    include_vectors: bool = False) -> List[List[QueryResult]]:
+        """Queries the vector store with several embeddings at once.
+
+        Stores whose search API accepts several vectors override this to send a
+        single request. The default implementation runs the queries concurrently
+        on the shared thread pool, so do not call it from a task already running
+        on that pool; use query_batch_async instead.
+
+        Args:
+            collection_name: Name of the collection.
+            queries: The query embeddings.
+            number_of_results: Number of top results to return per query. (Default: 10)
+            filter: Optional metadata filter applied to every query.
+            output_fields: Metadata fields to return for each hit. None returns all of them.
+            include_vectors: Whether to return the stored embedding of each hit. (Default: False)
+
+        Returns:
+            One list of QueryResult objects per query, in the order of the queries,
+            each shaped like the result of query().
+        """
+        futures = [_get_executor().submit(self.query, collection_name, query, number_of_results=number_of_results,
+                                          filter=filter, output_fields=output_fields,
+                                          include_vectors=include_vectors)
+                   for query in queries]
+        return [future.result() for future in futures]
+
     @abstractmethod
     def delete_collection(self, collection_name: str):
         """Deletes a collection from the vector store."""
@@ -56,3 +133,164 @@ class VectorStore(ABC):
     def delete_documents(self, collection_name: str, document_ids: List[str]):
         """Deletes documents by their IDs from the vector store."""
         pass
+
+    def flush(self, collection_name: str) -> None:
+        """Writes any buffered documents and makes them visible to queries.
+
+        Stores that write through on every add_documents call need not override this.
+        Callers should invoke it once at the end of an ingestion job.
+        """
+        pass
+
+    @contextmanager
+    def bulk_load(self, collection_name: str) -> Iterator[None]:
+        """Wraps an ingestion job writing many documents to a collection.
+
+        Stores may tune the collection for bulk writes while the context is open,
+        and must undo it on exit, even if the job fails. Contexts may be nested or
+        opened by concurrent jobs. The default does nothing.
+
+        Args:
+            collection_name: Name of the collection being loaded.
+        """
+        yield
+
+    async def close_async(self) -> None:
+        """Closes clients bound to the running event loop. The default does nothing."""
+        pass
+
+    def sparse_retrieve(self, query: str, collection_name: str, limit: int = 10,
+                        output_fields: Optional[List[str]] = None) -> List[QueryResult]:
+        """Retrieves documents by lexical (BM25) relevance.
+
+        The default implementation searches the collection's local sparse index.
+
+        Args:
+            query: The query text.
+            collection_name: Name of the collection.
+            limit: Number of top results to return. (Default: 10)
+            output_fields: Metadata fields to return for each hit. Stores may return more.
+
+        Returns:
+            A list of QueryResult objects containing the retrieved documents and their BM25 scores.
+        """
+        chunks = get_sparse_index(collection_name).search(query, limit)
+        return [QueryResult(data=chunks, similarities=[chunk.score for chunk in chunks],
+                            ids=[chunk.chunk_id for chunk in chunks])]
+
+    def search(self, query: str, collection_name: str, limit: int = 10,
+               mode: VectorStoreQueryMode = VectorStoreQueryMode.DEFAULT,
+               output_fields: Optional[List[str]] = None) -> List[QueryResult]:
+        """Retrieves documents with dense, sparse or hybrid retrieval.
+
+        In hybrid mode the dense search runs on the shared thread pool while the
+        sparse search runs on the calling thread, and the two are fused. Do not
+        call this from a task already running on that pool; use search_async instead.
+
+        Args:
+            query: The query text.
+            collection_name: Name of the collection.
+            limit: Number of top results to return. (Default: 10)
+            mode: DEFAULT for dense, SPARSE for BM25 or HYBRID for both.
+            output_fields: Metadata fields to return for each hit.
+
+        Returns:
+            A list of QueryResult objects containing the retrieved documents and their scores.
+        """
+        if mode == VectorStoreQueryMode.SPARSE:
+            return self.sparse_retrieve(query, collection_name, limit=limit, output_fields=output_fields)
+        if mode != VectorStoreQueryMode.HYBRID:
+            return self.retrieve_documents(query, collection_name, limit=limit, output_fields=output_fields)
+
+        candidates = max(limit, settings.hybrid_candidates)
+        dense = _get_executor().submit(self.retrieve_documents, query, collection_name, limit=candidates,
+                                       output_fields=output_fields)
+        sparse = self.sparse_retrieve(query, collection_name, limit=candidates, output_fields=output_fields)
+        return self._fuse(dense.result(), sparse, limit)
+
+    async def search_async(self, query: str, collection_name: str, limit: int = 10,
+                           mode: VectorStoreQueryMode = VectorStoreQueryMode.DEFAULT,
+                           output_fields: Optional[List[str]] = None) -> List[QueryResult]:
+        """Async version of search. In hybrid mode both retrievals run concurrently."""
+        if mode == VectorStoreQueryMode.SPARSE:
+            return await self.sparse_retrieve_async(query, collection_name, limit=limit, output_fields=output_fields)
+        if mode != VectorStoreQueryMode.HYBRID:
+            return await self.retrieve_documents_async(query, collection_name, limit=limit,
+                                                       output_fields=output_fields)
+
+        candidates = max(limit, settings.hybrid_candidates)
+        dense, sparse = await asyncio.gather(
+            self.retrieve_documents_async(query, collection_name, limit=candidates, output_fields=output_fields),
+            self.sparse_retrieve_async(query, collection_name, limit=candidates, output_fields=output_fields),
+        )
+        return self._fuse(dense, sparse, limit)
+
+    @staticmethod
+    def _fuse(dense: List[QueryResult], sparse: List[QueryResult], limit: int) -> List[QueryResult]:
+        """Fuse dense and sparse results with the configured HYBRID_FUSION method."""
+        ranked_lists = [flatten_results(dense), flatten_results(sparse)]
+        weights = [settings.hybrid_dense_weight, 1 - settings.hybrid_dense_weight]
+        if settings.hybrid_fusion == "weighted":
+            chunks = weighted_score_fusion(ranked_lists, weights=weights, limit=limit)
+        else:
+            chunks = reciprocal_rank_fusion(ranked_lists, k=settings.hybrid_rrf_k, weights=weights, limit=limit)
+        return [QueryResult(data=chunks, similarities=[chunk.score for chunk in chunks],
+                            ids=[chunk.chunk_id for chunk in chunks])]
+
+    async def add_documents_async(self, collection_name: str, documents: List[Document]):
+        """Async version of add_documents."""
+        return await self._run_sync(self.add_documents, collection_name=collection_name, documents=documents)
+
+    async def retrieve_documents_async(self, query: str, collection_name: str, limit: int = 10,
+                                       output_fields: Optional[List[str]] = None,
+                                       include_vectors: bool = False) -> List[QueryResult]:
+        """Async version of retrieve_documents."""
+        return await self._run_sync(self.retrieve_documents, query=query, collection_name=collection_name,
+                                    limit=limit, output_fields=output_fields, include_vectors=include_vectors)
+
+    async def query_async(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10,
+                          filter: Optional[MetadataFilter] = None,
+                          output_fields: Optional[List[str]] = None,
+                          include_vectors: bool = False) -> List[QueryResult]:
+        """Async version of query."""
+        return await self._run_sync(self.query, collection_name=collection_name, query=query,
+                                    number_of_results=number_of_results, filter=filter,
+                                    output_fields=output_fields, include_vectors=include_vectors)
+
+    async def query_batch_async(self, collection_name: str, queries: List[QueryWithEmbedding],
+                                number_of_results: int = 10,
+                                filter: Optional[MetadataFilter] = None,
+                                output_fields: Optional[List[str]] = None,
+                                include_vectors: bool = False) -> List[List[QueryResult]]:
+        """Async version of query_batch."""
+        if type(self).query_batch is not VectorStore.query_batch:
+            # Native batch search: one request for all queries
+            return await self._run_sync(self.query_batch, collection_name=collection_name, queries=queries,
+                                        number_of_results=number_of_results, filter=filter,
+                                        output_fields=output_fields, include_vectors=include_vectors)
+        return list(await asyncio.gather(*[
+            self.query_async(collection_name, query, number_of_results=number_of_results, filter=filter,
+                             output_fields=output_fields, include_vectors=include_vectors)
+            for query in queries
+        ]))
+
+    async def sparse_retrieve_async(self, query: str, collection_name: str, limit: int = 10,
+                                    output_fields: Optional[List[str]] = None) -> List[QueryResult]:
+        """Async version of sparse_retrieve."""
+        return await self._run_sync(self.sparse_retrieve, query=query, collection_name=collection_name,
+                                    limit=limit, output_fields=output_fields)
+
+    async def delete_collection_async(self, collection_name: str):
+        """Async version of delete_collection."""
+        return await self._run_sync(self.delete_collection, collection_name)
+
+    async def delete_documents_async(self, collection_name: str, document_ids: List[str]):
+        """Async version of delete_documents."""
+        return await self._run_sync(self.delete_documents, collection_name=collection_name,
+                                    document_ids=document_ids)
+
+    @staticmethod
+    async def _run_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking store call on the shared thread pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
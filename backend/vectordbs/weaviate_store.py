@@ -10,16 +10,20 @@ from weaviate.exceptions import WeaviateConnectionError
 from weaviate.util import generate_uuid5
 
 from backend.core.config import settings
+from backend.vectordbs.utils.filters import to_weaviate_filter
 from backend.vectordbs.utils.watsonx import get_embeddings
 
 from .data_types import (Document, DocumentChunk, DocumentChunkMetadata,
-                         DocumentChunkWithScore, DocumentMetadataFilter,
-                         QueryResult, QueryWithEmbedding, Source)
+                         DocumentChunkWithScore, MetadataFilter,
+                         QueryResult, QueryWithEmbedding, Source,
+                         vector_to_list)
 from .error_types import CollectionError
 from .vector_store import VectorStore  # Ensure this import is correct
 
 
 class WeaviateDataStore(VectorStore):
+    # The default QUERY_MAXIMUM_RESULTS of a Weaviate server
+    max_query_results = 10000
 
     def __init__(self) -> None:
         auth_credentials = self._build_auth_credentials()
@@ -104,7 +108,7 @@ class WeaviateDataStore(VectorStore):
                                 "author": doc_chunk.metadata.author if doc_chunk.metadata and doc_chunk.metadata.author else None,
                             },
                             uuid=doc_uuid,
-                            vector=doc_chunk.vectors,
+                            vector=vector_to_list(doc_chunk.vectors),
                         )
                     )
 
@@ -143,26 +147,56 @@ class WeaviateDataStore(VectorStore):
                 logging.error(f"Failed to create index {collection_name}: {e}")
                 raise CollectionError(f"Failed to create collection '{collection_name}': {e}")
 
-    def delete_collection_async(self, collection_name: str) -> None:
+    def delete_collection(self, collection_name: str) -> None:
         if self.client and self.client.collections:
             self.client.collections.delete(collection_name)
         else:
             logging.error(f"Collection {collection_name} does not exist")
 
     def query(self, collection_name: str, query: QueryWithEmbedding, number_of_results: int = 10,
-              filter: Optional[DocumentMetadataFilter] = None) -> List[QueryResult]:
+              filter: Optional[MetadataFilter] = None,
+              output_fields: Optional[List[str]] = None,
+              include_vectors: bool = False) -> List[QueryResult]:
 
+        return_properties = None
+        if output_fields is not None:
+            return_properties = list(dict.fromkeys(["chunk_id", "document_id", "text", "source", *output_fields]))
         result = self.client.collections.get(collection_name).query.near_vector(
-            near_vector=query.vectors, limit=number_of_results)
+            near_vector=vector_to_list(query.vectors), limit=number_of_results,
+            filters=to_weaviate_filter(filter), return_properties=return_properties, include_vector=include_vectors,
+            return_metadata=wvc.query.MetadataQuery(distance=True))
 
+        # The collections use cosine distance, so 1 - distance is the cosine similarity
+        return self._process_search_results(
+            result.objects, [1.0 - obj.metadata.distance if obj.metadata.distance is not None else 0.0
+                             for obj in result.objects])
+
+    def sparse_retrieve(self, query: str, collection_name: str, limit: int = 10,
+                        output_fields: Optional[List[str]] = None) -> List[QueryResult]:
+        """Retrieve documents with Weaviate's native BM25 search."""
+        if not self.client.collections.exists(collection_name):
+            raise CollectionError(f"Collection '{collection_name}' does not exist")
+
+        return_properties = None
+        if output_fields is not None:
+            return_properties = list(dict.fromkeys(["chunk_id", "document_id", "text", "source", *output_fields]))
+        result = self.client.collections.get(collection_name).query.bm25(
+            query=query, limit=limit, return_properties=return_properties,
+            return_metadata=wvc.query.MetadataQuery(score=True))
+        return self._process_search_results(
+            result.objects, [obj.metadata.score or 0.0 for obj in result.objects])
+
+    def _process_search_results(self, objects: List[Any], scores: List[float]) -> List[QueryResult]:
         query_results: List[QueryResult] = []
-        response_objects = result.objects
 
-        for obj in response_objects:
+        for obj, score in zip(objects, scores):
             properties = obj.properties
+            # Newer clients return named vectors, keyed "default" for single-vector collections
+            vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
             document_chunk_with_score = DocumentChunkWithScore(
                 chunk_id=properties["chunk_id"],
                 text=properties["text"],
+                vectors=vector or None,
                 metadata=DocumentChunkMetadata(
                     source=Source(properties["source"]),
                     source_id=(properties["source_id"] if "source_id" in properties else ""),
@@ -170,12 +204,14 @@ class WeaviateDataStore(VectorStore):
                     created_at=(properties["created_at"] if "created_at" in properties else ""),
                     author=properties["author"] if "author" in properties else "",
                 ),
+                document_id=properties.get("document_id"),
+                score=score,
             )
 
             # prepare QueryResult object to return
             query_result = QueryResult(
                 data=[document_chunk_with_score],
-                similarities=[obj.vector if obj.vector else 0.0],
+                similarities=[score],
                 ids=[properties["chunk_id"]],
             )
             query_results.append(query_result)
@@ -203,13 +239,18 @@ class WeaviateDataStore(VectorStore):
             logging.error(f"Failed to delete documents from Weaviate index '{collection_name}': {e}")
             raise CollectionError(f"Failed to delete documents from Weaviate index '{collection_name}': {e}")
 
-    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10) -> List[QueryResult]:
+    def retrieve_documents(self, query: str, collection_name: str, limit: int = 10,
+                           output_fields: Optional[List[str]] = None,
+                           include_vectors: bool = False) -> List[QueryResult]:
         if not self.client.collections.exists(collection_name):
             raise CollectionError(f"Collection '{collection_name}' does not exist")
 
         # Assuming you have some method to generate embeddings from text
         embeddings = get_embeddings(query)
+        if len(embeddings) == 0:
+            raise CollectionError("Failed to generate embeddings for the query string.")
         query_with_embedding = QueryWithEmbedding(
-            text=query, vectors=embeddings)
+            text=query, vectors=embeddings[0])
         logging.debug(f"Query with embedding: {query_with_embedding}")
-        return self.query(collection_name, query_with_embedding, number_of_results=limit)
+        return self.query(collection_name, query_with_embedding, number_of_results=limit,
+                          output_fields=output_fields, include_vectors=include_vectors)
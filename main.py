@@ -20,6 +20,7 @@ from backend.rag_solution.router.user_collection_router import router as user_co
 from backend.rag_solution.router.user_team_router import router as user_team_router
 from backend.rag_solution.router.health_router import router as health_router
 from backend.rag_solution.router.auth_router import router as auth_router
+from backend.rag_solution.router.pipeline_router import close_vector_store, router as pipeline_router
 from backend.auth.oidc import get_current_user, oauth
 
 logging.basicConfig(level=settings.log_level)
@@ -54,6 +55,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await close_vector_store()
+
 app = FastAPI(
     lifespan=lifespan,
     title="RAG Modulo API",
@@ -105,6 +108,7 @@ app.include_router(team_router, dependencies=[Depends(auth_dependency)])
 app.include_router(user_router, dependencies=[Depends(auth_dependency)])
 app.include_router(user_collection_router, dependencies=[Depends(auth_dependency)])
 app.include_router(user_team_router, dependencies=[Depends(auth_dependency)])
+app.include_router(pipeline_router, dependencies=[Depends(auth_dependency)])
 
 
 def custom_openapi():
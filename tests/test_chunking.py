@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from backend.rag_solution.data_ingestion import chunking
+from backend.rag_solution.data_ingestion.chunking import (
+    calculate_cosine_distances, semantic_chunking, simple_chunking,
+    split_sentences, token_based_chunking)
+from backend.rag_solution.data_ingestion.tokenization import RegexTokenizer
+
+TEXT = "A b c. D e f. G h i. J k l."  # Four sentences of four tokens each
+
+
+def test_split_sentences():
+    assert split_sentences("One. Two? Three! Four") == ["One.", "Two?", "Three!", "Four"]
+
+
+def test_simple_chunking():
+    assert simple_chunking("abcdefghij", 2, 4, 0) == ["abcd", "efgh", "ij"]
+    assert simple_chunking("abcdefghij", 2, 4, 2) == ["abcd", "cdef", "efgh", "ghij", "ij"]
+    # A too short last chunk is appended to the previous one
+    assert simple_chunking("abcdefghij", 3, 4, 0) == ["abcd", "efghij"]
+    assert simple_chunking("ab", 3, 4, 0) == ["ab"]
+    assert simple_chunking("", 1, 4, 0) == []
+
+
+def test_simple_chunking_rejects_inverted_sizes():
+    with pytest.raises(ValueError):
+        simple_chunking("abc", 5, 4, 0)
+
+
+def test_token_based_chunking_packs_whole_sentences():
+    tokenizer = RegexTokenizer()
+    assert token_based_chunking(TEXT, max_tokens=8, overlap=0, tokenizer=tokenizer) == [
+        "A b c. D e f.", "G h i. J k l."]
+    assert token_based_chunking(TEXT, max_tokens=100, overlap=0, tokenizer=tokenizer) == [TEXT]
+    assert token_based_chunking("", max_tokens=8, overlap=0, tokenizer=tokenizer) == []
+
+
+def test_token_based_chunking_overlaps_trailing_sentences():
+    chunks = token_based_chunking(TEXT, max_tokens=8, overlap=4, tokenizer=RegexTokenizer())
+    assert chunks == ["A b c. D e f.", "D e f. G h i.", "G h i. J k l."]
+
+
+def test_token_based_chunking_keeps_long_sentences_whole():
+    chunks = token_based_chunking(TEXT, max_tokens=3, overlap=2, tokenizer=RegexTokenizer())
+    assert chunks == ["A b c.", "D e f.", "G h i.", "J k l."]
+
+
+def test_token_based_chunking_respects_budget():
+    tokenizer = RegexTokenizer()
+    text = " ".join(f"Sentence {'word ' * (i % 7)}{i}." for i in range(200))
+    chunks = token_based_chunking(text, max_tokens=30, overlap=10, tokenizer=tokenizer)
+    assert all(count <= 30 for count in tokenizer.count_tokens(chunks))
+    # Every sentence is kept, in order
+    sentences = split_sentences(text)
+    assert split_sentences(chunks[0])[0] == sentences[0]
+    assert split_sentences(chunks[-1])[-1] == sentences[-1]
+    seen = [sentence for chunk in chunks for sentence in split_sentences(chunk)]
+    assert list(dict.fromkeys(seen)) == sentences
+
+
+def test_calculate_cosine_distances():
+    embeddings = np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0], [0.0, 0.0]])
+    assert calculate_cosine_distances(embeddings) == pytest.approx([1.0, 1 - 1 / np.sqrt(2), 1.0], abs=1e-6)
+    assert calculate_cosine_distances(embeddings[:1]).shape == (0,)
+
+
+def test_calculate_cosine_distances_matches_pairwise_loop():
+    embeddings = np.random.default_rng(0).standard_normal((50, 16))
+    expected = [1 - a @ b / (np.linalg.norm(a) * np.linalg.norm(b)) for a, b in zip(embeddings, embeddings[1:])]
+    assert calculate_cosine_distances(embeddings) == pytest.approx(expected, abs=1e-5)
+
+
+def test_semantic_chunking_splits_at_distant_sentences(monkeypatch):
+    text = "Cats purr. Cats meow. Stocks fell."
+    topics = {"Cats": [1.0, 0.0], "Stocks": [0.0, 1.0]}
+
+    def get_embeddings(texts):
+        # Each combined sentence window gets the topic of its middle sentence
+        middles = split_sentences(text)
+        return np.array([topics[middle.split()[0]] for middle, _ in zip(middles, texts)])
+
+    monkeypatch.setattr(chunking, "get_embeddings", get_embeddings)
+    assert semantic_chunking(text, min_chunk_size=1, max_chunk_size=100) == ["Cats purr. Cats meow.", "Stocks fell."]
+    assert semantic_chunking(text, min_chunk_size=15, max_chunk_size=100) == ["Cats purr. Cats meow."]
+
+
+def test_semantic_chunking_keeps_single_sentences_without_embedding(monkeypatch):
+    monkeypatch.setattr(chunking, "get_embeddings", lambda texts: 1 / 0)
+    assert semantic_chunking("Just one sentence.", min_chunk_size=1, max_chunk_size=100) == ["Just one sentence."]
+    assert semantic_chunking("Just one sentence.", min_chunk_size=1, max_chunk_size=5) == []
+
+
+def test_semantic_chunking_falls_back_when_embedding_fails(monkeypatch):
+    monkeypatch.setattr(chunking, "get_embeddings", lambda texts: np.empty((0, 2), dtype=np.float32))
+    text = "First sentence here. Second sentence here. Third sentence here."
+    chunks = semantic_chunking(text, min_chunk_size=10, max_chunk_size=30)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 30 for chunk in chunks[:-1])
@@ -0,0 +1,90 @@
+import pytest
+
+from backend.rag_solution.data_ingestion.tokenization import RegexTokenizer
+from backend.rag_solution.generation.context_builder import (
+    ContextBuilder, suffix_prefix_overlap)
+from backend.vectordbs.data_types import DocumentChunkWithScore
+
+TEMPLATE = "{context}\nQ: {question}"
+
+
+def chunk(chunk_id, text, score, document_id="doc"):
+    return DocumentChunkWithScore(chunk_id=chunk_id, text=text, score=score, document_id=document_id)
+
+
+@pytest.fixture
+def chunks():
+    return [
+        chunk("2", "gamma delta epsilon zeta", 0.2),
+        chunk("1", "alpha beta gamma delta", 0.9),
+        chunk("3", "other words here", 0.5, document_id="other"),
+    ]
+
+
+def builder(token_budget):
+    return ContextBuilder(token_budget=token_budget, tokenizer=RegexTokenizer(), template=TEMPLATE, min_overlap=5)
+
+
+def test_suffix_prefix_overlap():
+    assert suffix_prefix_overlap("hello world", "world peace", 3) == 5
+    assert suffix_prefix_overlap("hello world", "world peace", 6) == 0
+    assert suffix_prefix_overlap("hello world", "peace", 3) == 0
+    # The longest overlap wins
+    assert suffix_prefix_overlap("xabab", "ababc", 2) == 4
+
+
+def test_deduplicate_drops_repeated_and_contained_chunks():
+    kept = ContextBuilder.deduplicate([
+        chunk("a", "beta", 0.5),
+        chunk("b", "alpha beta gamma", 0.9),
+        chunk("b", "something else", 0.1),
+        chunk("c", "  ", 0.8),
+        chunk("d", "delta", 0.3),
+    ])
+    assert [kept_chunk.chunk_id for kept_chunk in kept] == ["b", "d"]
+
+
+def test_merge_joins_continuing_chunks_of_a_document(chunks):
+    passages = builder(100).merge(chunks)
+    merged, other = sorted(passages, key=lambda passage: passage.document_id)
+    assert merged.text == "alpha beta gamma delta epsilon zeta"
+    assert [merged_chunk.chunk_id for merged_chunk in merged.chunks] == ["1", "2"]
+    assert merged.overlaps == [0, len("gamma delta")]
+    assert merged.score == 0.9
+    assert other.text == "other words here"
+
+
+def test_merge_keeps_chunks_without_document_apart():
+    passages = builder(100).merge([chunk("1", "alpha beta gamma delta", 0.9, document_id=None),
+                                   chunk("2", "gamma delta epsilon zeta", 0.2, document_id=None)])
+    assert [passage.text for passage in passages] == ["alpha beta gamma delta", "gamma delta epsilon zeta"]
+
+
+def test_build_packs_best_passages_first(chunks):
+    tokenizer = RegexTokenizer()
+    context = builder(12).build("why", chunks)
+    assert context.prompt == "alpha beta gamma delta epsilon zeta\n\nother words here\nQ: why"
+    assert context.tokens == tokenizer.count_tokens([context.prompt])[0] == 12
+    assert [context_chunk.chunk_id for context_chunk in context.chunks] == ["1", "2", "3"]
+
+    context = builder(10).build("why", chunks)
+    assert context.prompt == "alpha beta gamma delta epsilon zeta\nQ: why"
+    assert context.tokens == 9
+
+
+def test_build_shrinks_merged_passages_from_the_lower_scored_end(chunks):
+    context = builder(8).build("why", chunks)
+    assert context.prompt == "alpha beta gamma delta\nQ: why"
+    assert [context_chunk.chunk_id for context_chunk in context.chunks] == ["1"]
+
+
+def test_build_truncates_the_best_passage_when_nothing_fits(chunks):
+    context = builder(5).build("why", chunks)
+    assert context.prompt == "alpha beta\nQ: why"
+    assert context.tokens <= 5
+
+
+def test_build_without_chunks():
+    context = builder(10).build("why", [])
+    assert context.prompt == "\nQ: why"
+    assert context.passages == []
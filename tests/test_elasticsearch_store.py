@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from backend.vectordbs import elasticsearch_store
+from backend.vectordbs.data_types import QueryWithEmbedding
+from backend.vectordbs.elasticsearch_store import ElasticSearchStore
+
+INDEX = "docs"
+
+
+def refresh_interval(value):
+    return {"index": {"refresh_interval": value}}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(elasticsearch_store, "Elasticsearch", MagicMock())
+    return ElasticSearchStore(host="localhost", port=9200)
+
+
+def with_refresh_interval(store, value):
+    index_settings = {"refresh_interval": value} if value is not None else {}
+    store.client.indices.get_settings.return_value = {INDEX: {"settings": {"index": index_settings}}}
+
+
+def test_nested_bulk_loads_restore_the_refresh_interval_once(store):
+    with_refresh_interval(store, "5s")
+    with store.bulk_load(INDEX):
+        with store.bulk_load(INDEX):
+            pass
+        # The outer load is still open
+        assert store.client.indices.put_settings.call_args_list == [
+            call(index=INDEX, settings=refresh_interval("-1"))]
+    assert store.client.indices.put_settings.call_args_list == [
+        call(index=INDEX, settings=refresh_interval("-1")),
+        call(index=INDEX, settings=refresh_interval("5s")),
+    ]
+    assert store.client.indices.get_settings.call_count == 1
+
+
+def test_bulk_load_restores_the_refresh_interval_when_loading_fails(store):
+    with_refresh_interval(store, None)
+    with pytest.raises(RuntimeError):
+        with store.bulk_load(INDEX):
+            raise RuntimeError("bulk request failed")
+    # An index without an explicit value goes back to the cluster default
+    assert store.client.indices.put_settings.call_args_list[-1] == call(index=INDEX, settings=refresh_interval(None))
+    assert store._bulk_loads == {}
+
+
+def test_bulk_load_leaves_an_interval_it_did_not_set(store):
+    # Another process is loading the index and will restore it
+    with_refresh_interval(store, "-1")
+    with store.bulk_load(INDEX):
+        pass
+    store.client.indices.put_settings.assert_not_called()
+
+
+def test_bulk_loads_of_different_indexes_are_independent(store):
+    with_refresh_interval(store, "1s")
+    with store.bulk_load(INDEX):
+        with store.bulk_load("other"):
+            pass
+        assert store._bulk_loads == {INDEX: 1}
+    assert store._bulk_loads == {}
+
+
+@pytest.mark.parametrize("number_of_results, k, num_candidates", [
+    (5, 5, 100),
+    (10, 10, 100),
+    (100, 100, 1000),
+    (300, 300, 3000),
+    (5000, 5000, 10000),
+    (20000, 10000, 10000),
+])
+def test_knn_candidates_grow_with_k(store, number_of_results, k, num_candidates):
+    store.client.search.return_value = {"hits": {"hits": []}}
+    store.query(INDEX, QueryWithEmbedding(text="query", vectors=[0.1, 0.2]), number_of_results=number_of_results)
+    body = store.client.search.call_args.kwargs["body"]
+    assert (body["size"], body["query"]["knn"]["k"], body["query"]["knn"]["num_candidates"]) == (
+        k, k, num_candidates)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from backend.core.custom_exceptions import DocumentProcessingError
+from backend.rag_solution.data_ingestion import embedding_batcher
+from backend.rag_solution.data_ingestion.embedding_batcher import \
+    EmbeddingBatcher
+from backend.vectordbs.data_types import DocumentChunk
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Record the texts of every embedding request; each text embeds to [len(text), index in its request]."""
+    sent = []
+
+    def get_embeddings(texts):
+        sent.append(list(texts))
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+    monkeypatch.setattr(embedding_batcher, "get_embeddings", get_embeddings)
+    return sent
+
+
+def chunks(*lengths):
+    return [DocumentChunk(chunk_id=str(i), text="x" * length) for i, length in enumerate(lengths)]
+
+
+def test_estimate_tokens():
+    assert EmbeddingBatcher.estimate_tokens("") == 1
+    assert EmbeddingBatcher.estimate_tokens("x" * 40) == 11
+
+
+def test_batches_respect_the_batch_size(requests):
+    embedded = EmbeddingBatcher(batch_size=2, max_batch_tokens=1000).embed_chunks(chunks(1, 2, 3, 4, 5))
+    assert [len(batch) for batch in requests] == [2, 2, 1]
+    assert [chunk.chunk_id for chunk in embedded] == ["0", "1", "2", "3", "4"]
+
+
+def test_batches_respect_the_token_budget(requests):
+    # 40 characters estimate to 11 tokens, so at most two fit in 25 tokens
+    EmbeddingBatcher(batch_size=100, max_batch_tokens=25).embed_chunks(chunks(40, 40, 40, 4))
+    assert [[len(text) for text in batch] for batch in requests] == [[40, 40], [40, 4]]
+
+
+def test_oversized_chunk_is_sent_alone(requests):
+    EmbeddingBatcher(batch_size=100, max_batch_tokens=10).embed_chunks(chunks(4, 400, 4))
+    assert [[len(text) for text in batch] for batch in requests] == [[4], [400], [4]]
+
+
+def test_vectors_are_assigned_in_order(requests):
+    embedded = EmbeddingBatcher(batch_size=2, max_batch_tokens=1000).embed_chunks(chunks(1, 2, 3))
+    assert [chunk.vectors.tolist() for chunk in embedded] == [[1, 0], [2, 1], [3, 0]]
+
+
+def test_missing_vectors_raise(monkeypatch):
+    monkeypatch.setattr(embedding_batcher, "get_embeddings", lambda texts: np.zeros((len(texts) - 1, 2)))
+    with pytest.raises(DocumentProcessingError):
+        EmbeddingBatcher(batch_size=10, max_batch_tokens=1000).embed_chunks(chunks(1, 2))
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from backend.vectordbs.utils.embedding_cache import (EmbeddingCache,
+                                                     normalize_text)
+
+MODEL = "test/model"
+DIM = 4
+
+
+def vector(value):
+    return np.full(DIM, value, dtype=np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path), MODEL, DIM, max_entries=3)
+
+
+def test_normalize_text():
+    assert normalize_text("  aé \n\t b ") == "aé b"
+    assert normalize_text("Case") != normalize_text("case")
+
+
+def test_get_many_returns_hits_and_missing_indices(cache):
+    cache.put_many(["a", "b"], np.stack([vector(1), vector(2)]))
+    matrix, missing = cache.get_many(["b", "c", " a ", "b"])
+    assert missing == [1]
+    assert np.array_equal(matrix, np.stack([vector(2), vector(0), vector(1), vector(2)]))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 1, 2)
+
+
+def test_put_many_skips_cached_and_repeated_texts(cache):
+    cache.put_many(["a", "a"], np.stack([vector(1), vector(9)]))
+    cache.put_many(["a"], np.stack([vector(5)]))
+    matrix, missing = cache.get_many(["a"])
+    assert missing == [] and np.array_equal(matrix[0], vector(1))
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put_many(["a", "b", "c"], np.stack([vector(1), vector(2), vector(3)]))
+    cache.get_many(["a"])
+    cache.put_many(["d"], np.stack([vector(4)]))
+
+    matrix, missing = cache.get_many(["a", "b", "c", "d"])
+    assert missing == [1]
+    assert np.array_equal(matrix[[0, 2, 3]], np.stack([vector(1), vector(3), vector(4)]))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_persists_and_keeps_its_capacity(tmp_path, cache):
+    cache.put_many(["a", "b", "c"], np.stack([vector(1), vector(2), vector(3)]))
+    reopened = EmbeddingCache(str(tmp_path), MODEL, DIM, max_entries=2)
+    assert reopened.max_entries == 3
+    matrix, missing = reopened.get_many(["a", "b", "c"])
+    assert missing == [] and np.array_equal(matrix[2], vector(3))
+
+    grown = EmbeddingCache(str(tmp_path), MODEL, DIM, max_entries=5)
+    grown.put_many(["d", "e"], np.stack([vector(4), vector(5)]))
+    assert grown.stats()["evictions"] == 0
+    # Other instances remap the grown vector file
+    matrix, missing = reopened.get_many(["a", "e"])
+    assert missing == [] and np.array_equal(matrix, np.stack([vector(1), vector(5)]))
+
+
+def test_concurrent_put_of_the_same_text_frees_its_slot(tmp_path, cache):
+    other = EmbeddingCache(str(tmp_path), MODEL, DIM, max_entries=3)
+    flush = cache._vectors.flush
+
+    def flush_after_other_put():
+        # The other process publishes the same text while this one writes its reserved slot
+        other.put_many(["a"], np.stack([vector(2)]))
+        flush()
+
+    cache._vectors.flush = flush_after_other_put
+    cache.put_many(["a"], np.stack([vector(1)]))
+    del cache._vectors.flush
+    assert cache.stats()["entries"] == 1
+
+    # The dropped reservation's slot is reused, and the cache still fills up to its capacity
+    cache.put_many(["b"], np.stack([vector(3)]))
+    other.put_many(["c"], np.stack([vector(4)]))
+    assert cache.stats()["evictions"] == other.stats()["evictions"] == 0
+    matrix, missing = cache.get_many(["a", "b", "c"])
+    assert missing == []
+    assert np.array_equal(matrix, np.stack([vector(2), vector(3), vector(4)]))
+
+    cache.put_many(["d"], np.stack([vector(5)]))
+    assert cache.stats()["evictions"] == 1
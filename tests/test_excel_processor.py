@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+from openpyxl import Workbook
+
+from backend.core.config import settings
+from backend.rag_solution.data_ingestion.excel_processor import ExcelProcessor, iter_sheet_windows
+
+
+def write_workbook(path, sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(str(path))
+    return str(path)
+
+
+ROWS = [["name", "qty", None], ["apple", 3.0], [], ["pear", 12, None], ["plum", 1.5], ["fig", date(2024, 1, 2)]]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return write_workbook(tmp_path / "stock.xlsx", {"Stock": ROWS, "Empty": [], "Header": [["a", "b"]]})
+
+
+def test_windows_repeat_the_sheet_name_and_header(workbook):
+    assert list(iter_sheet_windows(workbook, "Stock", rows_per_chunk=2, max_chars=1000)) == [
+        "Sheet: Stock\nname | qty\napple | 3\npear | 12",
+        "Sheet: Stock\nname | qty\nplum | 1.5\nfig | 2024-01-02T00:00:00",
+    ]
+
+
+def test_windows_respect_the_character_budget(workbook):
+    windows = list(iter_sheet_windows(workbook, "Stock", rows_per_chunk=50, max_chars=12))
+    assert [window.split("\n")[2:] for window in windows] == [
+        ["apple | 3"], ["pear | 12"], ["plum | 1.5"], ["fig | 2024-01-02T00:00:00"]]
+    assert all(window.startswith("Sheet: Stock\nname | qty\n") for window in windows)
+
+
+def test_sheets_without_data_rows(workbook):
+    assert list(iter_sheet_windows(workbook, "Empty", rows_per_chunk=2, max_chars=1000)) == []
+    assert list(iter_sheet_windows(workbook, "Header", rows_per_chunk=2, max_chars=1000)) == ["Sheet: Header\na | b"]
+
+
+@pytest.mark.parametrize("sheet_workers", [1, 2])
+def test_process_yields_every_sheet(monkeypatch, tmp_path, sheet_workers):
+    monkeypatch.setattr(settings, "chunking_strategy", "fixed")
+    monkeypatch.setattr(settings, "excel_rows_per_chunk", 1)
+    sheets = {f"Sheet{i}": [["id"], *[[f"{i}-{row}"] for row in range(3)]] for i in range(3)}
+    file_path = write_workbook(tmp_path / "book.xlsx", sheets)
+    processor = ExcelProcessor()
+    processor.embed_chunks = False
+    processor.sheet_workers = sheet_workers
+
+    texts = {}
+    for document in processor.process(file_path):
+        texts.setdefault(document.metadata.title, []).extend(chunk.text for chunk in document.chunks)
+    # Sheets may interleave when read in parallel, but each keeps its row order
+    assert texts == {name: [f"Sheet: {name}\nid\n{row[0]}" for row in rows[1:]] for name, rows in sheets.items()}
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.core.custom_exceptions import PipelineStageError
+from backend.rag_solution.pipeline.executor import (Deadline,
+                                                    PipelineExecutor, Stage)
+
+
+def stage(name, result=None, depends_on=(), delay=0.0, error=None, **kwargs):
+    async def run(inputs, deadline):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result(inputs) if callable(result) else result
+
+    return Stage(name=name, run=run, depends_on=depends_on, **kwargs)
+
+
+def test_deadline():
+    assert Deadline().remaining() is None
+    assert not Deadline().expired()
+    assert Deadline(timeout=0).expired()
+    assert 0 < Deadline(timeout=10).remaining() <= 10
+
+    parent = Deadline(timeout=10)
+    assert parent.child(1).remaining() <= 1
+    assert parent.child(100).expires_at == parent.expires_at
+    assert parent.child(None).expires_at == parent.expires_at
+    assert Deadline().child(None).expires_at is None
+
+
+def test_stages_are_ordered_by_dependencies():
+    executor = PipelineExecutor([
+        stage("answer", depends_on=["context"]),
+        stage("context", depends_on=["retrieve", "rewrite"]),
+        stage("retrieve", depends_on=["query"]),
+        stage("rewrite", depends_on=["query"]),
+    ])
+    order = [executor_stage.name for executor_stage in executor.stages]
+    assert order.index("context") > max(order.index("retrieve"), order.index("rewrite"))
+    assert order[-1] == "answer"
+
+
+@pytest.mark.parametrize("stages", [
+    [stage("a"), stage("a")],
+    [stage("a", depends_on=["b"]), stage("b", depends_on=["a"])],
+])
+def test_invalid_graphs_are_rejected(stages):
+    with pytest.raises(ValueError):
+        PipelineExecutor(stages)
+
+
+def test_run_passes_results_to_dependents():
+    executor = PipelineExecutor([
+        stage("double", lambda inputs: inputs["x"] * 2, depends_on=["x"]),
+        stage("sum", lambda inputs: inputs["double"] + inputs["x"], depends_on=["double", "x"]),
+    ])
+    assert asyncio.run(executor.run({"x": 3})) == {"x": 3, "double": 6, "sum": 9}
+
+
+def test_run_rejects_unknown_dependencies():
+    executor = PipelineExecutor([stage("a", depends_on=["missing"])])
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run({}))
+
+
+def test_inputs_replace_stages():
+    executor = PipelineExecutor([
+        stage("retrieve", error=RuntimeError("should not run")),
+        stage("answer", lambda inputs: inputs["retrieve"], depends_on=["retrieve"]),
+    ])
+    assert asyncio.run(executor.run({"retrieve": "cached"}))["answer"] == "cached"
+
+
+def test_independent_stages_run_concurrently():
+    executor = PipelineExecutor([stage(name, delay=0.2) for name in ("a", "b", "c")])
+    start = time.perf_counter()
+    asyncio.run(executor.run({}))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_failed_stage_without_fallback_fails_the_run():
+    executor = PipelineExecutor([
+        stage("retrieve", error=RuntimeError("store down")),
+        stage("slow", delay=5),
+    ])
+    start = time.perf_counter()
+    with pytest.raises(PipelineStageError) as info:
+        asyncio.run(executor.run({}))
+    assert info.value.stage == "retrieve"
+    assert "store down" in str(info.value)
+    # The run stops at the first failure instead of waiting for unrelated stages
+    assert time.perf_counter() - start < 1
+
+
+def test_failed_stage_uses_its_fallback():
+    executor = PipelineExecutor([
+        stage("rewrite", error=RuntimeError("model down"), depends_on=["query"],
+              fallback=lambda inputs: inputs["query"]),
+        stage("retrieve", lambda inputs: f"results for {inputs['rewrite']}", depends_on=["rewrite"]),
+    ])
+    assert asyncio.run(executor.run({"query": "q"}))["retrieve"] == "results for q"
+
+
+def test_stage_timeout():
+    executor = PipelineExecutor([stage("rerank", "reranked", delay=5, timeout=0.05,
+                                       fallback=lambda inputs: "original order")])
+    assert asyncio.run(executor.run({}))["rerank"] == "original order"
+
+    executor = PipelineExecutor([stage("rerank", "reranked", delay=5, timeout=0.05)])
+    with pytest.raises(PipelineStageError, match="timed out"):
+        asyncio.run(executor.run({}))
+
+
+def test_request_deadline_bounds_every_stage():
+    seen = {}
+
+    async def run(inputs, deadline):
+        seen["remaining"] = deadline.remaining()
+        return "done"
+
+    executor = PipelineExecutor([Stage(name="a", run=run, timeout=60)])
+    asyncio.run(executor.run({}, Deadline(timeout=1)))
+    assert seen["remaining"] <= 1
+
+    executor = PipelineExecutor([stage("a", "done", fallback=lambda inputs: "expired")])
+    assert asyncio.run(executor.run({}, Deadline(timeout=0)))["a"] == "expired"
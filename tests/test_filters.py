@@ -0,0 +1,100 @@
+import pytest
+
+from backend.vectordbs.data_types import (DocumentMetadataFilter,
+                                          FilterCondition,
+                                          MetadataFilterGroup)
+from backend.vectordbs.error_types import VectorStoreError
+from backend.vectordbs.utils.filters import (normalize_filter,
+                                             to_elasticsearch_query,
+                                             to_milvus_expr, to_mongo_filter,
+                                             to_predicate)
+
+
+def condition(field_name, operator, value):
+    return DocumentMetadataFilter(field_name=field_name, operator=operator, value=value)
+
+
+def group(condition, *filters):
+    return MetadataFilterGroup(filters=list(filters), condition=condition)
+
+
+def test_normalize_filter_canonicalizes_operators():
+    assert normalize_filter(condition("author", "==", "a")) == condition("author", "eq", "a")
+    assert normalize_filter(condition("author", "", "a")) == condition("author", "eq", "a")
+    assert normalize_filter(condition("page", ">=", 2)) == condition("page", "gte", 2)
+    assert normalize_filter(condition("author", "not_in", ("a", "b"))) == condition("author", "nin", ["a", "b"])
+
+
+def test_normalize_filter_pushes_not_down():
+    normalized = normalize_filter(group(FilterCondition.NOT, condition("author", "eq", "a"), condition("page", "gt", 2)))
+    assert normalized == group(FilterCondition.OR, condition("author", "ne", "a"), condition("page", "lte", 2))
+
+
+def test_normalize_filter_cancels_double_negation_and_flattens_groups():
+    inner = group(FilterCondition.NOT, condition("author", "in", ["a"]))
+    normalized = normalize_filter(group(FilterCondition.NOT, inner))
+    assert normalized == condition("author", "in", ["a"])
+
+    nested = group(FilterCondition.AND, condition("a", "eq", 1),
+                   group(FilterCondition.AND, condition("b", "eq", 2), condition("c", "eq", 3)))
+    assert normalize_filter(nested).filters == [condition("a", "eq", 1), condition("b", "eq", 2),
+                                                condition("c", "eq", 3)]
+
+
+@pytest.mark.parametrize("filter", [
+    condition("author", "like", "a"),
+    condition("author", "in", "a"),
+    group(FilterCondition.AND),
+])
+def test_normalize_filter_rejects_invalid_filters(filter):
+    with pytest.raises(VectorStoreError):
+        normalize_filter(filter)
+
+
+def test_compilers_return_none_without_filter():
+    assert to_milvus_expr(None) is None
+    assert to_mongo_filter(None) is None
+    assert to_elasticsearch_query(None) is None
+    assert to_predicate(None, lambda record, field: None) is None
+
+
+def test_to_milvus_expr():
+    filter = group(FilterCondition.OR,
+                   group(FilterCondition.AND, condition("author", "eq", 'say "hi"'), condition("page", ">", 2)),
+                   condition("source", "in", ["pdf", "word"]),
+                   condition("draft", "ne", True))
+    assert to_milvus_expr(filter) == (
+        '((author == "say \\"hi\\"") and (page > 2)) or (source in ["pdf", "word"]) or (draft != true)'
+    )
+
+
+def test_to_mongo_filter():
+    filter = group(FilterCondition.NOT, condition("author", "eq", "a"), condition("page", "lt", 3))
+    assert to_mongo_filter(filter) == {"$or": [{"author": {"$ne": "a"}}, {"page": {"$gte": 3}}]}
+
+
+def test_to_elasticsearch_query():
+    filter = group(FilterCondition.AND, condition("author", "ne", "a"), condition("source", "in", ["pdf"]),
+                   condition("page", "lte", 3))
+    assert to_elasticsearch_query(filter) == {"bool": {"filter": [
+        {"bool": {"must_not": [{"term": {"author": "a"}}]}},
+        {"terms": {"source": ["pdf"]}},
+        {"range": {"page": {"lte": 3}}},
+    ]}}
+    assert to_elasticsearch_query(group(FilterCondition.OR, condition("a", "eq", 1), condition("b", "eq", 2))) == {
+        "bool": {"should": [{"term": {"a": 1}}, {"term": {"b": 2}}], "minimum_should_match": 1}}
+
+
+def test_to_predicate():
+    records = [{"author": "a", "page": 1}, {"author": "b", "page": 5}, {"author": "c", "page": None},
+               {"author": "d", "page": "five"}]
+    predicate = to_predicate(
+        group(FilterCondition.OR, condition("page", "gte", 5), condition("author", "in", ["a"])),
+        lambda record, field: record.get(field))
+    assert [record["author"] for record in records if predicate(record)] == ["a", "b"]
+
+    # Missing and incomparable values match neither a range nor its negation
+    predicate = to_predicate(group(FilterCondition.NOT, condition("page", "lt", 5)), lambda record, field: record[field])
+    assert [record["author"] for record in records if predicate(record)] == ["b"]
+    predicate = to_predicate(condition("author", "nin", ["a", "b"]), lambda record, field: record[field])
+    assert [record["author"] for record in records if predicate(record)] == ["c", "d"]
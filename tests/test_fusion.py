@@ -0,0 +1,69 @@
+import pytest
+
+from backend.vectordbs.data_types import (DocumentChunk,
+                                          DocumentChunkWithScore, QueryResult)
+from backend.vectordbs.utils.fusion import (RRF_K, flatten_results,
+                                            reciprocal_rank_fusion,
+                                            weighted_score_fusion)
+
+
+def chunk(chunk_id, score=None, text=None):
+    return DocumentChunkWithScore(chunk_id=chunk_id, text=text or f"text {chunk_id}", score=score)
+
+
+def ids(results):
+    return [result.chunk_id for result in results]
+
+
+def test_flatten_results_keeps_order_and_skips_empty_results():
+    results = [QueryResult(data=[chunk("a"), chunk("b")]), QueryResult(data=None), QueryResult(data=[chunk("c")])]
+    assert ids(flatten_results(results)) == ["a", "b", "c"]
+
+
+def test_reciprocal_rank_fusion_scores_by_rank():
+    fused = reciprocal_rank_fusion([[chunk("a"), chunk("b")], [chunk("b")]])
+    assert ids(fused) == ["b", "a"]
+    assert fused[0].score == pytest.approx(1 / (RRF_K + 2) + 1 / (RRF_K + 1))
+    assert fused[1].score == pytest.approx(1 / (RRF_K + 1))
+
+
+def test_reciprocal_rank_fusion_ignores_score_scales():
+    dense = [chunk("a", score=0.9), chunk("b", score=0.8)]
+    sparse = [chunk("a", score=42.0), chunk("b", score=3.0)]
+    rescaled = [chunk("a", score=0.001), chunk("b", score=0.0001)]
+    assert ids(reciprocal_rank_fusion([dense, sparse])) == ids(reciprocal_rank_fusion([dense, rescaled]))
+
+
+def test_reciprocal_rank_fusion_weights_and_limit():
+    first = [chunk("a"), chunk("b"), chunk("c")]
+    second = [chunk("c"), chunk("b"), chunk("a")]
+    assert ids(reciprocal_rank_fusion([first, second], weights=[1.0, 0.0])) == ["a", "b", "c"]
+    assert ids(reciprocal_rank_fusion([first, second], weights=[0.0, 1.0], limit=2)) == ["c", "b"]
+
+
+def test_fusion_keeps_the_payload_of_the_first_list():
+    full = DocumentChunk(chunk_id="a", text="full text", vectors=[1.0, 0.0], document_id="doc")
+    bare = DocumentChunk(chunk_id="a", text="")
+    (fused,) = reciprocal_rank_fusion([[full], [bare]])
+    assert isinstance(fused, DocumentChunkWithScore)
+    assert (fused.text, fused.vectors, fused.document_id) == ("full text", [1.0, 0.0], "doc")
+
+
+def test_weighted_score_fusion_normalizes_scores():
+    dense = [chunk("a", score=0.9), chunk("b", score=0.7), chunk("c", score=0.5)]
+    sparse = [chunk("c", score=30.0), chunk("a", score=10.0)]
+    fused = weighted_score_fusion([dense, sparse], weights=[0.5, 0.5])
+    scores = {result.chunk_id: result.score for result in fused}
+    assert scores == pytest.approx({"a": 0.5, "b": 0.25, "c": 0.5})
+
+
+def test_weighted_score_fusion_falls_back_to_ranks_without_scores():
+    fused = weighted_score_fusion([[chunk("a"), chunk("b"), chunk("c", score=1.0)]])
+    assert ids(fused) == ["a", "b", "c"]
+    assert [result.score for result in fused] == pytest.approx([1.0, 0.5, 0.0])
+
+
+def test_weighted_score_fusion_with_equal_scores_and_empty_lists():
+    fused = weighted_score_fusion([[], [chunk("a", score=0.3), chunk("b", score=0.3)]])
+    assert [result.score for result in fused] == [1.0, 1.0]
+    assert weighted_score_fusion([[], []]) == []
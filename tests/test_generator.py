@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.rag_solution.generation import generator
+from backend.rag_solution.generation.generator import Generator
+
+
+class FakeStream:
+    """A blocking SDK stream that records how far it was consumed and whether it was closed."""
+
+    def __init__(self, fragments, error=None, gate=None):
+        self.fragments = fragments
+        self.error = error
+        self.gate = gate
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        for fragment in self.fragments:
+            # With a gate, only the first fragment is ready until the gate opens
+            if self.gate is not None and self.produced:
+                self.gate.wait(5)
+            self.produced += 1
+            yield fragment
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed.set()
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    streams = []
+
+    def use(fake):
+        streams.append(fake)
+        return fake
+
+    monkeypatch.setattr(generator, "generate_text_stream", lambda prompt, max_tokens, temperature, model_id: streams[0])
+    return use
+
+
+def collect(**kwargs):
+    async def run():
+        return [fragment async for fragment in Generator(api_key="key").generate_stream("prompt", **kwargs)]
+    return asyncio.run(run())
+
+
+def test_fragments_are_yielded_in_order(stream):
+    fake = stream(FakeStream(["The ", "answer ", "is ", "42."]))
+    assert collect() == ["The ", "answer ", "is ", "42."]
+    assert fake.closed.wait(5)
+
+
+def test_stream_errors_are_raised_after_the_fragments_before_them(stream):
+    fake = stream(FakeStream(["partial"], error=RuntimeError("connection reset")))
+
+    async def run():
+        fragments = []
+        with pytest.raises(RuntimeError, match="connection reset"):
+            async for fragment in Generator(api_key="key").generate_stream("prompt"):
+                fragments.append(fragment)
+        return fragments
+
+    assert asyncio.run(run()) == ["partial"]
+    assert fake.closed.wait(5)
+
+
+def test_closing_early_stops_the_producer_and_closes_the_stream(stream):
+    gate = threading.Event()
+    fake = stream(FakeStream([str(i) for i in range(100)], gate=gate))
+
+    async def run():
+        fragments = Generator(api_key="key").generate_stream("prompt")
+        first = await fragments.__anext__()
+        await fragments.aclose()
+        gate.set()
+        return first
+
+    assert asyncio.run(run()) == "0"
+    assert fake.closed.wait(5)
+    # The producer stops at the fragment it was waiting for when the consumer went away
+    assert fake.produced == 2
@@ -0,0 +1,38 @@
+import os
+
+from backend.rag_solution.data_ingestion.image_store import ImageStore, image_hash
+
+
+def stored_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+
+def test_image_hash_depends_only_on_content():
+    assert image_hash(b"image") == image_hash(bytearray(b"image"))
+    assert image_hash(b"image") != image_hash(b"other image")
+
+
+def test_put_stores_each_image_once(tmp_path):
+    store = ImageStore(str(tmp_path))
+    key = image_hash(b"image")
+    assert store.get(key) is None
+
+    path = store.put(key, b"image", "png")
+    assert path == os.path.join(str(tmp_path), key[:2], f"{key}.png")
+    assert store.put(key, b"image", "jpeg") == path
+    assert store.get(key) == path
+    assert stored_files(tmp_path) == [f"{key}.png"]
+
+
+def test_stored_images_are_shared_across_stores(tmp_path):
+    key = image_hash(b"image")
+    path = ImageStore(str(tmp_path)).put(key, b"image", "png")
+    # Another process, or a later run, finds the image on disk
+    assert ImageStore(str(tmp_path)).get(key) == path
+
+
+def test_partial_writes_are_never_returned(tmp_path):
+    key = image_hash(b"image")
+    os.makedirs(tmp_path / key[:2])
+    (tmp_path / key[:2] / ".0123.tmp").write_bytes(b"ima")
+    assert ImageStore(str(tmp_path)).get(key) is None
@@ -0,0 +1,94 @@
+import contextlib
+import os
+
+import pytest
+
+from backend.rag_solution.data_ingestion import ingestion
+from backend.rag_solution.data_ingestion.ingestion import IngestionPipeline
+from backend.vectordbs.data_types import Document, DocumentChunk
+
+# Pages per file; parsing workers are forked, so they see this module as the test left it
+FILES = {"a/report.pdf": 2, "b/report.pdf": 2, "c/notes.pdf": 1}
+
+
+class FakeProcessor:
+    """Yields one document per page, fails on "broken" files and kills its worker on "crash" files."""
+
+    def __init__(self, embed=True, max_workers=None):
+        assert not embed and max_workers >= 1
+
+    def process_document(self, file_path):
+        if file_path.startswith("broken"):
+            raise ValueError("unreadable file")
+        if file_path.startswith("crash"):
+            os._exit(1)
+        for page in range(FILES[file_path]):
+            yield Document(name=os.path.basename(file_path), document_id=f"id-{file_path}", path=file_path,
+                           chunks=[DocumentChunk(chunk_id=f"{file_path}#{page}", text=f"{file_path} page {page}")])
+
+
+class FakeBatcher:
+    batch_size = 2
+
+    def embed_chunks(self, chunks):
+        if any(chunk.text.startswith("b/") for chunk in chunks):
+            raise RuntimeError("embedding service down")
+        for chunk in chunks:
+            chunk.vectors = [1.0, 0.0]
+        return chunks
+
+
+class FakeStore:
+    def __init__(self):
+        self.documents = []
+        self.flushed = False
+
+    def bulk_load(self, collection_name):
+        return contextlib.nullcontext()
+
+    def add_documents(self, collection_name, documents):
+        self.documents.extend(documents)
+
+    def flush(self, collection_name):
+        self.flushed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_processor(monkeypatch):
+    monkeypatch.setattr(ingestion, "DocumentProcessor", FakeProcessor)
+
+
+def run(store, file_paths, **kwargs):
+    pipeline = IngestionPipeline(store, "collection", embedding_workers=1, queue_size=4, upsert_batch_size=2,
+                                 **kwargs)
+    pipeline.embedding_batcher = FakeBatcher()
+    return pipeline.run(file_paths)
+
+
+def test_pipeline_stores_every_document():
+    store = FakeStore()
+    result = run(store, ["a/report.pdf", "c/notes.pdf"], parse_workers=2)
+    assert result.succeeded
+    assert result.documents_stored == 3
+    assert sorted(chunk.chunk_id for document in store.documents for chunk in document.chunks) == [
+        "a/report.pdf#0", "a/report.pdf#1", "c/notes.pdf#0"]
+    assert all(chunk.vectors == [1.0, 0.0] for document in store.documents for chunk in document.chunks)
+    assert store.flushed
+
+
+def test_pipeline_reports_failed_files_and_documents():
+    store = FakeStore()
+    result = run(store, ["a/report.pdf", "broken.pdf", "b/report.pdf"], parse_workers=1)
+    assert not result.succeeded
+    assert result.failed_files == {"broken.pdf": "unreadable file"}
+    # Failures are reported per file, even though both files are named report.pdf
+    assert result.failed_documents == {"b/report.pdf": "embedding service down"}
+    assert {document.path for document in store.documents} == {"a/report.pdf"}
+
+
+def test_pipeline_survives_a_dead_worker():
+    store = FakeStore()
+    result = run(store, ["c/notes.pdf", "crash.pdf", "a/report.pdf"], parse_workers=1)
+    assert not result.succeeded
+    assert set(result.failed_files) == {"crash.pdf", "a/report.pdf"}
+    assert result.documents_stored == 1 and store.flushed
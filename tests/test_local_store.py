@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from backend.core.config import settings
+from backend.vectordbs import local_store
+from backend.vectordbs.data_types import (Document, DocumentChunk,
+                                          DocumentChunkMetadata,
+                                          DocumentMetadataFilter,
+                                          QueryWithEmbedding, Source)
+from backend.vectordbs.error_types import (CollectionError, DocumentError,
+                                           VectorStoreError)
+from backend.vectordbs.local_store import (IVFIndex, LocalCollection,
+                                           LocalVectorStore)
+
+COLLECTION = "docs"
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(monkeypatch):
+    monkeypatch.setattr(local_store, "EMBEDDING_DIM", 3)
+    monkeypatch.setattr(local_store, "sparse_index_enabled", lambda: False)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalVectorStore(root=str(tmp_path), index="flat")
+    store.create_collection(COLLECTION)
+    return store
+
+
+def document(document_id, *chunks, author=""):
+    return Document(name=document_id, document_id=document_id, chunks=[
+        DocumentChunk(chunk_id=chunk_id, text=f"text {chunk_id}", vectors=vector,
+                      metadata=DocumentChunkMetadata(source=Source.PDF, author=author))
+        for chunk_id, vector in chunks
+    ])
+
+
+def search(store, vector, limit=10, filter=None):
+    (result,) = store.query(COLLECTION, QueryWithEmbedding(text="query", vectors=vector), limit, filter=filter)
+    return [(chunk.chunk_id, round(chunk.score, 4)) for chunk in result.data]
+
+
+def test_query_ranks_by_cosine_similarity(store):
+    store.add_documents(COLLECTION, [document("a", ("a1", [2.0, 0.0, 0.0]), ("a2", [1.0, 1.0, 0.0])),
+                                     document("b", ("b1", [0.0, 0.0, 5.0]))])
+    assert search(store, [1.0, 0.0, 0.0]) == [("a1", 1.0), ("a2", 0.7071), ("b1", 0.0)]
+    assert search(store, [0.0, 0.0, 3.0], limit=1) == [("b1", 1.0)]
+
+    (result,) = store.query(COLLECTION, QueryWithEmbedding(text="query", vectors=[1.0, 0.0, 0.0]), 1,
+                            include_vectors=True)
+    assert result.data[0].document_id == "a"
+    assert result.data[0].metadata.source == Source.PDF
+    assert np.allclose(result.data[0].vectors, [1.0, 0.0, 0.0])
+
+
+def test_add_replaces_chunks_with_the_same_id(store):
+    store.add_documents(COLLECTION, [document("a", ("a1", [1.0, 0.0, 0.0]))])
+    store.add_documents(COLLECTION, [document("a", ("a1", [0.0, 1.0, 0.0]))])
+    assert search(store, [0.0, 1.0, 0.0]) == [("a1", 1.0)]
+
+
+def test_add_rejects_vectors_of_another_dimension(store):
+    with pytest.raises(DocumentError):
+        store.add_documents(COLLECTION, [document("a", ("a1", [1.0, 0.0]))])
+
+
+def test_delete_documents(store):
+    store.add_documents(COLLECTION, [document("a", ("a1", [1.0, 0.0, 0.0]), ("a2", [0.0, 1.0, 0.0])),
+                                     document("b", ("b1", [0.0, 0.0, 1.0]))])
+    assert store.delete_documents(COLLECTION, ["a", "missing"]) == 2
+    assert search(store, [1.0, 0.0, 0.0]) == [("b1", 0.0)]
+    assert store.delete_documents(COLLECTION, ["a"]) == 0
+
+
+def test_query_with_filter(store):
+    store.add_documents(COLLECTION, [document("a", ("a1", [1.0, 0.0, 0.0]), author="alice"),
+                                     document("b", ("b1", [0.9, 0.1, 0.0]), author="bob")])
+    filter = DocumentMetadataFilter(field_name="author", operator="eq", value="bob")
+    assert [chunk_id for chunk_id, _ in search(store, [1.0, 0.0, 0.0], filter=filter)] == ["b1"]
+
+    with pytest.raises(VectorStoreError):
+        search(store, [1.0, 0.0, 0.0], filter=DocumentMetadataFilter(field_name="page_number", value=1))
+
+
+def test_flush_persists_the_collection(store):
+    store.add_documents(COLLECTION, [document("a", ("a1", [1.0, 0.0, 0.0]), ("a2", [0.0, 1.0, 0.0]))])
+    other = LocalVectorStore(root=store.root, index="flat")
+    assert search(other, [1.0, 0.0, 0.0]) == []
+
+    store.flush(COLLECTION)
+    assert search(other, [1.0, 0.0, 0.0]) == [("a1", 1.0), ("a2", 0.0)]
+
+    # The other instance reloads the collection once it changes on disk
+    store.delete_documents(COLLECTION, ["a"])
+    store.flush(COLLECTION)
+    assert search(other, [1.0, 0.0, 0.0]) == []
+
+
+def test_collections_must_exist(store):
+    store.create_collection(COLLECTION)  # Creating an existing collection is a no-op
+    with pytest.raises(CollectionError):
+        store.query("missing", QueryWithEmbedding(text="query", vectors=[1.0, 0.0, 0.0]))
+
+    store.delete_collection(COLLECTION)
+    with pytest.raises(CollectionError):
+        search(store, [1.0, 0.0, 0.0])
+    store.delete_collection(COLLECTION)
+
+
+@pytest.mark.parametrize("index_name", ["flat", "ivf", "hnsw"])
+def test_indexes_find_nearest_rows(tmp_path, monkeypatch, index_name):
+    if index_name == "hnsw":
+        pytest.importorskip("hnswlib")
+    monkeypatch.setattr(settings, "local_store_ivf_nlist", 8)
+    monkeypatch.setattr(settings, "local_store_ivf_nprobe", 8)
+    monkeypatch.setattr(settings, "local_store_ivf_train_size", 100)
+    vectors = np.random.default_rng(0).standard_normal((500, 8)).astype(np.float32)
+    chunks = [DocumentChunk(chunk_id=str(i), text=str(i), vectors=vector, document_id=str(i % 10))
+              for i, vector in enumerate(vectors)]
+
+    collection = LocalCollection.create(str(tmp_path), 8, index_name)
+    assert collection._index.name == index_name
+    collection.add(chunks)
+    collection.delete_documents(["0"])
+    rows, scores = collection.search(vectors[1], 3)
+    assert rows[0] == 1 and scores[0] == pytest.approx(1.0, abs=1e-4)
+    assert list(scores) == sorted(scores, reverse=True)
+    if index_name == "ivf":
+        assert isinstance(collection._index, IVFIndex) and collection._index.centroids is not None
+
+    collection.save()
+    reopened = LocalCollection.open(str(tmp_path))
+    rows, _ = reopened.search(vectors[11], 3)
+    assert rows[0] == 11
+    rows, _ = reopened.search(vectors[10], 500)
+    assert not any(row % 10 == 0 for row in rows)
+    rows, _ = reopened.search(vectors[12], 3, row_filter=lambda row: row % 2 == 1)
+    assert all(row % 2 == 1 for row in rows)
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from pymilvus import MilvusException
+
+from backend.vectordbs.data_types import (DocumentChunk,
+                                          DocumentChunkMetadata, Source)
+from backend.vectordbs.milvus_store import MilvusBulkWriter
+
+
+class FakeCollection:
+    name = "collection"
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.inserts = []
+
+    def insert(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise MilvusException(message="insert failed")
+        # The chunk_id column, in the order of INSERT_FIELDS
+        self.inserts.append(list(batch[3]))
+
+
+def chunks(*ids):
+    return [DocumentChunk(chunk_id=chunk_id, text=f"text {chunk_id}", vectors=[0.0, 1.0], document_id="doc",
+                          metadata=DocumentChunkMetadata(source=Source.PDF)) for chunk_id in ids]
+
+
+def test_full_batches_are_inserted_as_they_fill():
+    collection = FakeCollection()
+    writer = MilvusBulkWriter(collection, batch_size=2, flush_interval=60)
+    writer.add(chunks("1"))
+    assert collection.inserts == [] and len(writer) == 1
+    writer.add(chunks("2", "3", "4", "5"))
+    assert collection.inserts == [["1", "2"], ["3", "4"]] and len(writer) == 1
+
+    writer.flush()
+    assert collection.inserts == [["1", "2"], ["3", "4"], ["5"]] and len(writer) == 0
+
+
+def test_remainder_is_inserted_after_flush_interval():
+    collection = FakeCollection()
+    writer = MilvusBulkWriter(collection, batch_size=10, flush_interval=0.05)
+    writer.add(chunks("1", "2"))
+    deadline = time.monotonic() + 5
+    while len(writer) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert collection.inserts == [["1", "2"]]
+    writer.close()
+
+
+def test_failed_insert_keeps_rows_buffered_for_the_next_insert():
+    collection = FakeCollection(failures=1)
+    writer = MilvusBulkWriter(collection, batch_size=2, flush_interval=60)
+    # The chunks are accepted even though their insert fails
+    writer.add(chunks("1", "2", "3"))
+    assert collection.inserts == [] and len(writer) == 3
+
+    writer.add(chunks("4"))
+    assert collection.inserts == [["1", "2"], ["3", "4"]] and len(writer) == 0
+    writer.close()
+
+
+def test_flush_raises_and_keeps_rows_when_insert_fails():
+    collection = FakeCollection()
+    writer = MilvusBulkWriter(collection, batch_size=10, flush_interval=60)
+    writer.add(chunks("1", "2"))
+    collection.failures = 1
+    with pytest.raises(MilvusException):
+        writer.flush()
+    assert len(writer) == 2
+
+    writer.flush()
+    assert collection.inserts == [["1", "2"]]
+
+
+def test_close_stops_the_flush_timer():
+    collection = FakeCollection()
+    writer = MilvusBulkWriter(collection, batch_size=10, flush_interval=0.05)
+    writer.add(chunks("1"))
+    writer.close()
+    time.sleep(0.2)
+    assert collection.inserts == [] and len(writer) == 1
@@ -0,0 +1,157 @@
+import os
+
+import pymupdf
+import pytest
+
+from backend.core.config import settings
+from backend.rag_solution.data_ingestion.pdf_processor import PdfProcessor
+
+
+@pytest.fixture
+def processor(monkeypatch, tmp_path):
+    # Page workers are forked, so they see the settings as the test left them
+    monkeypatch.setattr(settings, "chunking_strategy", "fixed")
+    monkeypatch.setattr(settings, "min_chunk_size", 1)
+    monkeypatch.setattr(settings, "max_chunk_size", 1000)
+    monkeypatch.setattr(settings, "chunk_overlap", 0)
+    monkeypatch.setattr(settings, "image_store_dir", str(tmp_path / "images"))
+    processor = PdfProcessor()
+    processor.embed_chunks = False
+    return processor
+
+
+def write_pdf(path, pages):
+    doc = pymupdf.open()
+    for page_num in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {page_num}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def page_texts(processor, file_path):
+    with pymupdf.open(file_path) as doc:
+        return [(page_num, [chunk.text for chunk in chunks])
+                for page_num, chunks in processor.iter_pages(doc, file_path, "doc")]
+
+
+@pytest.mark.parametrize("page_workers, pages_per_task", [(1, 16), (2, 1), (3, 2)])
+def test_pages_are_yielded_in_page_order(processor, tmp_path, page_workers, pages_per_task):
+    file_path = write_pdf(tmp_path / "report.pdf", 7)
+    processor.page_workers, processor.pages_per_task, processor.parallel_min_pages = page_workers, pages_per_task, 1
+    assert page_texts(processor, file_path) == [(page_num, [f"Page {page_num}"]) for page_num in range(7)]
+
+
+def test_small_pdfs_are_parsed_without_a_pool(processor, tmp_path, monkeypatch):
+    file_path = write_pdf(tmp_path / "short.pdf", 3)
+    processor.page_workers, processor.parallel_min_pages = 4, 16
+    monkeypatch.setattr("concurrent.futures.ProcessPoolExecutor", None)
+    assert [page_num for page_num, _ in page_texts(processor, file_path)] == [0, 1, 2]
+
+
+def test_failed_pages_yield_no_chunks(processor, tmp_path, monkeypatch):
+    file_path = write_pdf(tmp_path / "report.pdf", 3)
+    process_page = PdfProcessor.process_page
+
+    def failing_process_page(self, doc, page_number, document_id):
+        if page_number == 1:
+            raise RuntimeError("broken page")
+        return process_page(self, doc, page_number, document_id)
+
+    monkeypatch.setattr(PdfProcessor, "process_page", failing_process_page)
+    processor.page_workers = 1
+    assert page_texts(processor, file_path) == [(0, ["Page 0"]), (1, []), (2, ["Page 2"])]
+
+
+def test_process_numbers_documents_by_page(processor, tmp_path):
+    file_path = write_pdf(tmp_path / "report.pdf", 4)
+    processor.page_workers, processor.pages_per_task, processor.parallel_min_pages = 2, 1, 1
+    documents = list(processor.process(file_path))
+    assert [document.metadata.page_number for document in documents] == [1, 2, 3, 4]
+    assert len({document.document_id for document in documents}) == 1
+
+
+def ruled_page(draw):
+    doc = pymupdf.open()
+    page = doc.new_page()
+    draw(page)
+    return page
+
+
+def draw_grid(page, rows, columns):
+    for y in rows:
+        page.draw_line((columns[0], y), (columns[-1], y))
+    for x in columns:
+        page.draw_line((x, rows[0]), (x, rows[-1]))
+
+
+def draw_cells(page):
+    for x in (100, 200):
+        for y in (100, 150):
+            page.draw_rect(pymupdf.Rect(x, y, x + 100, y + 50), fill=(0.9, 0.9, 0.9))
+
+
+@pytest.mark.parametrize("draw, expected", [
+    (lambda page: draw_grid(page, [100, 150, 200], [100, 300]), True),
+    (lambda page: draw_grid(page, [100, 200], [100, 200, 300]), True),
+    # Boxed cells are drawn as rectangles
+    (draw_cells, True),
+    (lambda page: None, False),
+    # A frame around a paragraph is a single box, not a table
+    (lambda page: draw_grid(page, [100, 200], [100, 300]), False),
+    (lambda page: page.draw_rect(pymupdf.Rect(100, 100, 300, 200)), False),
+    # Underlines are not a grid
+    (lambda page: [page.draw_line((100, y), (300, y)) for y in (100, 120, 140)], False),
+    # Segments too short to be rules, e.g. the strokes of a drawn glyph
+    (lambda page: draw_grid(page, [100, 104, 108], [100, 104]), False),
+])
+def test_has_ruling_lines(draw, expected):
+    assert PdfProcessor.has_ruling_lines(ruled_page(draw)) is expected
+
+
+def write_pdf_with_images(path, images_per_page):
+    """Write a PDF whose pages show the given images, as (name, (r, g, b)) pairs drawn as solid pixmaps."""
+    doc = pymupdf.open()
+    xrefs = {}
+    for images in images_per_page:
+        page = doc.new_page()
+        for index, (name, color) in enumerate(images):
+            rect = pymupdf.Rect(72, 72 + index * 60, 122, 122 + index * 60)
+            if name in xrefs:
+                page.insert_image(rect, xref=xrefs[name])
+            else:
+                pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8), False)
+                pixmap.set_rect(pixmap.irect, color)
+                xrefs[name] = page.insert_image(rect, stream=pixmap.tobytes("png"))
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def stored_images(processor):
+    return [name for _, _, names in os.walk(processor.image_store.root) for name in names]
+
+
+def image_chunks(documents):
+    return [chunk.text for document in documents for chunk in document.chunks
+            if chunk.metadata.content_type == "image"]
+
+
+def test_repeated_images_are_stored_and_chunked_once(processor, tmp_path):
+    red, blue = ("red", (255, 0, 0)), ("blue", (0, 0, 255))
+    file_path = write_pdf_with_images(tmp_path / "slides.pdf", [[red, red], [red, blue], [blue]])
+    processor.page_workers = 1
+    chunks = image_chunks(processor.process(file_path))
+    assert len(chunks) == 2 and len(set(chunks)) == 2
+    assert len(stored_images(processor)) == 2
+
+
+def test_images_are_deduplicated_across_documents(processor, tmp_path):
+    red = ("red", (255, 0, 0))
+    first = write_pdf_with_images(tmp_path / "first.pdf", [[red]])
+    second = write_pdf_with_images(tmp_path / "second.pdf", [[red], [red]])
+    processor.page_workers = 1
+    first_chunks = image_chunks(processor.process(first))
+    # Each document still gets a chunk for the image, pointing at the stored copy
+    assert image_chunks(processor.process(second)) == first_chunks
+    assert len(stored_images(processor)) == 1
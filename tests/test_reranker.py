@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.rag_solution.retrieval.reranker import CrossEncoderReranker
+from backend.vectordbs.data_types import DocumentChunkWithScore
+
+
+class FakeReranker(CrossEncoderReranker):
+    """Scores each text by its number; batches containing a "fail" text raise, "slow" ones wait for release."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.release = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+    def score(self, query, texts):
+        if "fail" in texts:
+            raise RuntimeError("inference failed")
+        if "slow" in texts:
+            self.release.wait(5)
+        return np.array([float(text) if text[0].isdigit() else 0.0 for text in texts], dtype=np.float32)
+
+
+def candidates(*texts):
+    # Retrieval scores decrease with the retrieval rank
+    return [DocumentChunkWithScore(chunk_id=text, text=text, score=1.0 - rank / 10) for rank, text in enumerate(texts)]
+
+
+def rerank(reranker, chunks, top_k, timeout=None):
+    return asyncio.run(reranker.rerank("query", chunks, top_k, timeout=timeout))
+
+
+def test_chunks_are_sorted_by_score_and_cut_to_top_k():
+    ranked = rerank(FakeReranker(batch_size=2), candidates("1", "5", "3", "4", "2"), top_k=3)
+    assert [(chunk.text, chunk.score) for chunk in ranked] == [("5", 5.0), ("4", 4.0), ("3", 3.0)]
+    assert rerank(FakeReranker(batch_size=2), [], top_k=3) == []
+
+
+def test_failed_batches_rank_after_scored_ones():
+    ranked = rerank(FakeReranker(batch_size=2), candidates("fail", "9", "1", "2"), top_k=4)
+    # The failed batch keeps its retrieval order and scores
+    assert [(chunk.text, chunk.score) for chunk in ranked] == [
+        ("2", 2.0), ("1", 1.0), ("fail", 1.0), ("9", pytest.approx(0.9))]
+
+
+def test_batches_over_the_budget_rank_after_scored_ones():
+    reranker = FakeReranker(batch_size=2)
+    try:
+        ranked = rerank(reranker, candidates("1", "2", "slow", "9", "3"), top_k=5, timeout=0.2)
+    finally:
+        reranker.release.set()
+    assert [chunk.text for chunk in ranked] == ["3", "2", "1", "slow", "9"]
+    assert [chunk.score for chunk in ranked[3:]] == pytest.approx([0.8, 0.7])
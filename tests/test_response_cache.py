@@ -0,0 +1,118 @@
+from backend.core.config import Settings
+from backend.rag_solution.pipeline.response_cache import ResponseCache
+from backend.vectordbs.data_types import DocumentChunkWithScore
+
+COLLECTIONS = ["docs"]
+
+
+def test_lookup_returns_the_most_similar_answer():
+    cache = ResponseCache(threshold=0.9)
+    source = DocumentChunkWithScore(chunk_id="1", text="source", score=0.7)
+    cache.store(COLLECTIONS, "what is rag", [1.0, 0.0, 0.0], "retrieval augmented generation", [source])
+    cache.store(COLLECTIONS, "what is a vector", [0.0, 1.0, 0.0], "a list of numbers")
+
+    hit = cache.lookup(COLLECTIONS, [0.95, 0.05, 0.0])
+    assert (hit.query, hit.answer) == ("what is rag", "retrieval augmented generation")
+    assert hit.sources == [source]
+    assert 0.9 <= hit.similarity < 1.0
+    assert cache.lookup(COLLECTIONS, [0.7, 0.7, 0.0]) is None
+
+
+def test_lookup_is_scoped_to_the_collections():
+    cache = ResponseCache()
+    cache.store(["a", "b"], "query", [1.0, 0.0], "answer")
+    assert cache.lookup(["b", "a"], [1.0, 0.0]).answer == "answer"
+    assert cache.lookup(["a"], [1.0, 0.0]) is None
+
+
+def test_lookup_ignores_other_dimensions_and_zero_vectors():
+    cache = ResponseCache()
+    cache.store(COLLECTIONS, "query", [1.0, 0.0], "answer")
+    assert cache.lookup(COLLECTIONS, [1.0, 0.0, 0.0]) is None
+    assert cache.lookup(COLLECTIONS, [0.0, 0.0]) is None
+    cache.store(COLLECTIONS, "query", [0.0, 0.0], "answer")
+    cache.store(COLLECTIONS, "query", [0.0, 1.0], "")
+    assert cache.stats()["entries"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=0)
+    cache.store(COLLECTIONS, "query", [1.0, 0.0], "answer")
+    assert cache.lookup(COLLECTIONS, [1.0, 0.0]) is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["entries"]) == (1, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.store(COLLECTIONS, "x", [1.0, 0.0, 0.0], "x")
+    cache.store(COLLECTIONS, "y", [0.0, 1.0, 0.0], "y")
+    assert cache.lookup(COLLECTIONS, [1.0, 0.0, 0.0]).answer == "x"
+    cache.store(COLLECTIONS, "z", [0.0, 0.0, 1.0], "z")
+
+    assert cache.lookup(COLLECTIONS, [0.0, 1.0, 0.0]) is None
+    assert cache.lookup(COLLECTIONS, [1.0, 0.0, 0.0]).answer == "x"
+    assert cache.lookup(COLLECTIONS, [0.0, 0.0, 1.0]).answer == "z"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_capacity_grows_up_to_max_entries():
+    cache = ResponseCache(max_entries=200)
+    vectors = [[float(i == j) for j in range(150)] for i in range(150)]
+    for i, vector in enumerate(vectors):
+        cache.store(COLLECTIONS, str(i), vector, str(i))
+    assert cache.stats()["evictions"] == 0
+    assert all(cache.lookup(COLLECTIONS, vector).answer == str(i) for i, vector in enumerate(vectors))
+
+
+def test_invalidate_drops_every_partition_of_the_collection():
+    cache = ResponseCache()
+    cache.store(["a"], "query", [1.0, 0.0], "answer")
+    cache.store(["a", "b"], "query", [1.0, 0.0], "answer")
+    cache.store(["b"], "query", [1.0, 0.0], "answer")
+    cache.invalidate("a")
+    assert cache.lookup(["a"], [1.0, 0.0]) is None
+    assert cache.lookup(["a", "b"], [1.0, 0.0]) is None
+    assert cache.lookup(["b"], [1.0, 0.0]).answer == "answer"
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_store_drops_answers_generated_across_an_invalidation():
+    cache = ResponseCache()
+    generation = cache.generation(["a", "b"])
+    assert cache.generation(["b", "a"]) == generation
+    cache.invalidate("b")
+    cache.store(["a", "b"], "query", [1.0, 0.0], "stale", generation=generation)
+    assert cache.lookup(["a", "b"], [1.0, 0.0]) is None
+    assert cache.stats()["stale_stores"] == 1
+
+    cache.store(["a", "b"], "query", [1.0, 0.0], "fresh", generation=cache.generation(["a", "b"]))
+    assert cache.lookup(["a", "b"], [1.0, 0.0]).answer == "fresh"
+
+
+def test_clear_invalidates_every_generation():
+    cache = ResponseCache()
+    cache.store(COLLECTIONS, "query", [1.0, 0.0], "answer")
+    generation = cache.generation(COLLECTIONS)
+    cache.clear()
+    assert cache.lookup(COLLECTIONS, [1.0, 0.0]) is None
+    cache.store(COLLECTIONS, "query", [1.0, 0.0], "stale", generation=generation)
+    assert cache.stats()["entries"] == 0
+
+
+def test_stats_hit_rate():
+    cache = ResponseCache()
+    assert cache.stats()["hit_rate"] == 0.0
+    cache.store(COLLECTIONS, "query", [1.0, 0.0], "answer")
+    cache.lookup(COLLECTIONS, [1.0, 0.0])
+    cache.lookup(COLLECTIONS, [0.0, 1.0])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_empty_ttl_means_no_expiry(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_TTL", "")
+    monkeypatch.delenv("RESPONSE_CACHE_ENABLED", raising=False)
+    config = Settings(_env_file=None, react_app_api_url="http://localhost:3000")
+    assert config.response_cache_ttl is None
+    assert not config.response_cache_enabled
@@ -0,0 +1,13 @@
+from backend.rag_solution.retrieval.retriever import Retriever
+from backend.vectordbs.data_types import VectorStoreQueryMode
+
+
+class FakeStore:
+    def __init__(self, max_query_results):
+        self.max_query_results = max_query_results
+
+
+def test_top_k_is_capped_at_the_store_limit():
+    assert Retriever(FakeStore(10000), top_k=20000, mode=VectorStoreQueryMode.DEFAULT).top_k == 10000
+    assert Retriever(FakeStore(10000), top_k=100, mode=VectorStoreQueryMode.DEFAULT).top_k == 100
+    assert Retriever(FakeStore(None), top_k=20000, mode=VectorStoreQueryMode.DEFAULT).top_k == 20000